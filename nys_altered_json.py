@@ -17,6 +17,7 @@ import argparse
 import json
 import os
 import re
+import sys
 from pathlib import Path
 from typing import Any, Optional
 
@@ -28,6 +29,9 @@ except Exception:  # pragma: no cover
     fuzz = None  # type: ignore
     process = None  # type: ignore
 
+# Holds nys_mappings, the crop/target mapping compiler shared with the web app (no Flask imports)
+WEB_APP_DIR = Path(__file__).resolve().parent / "web_application_nys"
+
 
 def _norm_alnum(s: str) -> str:
     return "".join(ch.lower() for ch in str(s).strip() if ch.isalnum())
@@ -694,42 +698,31 @@ def _extract_unique_targets_from_json(json_dir: Path) -> list[dict[str, str]]:
     return targets
 
 
-def _load_unified_crop_mapping(script_dir: Path) -> dict[str, str]:
+def _load_unified_crop_mapping() -> dict[str, str]:
     """
-    Load crop_names_unified.csv and return a mapping from normalized_original_crop_name -> unified_crop_name.
+    Return a mapping from original crop name -> unified crop name, using the compiled mappings shared
+    with the web app (web_application_nys/nys_mappings/mapping_artifact.py), so the pipeline reads
+    crop_names_unified.csv exactly the way the app and the Supabase builder do.
     Unified crop name is edited_crop_name if not blank, otherwise original_crop_name.
-    Uses lowercase keys for case-insensitive matching.
+    Keys are both the lowercase original (case-insensitive lookup) and the exact original.
     """
-    crop_names_csv = script_dir / "crop_names_unified.csv"
+    if str(WEB_APP_DIR) not in sys.path:
+        sys.path.insert(0, str(WEB_APP_DIR))
+    from nys_mappings.mapping_artifact import load_mappings
+
     mapping: dict[str, str] = {}
-    
-    if not crop_names_csv.exists():
-        return mapping
-    
     try:
-        df = pd.read_csv(crop_names_csv, low_memory=False)
-        if "original_crop_name" not in df.columns:
-            return mapping
-        
-        for _, row in df.iterrows():
-            original = _safe_str(row.get("original_crop_name", ""))
-            edited = _safe_str(row.get("edited_crop_name", ""))
-            
+        for row in load_mappings().crops.rows:
+            original = row.original_crop_name
             if not original:
                 continue
-            
             # Unified name: use edited if provided and not empty, otherwise use original
-            unified = edited if edited else original
-            
-            # Store mapping using normalized (lowercase) key for case-insensitive lookup
-            original_normalized = original.lower().strip()
-            mapping[original_normalized] = unified
-            
-            # Also store exact case match for exact lookups
+            unified = row.edited_crop_name or original
+            mapping[original.lower().strip()] = unified
             mapping[original] = unified
     except Exception as e:
         print(f"Warning: Could not load crop_names_unified.csv: {e}")
-    
+
     return mapping
 
 
@@ -740,7 +733,7 @@ def _update_target_names_csv(csv_path: Path, new_targets: list[dict[str, str]],
     Uses unified crop names from crop_names_unified.csv for consolidation.
     """
     # Load unified crop name mapping
-    unified_crop_mapping = _load_unified_crop_mapping(script_dir)
+    unified_crop_mapping = _load_unified_crop_mapping()
     
     # Dedupe key is (unified_crop, canonical_target) — NOT including target type.
     existing_keys: set[tuple[str, str]] = set()  # (canonical_target, unified_crop) tuples
@@ -5,7 +5,8 @@ from pathlib import Path
 
 from flask import Flask
 
-from .routes import bp as routes_bp
+from .data import freeze_heap
+from .routes import bp as routes_bp, preload_dataset, start_store_refresher
 from .auth_routes import auth_bp
 from .farm_routes import farm_bp
 from .application_log_routes import app_log_bp
@@ -39,4 +40,13 @@ def create_app() -> Flask:
     app.register_blueprint(farm_bp)
     app.register_blueprint(app_log_bp)
 
+    if os.environ.get("NYS_PRELOAD", "0") == "1":
+        # Gunicorn master (`preload_app`, see gunicorn.conf.py): load once and
+        # share it with the forked workers, which start their refreshers post-fork.
+        preload_dataset()
+        freeze_heap()
+    else:
+        # Keep the JSON dataset fresh off the request path (per worker process)
+        start_store_refresher()
+
     return app
@@ -2,45 +2,16 @@
 
 from __future__ import annotations
 
-import re
 from datetime import datetime
 
 from flask import Blueprint, jsonify, request
 
 from .auth import get_authenticated_supabase_client, get_current_user_id, is_authenticated, refresh_access_token
+from .moa import normalize_moa_code as _normalize_moa_code
+from .moa import parse_moa_codes as _parse_moa_codes
 
 app_log_bp = Blueprint("app_log", __name__, url_prefix="/api/application-log")
 
-_MOA_RE = re.compile(r"\b(FRAC|IRAC|HRAC)\s*([0-9]+[A-Z]?)\b", re.IGNORECASE)
-
-
-def _normalize_moa_code(code: str) -> str:
-    raw = str(code or "").strip()
-    if not raw or raw == "?":
-        return ""
-    s = " ".join(raw.upper().split())
-    m = _MOA_RE.search(s)
-    if m:
-        return f"{m.group(1).upper()} {m.group(2).upper()}".strip()
-    return s
-
-
-def _parse_moa_codes(raw_moa: str) -> list[str]:
-    s = str(raw_moa or "").strip()
-    if not s or s == "?" or s.upper() == "N/A":
-        return []
-    parts = re.split(r"[,/;]+", s)
-    out: list[str] = []
-    seen: set[str] = set()
-    for p in parts:
-        norm = _normalize_moa_code(p)
-        if not norm or norm in seen:
-            continue
-        seen.add(norm)
-        out.append(norm)
-    return out
-
-
 def _compute_block_keys(blocks: object, block_name: object) -> list[str]:
     keys: list[str] = []
     if isinstance(blocks, list):
@@ -66,6 +37,75 @@ def _safe_year_from_iso(dt_str: object) -> int | None:
         return None
 
 
+_MOA_RISK_COLUMNS = "application_date,actual_application_date,moa_codes,block_keys,mode_of_action,blocks,block"
+
+
+def _max_moa_counts(rows: list, year: int) -> dict[str, int]:
+    """{ code: max uses on any one block } over application log rows dated in `year`."""
+    # (block_key, moa_code) -> count
+    per_block: dict[tuple[str, str], int] = {}
+
+    for r in rows:
+        if not isinstance(r, dict):
+            continue
+
+        # Prefer actual date if present (matches existing UI logic)
+        y = _safe_year_from_iso(r.get("actual_application_date")) or _safe_year_from_iso(r.get("application_date"))
+        if y != year:
+            continue
+
+        block_keys = r.get("block_keys")
+        if not isinstance(block_keys, list) or not block_keys:
+            block_keys = _compute_block_keys(r.get("blocks") or [], r.get("block"))
+        block_keys = [str(b).strip() for b in block_keys if str(b).strip()]
+        if not block_keys:
+            continue
+
+        moa_codes = r.get("moa_codes")
+        if not isinstance(moa_codes, list) or not moa_codes:
+            moa_codes = _parse_moa_codes(r.get("mode_of_action") or "")
+        moa_codes = [_normalize_moa_code(c) for c in moa_codes if _normalize_moa_code(c)]
+        if not moa_codes:
+            continue
+
+        for bk in block_keys:
+            for code in moa_codes:
+                k = (bk, code)
+                per_block[k] = per_block.get(k, 0) + 1
+
+    # code -> max across blocks
+    max_by_code: dict[str, int] = {}
+    for (bk, code), cnt in per_block.items():
+        prev = max_by_code.get(code, 0)
+        if cnt > prev:
+            max_by_code[code] = cnt
+    return max_by_code
+
+
+def moa_use_counts(year: int | None = None) -> tuple[dict[str, int] | None, str | None]:
+    """(MOA risk counts, error) for the signed-in user (see /moa-risk); never raises.
+
+    Counts are None when not signed in. An expired JWT is refreshed once and
+    the query retried, as /moa-risk does; other Supabase errors come back as
+    (None, message).
+    """
+    if not is_authenticated() or not get_current_user_id():
+        return None, None
+    for attempt in range(2):
+        client = get_authenticated_supabase_client()
+        if not client:
+            return None, None
+        try:
+            resp = client.table("application_logs").select(_MOA_RISK_COLUMNS).execute()
+            return _max_moa_counts(resp.data or [], year or datetime.utcnow().year), None
+        except Exception as e:
+            error_msg = str(e)
+            if attempt == 0 and ("JWT expired" in error_msg or "PGRST303" in error_msg) and refresh_access_token():
+                continue
+            return None, error_msg
+    return None, None
+
+
 @app_log_bp.route("/blocks", methods=["GET"])
 def get_farm_blocks():
     """Get all farm blocks for the current user."""
@@ -593,49 +633,8 @@ def get_moa_risk():
         return jsonify({"error": "Database not configured or not authenticated"}), 500
 
     try:
-        resp = client.table("application_logs").select(
-            "application_date,actual_application_date,moa_codes,block_keys,mode_of_action,blocks,block"
-        ).execute()
-        rows = resp.data or []
-
-        # (block_key, moa_code) -> count
-        per_block: dict[tuple[str, str], int] = {}
-
-        for r in rows:
-            if not isinstance(r, dict):
-                continue
-
-            # Prefer actual date if present (matches existing UI logic)
-            y = _safe_year_from_iso(r.get("actual_application_date")) or _safe_year_from_iso(r.get("application_date"))
-            if y != year:
-                continue
-
-            block_keys = r.get("block_keys")
-            if not isinstance(block_keys, list) or not block_keys:
-                block_keys = _compute_block_keys(r.get("blocks") or [], r.get("block"))
-            block_keys = [str(b).strip() for b in block_keys if str(b).strip()]
-            if not block_keys:
-                continue
-
-            moa_codes = r.get("moa_codes")
-            if not isinstance(moa_codes, list) or not moa_codes:
-                moa_codes = _parse_moa_codes(r.get("mode_of_action") or "")
-            moa_codes = [_normalize_moa_code(c) for c in moa_codes if _normalize_moa_code(c)]
-            if not moa_codes:
-                continue
-
-            for bk in block_keys:
-                for code in moa_codes:
-                    k = (bk, code)
-                    per_block[k] = per_block.get(k, 0) + 1
-
-        # code -> max across blocks
-        max_by_code: dict[str, int] = {}
-        for (bk, code), cnt in per_block.items():
-            prev = max_by_code.get(code, 0)
-            if cnt > prev:
-                max_by_code[code] = cnt
-
+        resp = client.table("application_logs").select(_MOA_RISK_COLUMNS).execute()
+        max_by_code = _max_moa_counts(resp.data or [], year)
         return jsonify({"year": year, "counts": max_by_code})
     except Exception as e:
         error_msg = str(e)
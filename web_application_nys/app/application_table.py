@@ -0,0 +1,105 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Iterator, List, Mapping, Sequence, Tuple
+
+import numpy as np
+
+from .data import normalize_crop_key
+from .quantities import RANGE_COLUMNS, UNIT_COLUMNS, parse_application
+
+
+def iter_application_ids(records: Sequence[Dict[str, Any]]) -> Iterator[Tuple[int, int, Dict[str, Any]]]:
+    """(application id, record id, application) for every Application_Info dict, in record order."""
+
+    aid = 0
+    for rid, p in enumerate(records):
+        for app in p.get("Application_Info", []) or []:
+            if isinstance(app, dict):
+                yield aid, rid, app
+                aid += 1
+
+
+class ApplicationTable:
+    """Application_Info as parallel NumPy columns, built once per dataset generation.
+
+    Per application (indexed by application id, see iter_application_ids):
+    the owning record id, the parsed REI/PHI/rate/season quantities (NaN when
+    unknown) and their unit ids. Per (application, crop) pair: application
+    id and crop id. Crop ids index `names` (normalized keys); unit ids index
+    `units` (0 = no unit). Aggregations are array masks, `np.unique` and
+    `bincount` rather than a walk over nested dicts.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]], unit_lookup: Mapping[str, str]):
+        self.names: List[str] = []
+        self.name_ids: Dict[str, int] = {}
+        unit_ids: Dict[str, int] = {"": 0}
+
+        def name_id(key: str) -> int:
+            i = self.name_ids.get(key)
+            if i is None:
+                i = self.name_ids[key] = len(self.names)
+                self.names.append(key)
+            return i
+
+        app_record: List[int] = []
+        values: Dict[str, List[float]] = {c: [] for c in RANGE_COLUMNS}
+        units: Dict[str, List[int]] = {c: [] for c in UNIT_COLUMNS}
+        c_app: List[int] = []
+        c_crop: List[int] = []
+
+        for aid, rid, app in iter_application_ids(records):
+            app_record.append(rid)
+            q = parse_application(app, unit_lookup)
+            for column in RANGE_COLUMNS:
+                v = getattr(q, column)
+                values[column].append(np.nan if v is None else v)
+            for column, unit_column in UNIT_COLUMNS.items():
+                unit = getattr(q, unit_column)
+                units[column].append(unit_ids.setdefault(unit, len(unit_ids)))
+
+            crops: List[int] = []
+            for c in app.get("Target_Crop", []) or []:
+                if isinstance(c, dict):
+                    norm = normalize_crop_key(str(c.get("name") or "").strip())
+                    if norm:
+                        cid = name_id(norm)
+                        if cid not in crops:
+                            crops.append(cid)
+            c_app.extend([aid] * len(crops))
+            c_crop.extend(crops)
+
+        self.units = list(unit_ids)
+        self.app_record = np.asarray(app_record, dtype=np.int32)
+        self.columns = {c: np.asarray(v, dtype=np.float64) for c, v in values.items()}
+        self.unit_ids = {c: np.asarray(v, dtype=np.int32) for c, v in units.items()}
+        # (application, crop) rows
+        self.crop_app = np.asarray(c_app, dtype=np.int32)
+        self.crop_id = np.asarray(c_crop, dtype=np.int32)
+
+    @property
+    def nbytes(self) -> int:
+        arrays = [
+            self.app_record,
+            self.crop_app,
+            self.crop_id,
+            *self.columns.values(),
+            *self.unit_ids.values(),
+        ]
+        return sum(a.nbytes for a in arrays)
+
+    def crop_applications(self) -> Dict[str, np.ndarray]:
+        """Normalized crop -> sorted ids of the applications naming it."""
+
+        order = np.lexsort((self.crop_app, self.crop_id))
+        crops, starts = np.unique(self.crop_id[order], return_index=True)
+        groups = np.split(self.crop_app[order], starts[1:])
+        return {self.names[c]: ids for c, ids in zip(crops.tolist(), groups)}
+
+    def crop_label_counts(self) -> Dict[str, int]:
+        """Normalized crop -> distinct labels with an application naming it."""
+
+        n = len(self.names)
+        codes = np.unique(self.app_record[self.crop_app].astype(np.int64) * n + self.crop_id)
+        counts = np.bincount((codes % n).astype(np.int64), minlength=n)
+        return {self.names[c]: int(counts[c]) for c in np.flatnonzero(counts).tolist()}
@@ -1,11 +1,25 @@
 from __future__ import annotations
 
+import bisect
+import gc
+import hashlib
 import json
 import os
+import pickle
+import sys
+import threading
 import time
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
 from pathlib import Path
-from typing import Any, Dict, Iterable, List, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Mapping, Optional, Tuple
+
+from nys_mappings.keys import normalize_crop_key, remember_name_key
+
+from .json_cache import SerializedRecords
+from .moa import MoaMasks
+from .packed_corpus import LabelRecord, get_corpus_dir, pack_records, prune_segments, segments
+from .search_index import FuzzyIndex, PrefixIndex, TrigramIndex, fuzzy_available
 
 
 @dataclass
@@ -15,69 +29,61 @@ class DatasetStats:
     last_updated_ts: Optional[float]
 
 
-def normalize_crop_key(name: str) -> str:
-    """Normalize crop names to a stable, singular, lowercase key.
+def _symbol(value: Any, name_key: bool = False) -> Any:
+    """`value` as its interned string (other types unchanged); optionally record its normalized key."""
+
+    if type(value) is not str:
+        return value
+    value = sys.intern(value)
+    if name_key:
+        remember_name_key(value)
+    return value
+
+
+# Application_Info fields whose values repeat across labels
+_APP_SYMBOL_FIELDS = ("units", "REI", "PHI", "application_Method")
 
-    This is used for:
-    - de-duplicating crops (Apple/Apples, Grape/Grapes, etc.)
-    - matching user-selected crop filters against raw JSON crop names
+
+def intern_record(pesticide: Dict[str, Any]) -> None:
+    """Intern the strings a record shares with many others, in place.
+
+    Crop and target names, units, REI/PHI text and ingredient names/MOA codes
+    then exist once per process however many labels use them (the JSON
+    output is unchanged), and every crop/target name's normalized key is
+    computed here once instead of on every request.
     """
 
-    s = str(name or "").strip()
-    if not s:
-        return ""
+    for ing in pesticide.get("Active_Ingredients", []) or []:
+        if isinstance(ing, dict):
+            for field in ("name", "mode_Of_Action", "mode_of_action"):
+                if field in ing:
+                    ing[field] = _symbol(ing[field])
+    if isinstance(pesticide, LabelRecord):
+        return  # Application_Info is in the packed corpus; see seed_name_keys
+    for app in pesticide.get("Application_Info", []) or []:
+        if not isinstance(app, dict):
+            continue
+        for field in _APP_SYMBOL_FIELDS:
+            if field in app:
+                app[field] = _symbol(app[field])
+        for field in ("Target_Crop", "Target_Disease_Pest"):
+            for item in app.get(field, []) or []:
+                if isinstance(item, dict) and "name" in item:
+                    item["name"] = _symbol(item["name"], name_key=True)
 
-    # Remove parenthetical content (e.g. "Onion (green)")
-    if "(" in s:
-        s = s.split("(")[0].strip()
 
-    # Normalize whitespace
-    s = " ".join(s.split())
+def seed_name_keys(records: Iterable[Any]) -> None:
+    """Record the normalized keys of the crop/target names in the packed corpus behind `records`."""
+
+    for corpus in segments(records):
+        for name in corpus.terms():
+            _symbol(name, name_key=True)
 
-    # Special phrase-level plural fixes
-    phrase_map = {
-        "dry bulb onions": "dry bulb onion",
-        "green onions": "green onion",
-    }
-    low = s.lower()
-    if low in phrase_map:
-        return phrase_map[low]
-
-    # Normalize last token to singular (handles "Apples", "Strawberries", "Potatoes", etc.)
-    parts = low.split(" ")
-    last = parts[-1]
-
-    irregular = {
-        "strawberries": "strawberry",
-        "blueberries": "blueberry",
-        "raspberries": "raspberry",
-        "blackberries": "blackberry",
-        "cranberries": "cranberry",
-        "cherries": "cherry",
-        "potatoes": "potato",
-        "tomatoes": "tomato",
-        "grapes": "grape",
-        "apples": "apple",
-        "onions": "onion",
-        "soybeans": "soybean",
-        "pumpkins": "pumpkin",
-        "beans": "bean",
-    }
 
-    if last in irregular:
-        last = irregular[last]
-    elif last.endswith("ies") and len(last) > 3:
-        # berries -> berry
-        last = last[:-3] + "y"
-    elif last.endswith("oes") and len(last) > 3:
-        # potatoes -> potato, tomatoes -> tomato
-        last = last[:-2]
-    elif last.endswith("s") and len(last) > 3 and not last.endswith(("ss", "us", "is")):
-        # grapes -> grape, apples -> apple
-        last = last[:-1]
+def full_record(pesticide: Mapping[str, Any]) -> Dict[str, Any]:
+    """The record as a plain dict (decoding the packed corpus for lazily loaded labels)."""
 
-    parts[-1] = last
-    return " ".join(parts).strip()
+    return pesticide.to_dict() if isinstance(pesticide, LabelRecord) else pesticide
 
 
 def crop_display_name(name: str) -> str:
@@ -89,6 +95,57 @@ def crop_display_name(name: str) -> str:
     return key.title()
 
 
+# Everything the list/search/filter tables render; the same shape the Supabase
+# path returns from `label_index`. Details come from /api/pesticide-file.
+SUMMARY_FIELDS = ("_source_file", "epa_reg_no", "trade_Name", "company_name", "product_type", "Active_Ingredients")
+
+
+def pesticide_summary(pesticide: Dict[str, Any]) -> Dict[str, Any]:
+    """Lean projection of a record for list responses (no Application_Info).
+
+    Active ingredients keep only name and mode of action, matching the
+    `active_ingredients_json` column the Supabase builder writes.
+    """
+
+    ingredients = []
+    for ing in pesticide.get("Active_Ingredients", []) or []:
+        if not isinstance(ing, dict):
+            continue
+        name = str(ing.get("name") or ing.get("active_ingredient") or "").strip()
+        moa_raw = str(ing.get("mode_Of_Action") or ing.get("mode_of_action") or "").strip()
+        if name or moa_raw:
+            ingredients.append({k: v for k, v in {"name": name, "mode_Of_Action": moa_raw}.items() if v})
+
+    summary = {k: pesticide.get(k) for k in SUMMARY_FIELDS}
+    summary["Active_Ingredients"] = ingredients
+    return summary
+
+
+def parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    """Parse a `fields=` request value: None means the full record ("full" / "*")."""
+
+    names = tuple(f.strip() for f in (fields or "").split(",") if f.strip())
+    if any(f in ("full", "*") for f in names):
+        return None
+    return names
+
+
+def _record_crop_keys(pesticide: Dict[str, Any]) -> set:
+    """Normalized crop keys used anywhere in a record's Application_Info."""
+
+    keys: set = set()
+    for app in pesticide.get("Application_Info", []) or []:
+        if not isinstance(app, dict):
+            continue
+        for crop in app.get("Target_Crop", []) or []:
+            if not isinstance(crop, dict):
+                continue
+            norm = normalize_crop_key(str(crop.get("name") or "").strip())
+            if norm:
+                keys.add(norm)
+    return keys
+
+
 def _default_json_dir() -> Path:
     # web_application_nys/app/data.py -> web_application_nys -> ../altered_json
     here = Path(__file__).resolve()
@@ -103,27 +160,569 @@ def get_json_dir() -> Path:
     return _default_json_dir()
 
 
+# Bump whenever the pickled payload layout (records + indexes) changes.
+SNAPSHOT_VERSION = 2
+_SNAPSHOT_MAGIC = b"NYSSNAP"
+
+# filename -> (size, mtime_ns, content digest) for every file the store has read
+Manifest = Dict[str, Tuple[int, int, bytes]]
+
+
+def get_snapshot_path() -> Optional[Path]:
+    """Where the binary startup snapshot lives (None disables snapshots).
+
+    Defaults to `web_application_nys/.cache/store_snapshot.pkl`; override with
+    `NYS_SNAPSHOT_PATH`, or set `NYS_USE_SNAPSHOT=0` to always parse the JSON.
+    """
+
+    if os.environ.get("NYS_USE_SNAPSHOT", "1") != "1":
+        return None
+    override = os.environ.get("NYS_SNAPSHOT_PATH")
+    if override:
+        return Path(override).expanduser().resolve()
+    return Path(__file__).resolve().parents[1] / ".cache" / "store_snapshot.pkl"
+
+
+def scan_json_dir(json_dir: Path) -> Dict[str, Tuple[int, int]]:
+    """Return {filename: (size, mtime_ns)} for every *.json in `json_dir`, sorted by name."""
+
+    out: List[Tuple[str, Tuple[int, int]]] = []
+    with os.scandir(json_dir) as it:
+        for entry in it:
+            if entry.name.startswith(".") or not entry.name.endswith(".json") or not entry.is_file():
+                continue
+            st = entry.stat()
+            out.append((entry.name, (st.st_size, st.st_mtime_ns)))
+    out.sort()
+    return dict(out)
+
+
+def read_label_file(path: Path) -> Tuple[Optional[Dict[str, Any]], bytes]:
+    """Parse one altered_json file into a pesticide record.
+
+    Returns (record or None if unusable, content digest). The digest lets an
+    incremental reload skip files whose mtime changed but whose bytes did not.
+    """
+
+    try:
+        raw = path.read_bytes()
+    except OSError:
+        return None, b""
+    digest = hashlib.blake2b(raw, digest_size=16).digest()
+
+    try:
+        data = json.loads(raw)
+    except Exception:
+        return None, digest
+
+    # Expect the same overall shape as the existing pipeline output
+    pesticide = data.get("pesticide") if isinstance(data, dict) else None
+    if not isinstance(pesticide, dict):
+        return None, digest
+
+    # Normalize company field: prefer altered_json's `company_name`
+    # but keep backwards-compat with older keys.
+    if "company_name" not in pesticide or not str(pesticide.get("company_name") or "").strip():
+        if str(pesticide.get("COMPANY_NAME") or "").strip():
+            pesticide["company_name"] = pesticide.get("COMPANY_NAME")
+    if "COMPANY_NAME" not in pesticide or not str(pesticide.get("COMPANY_NAME") or "").strip():
+        if str(pesticide.get("company_name") or "").strip():
+            pesticide["COMPANY_NAME"] = pesticide.get("company_name")
+
+    # Add filename so the UI/debugging can reference the source
+    return {**pesticide, "_source_file": path.name}, digest
+
+
+def _index_keys(pesticide: Dict[str, Any]) -> Tuple[str, str, str, List[str]]:
+    """Return (epa, trade, company, ingredient names) index keys for one record."""
+
+    epa = str(pesticide.get("epa_reg_no") or "").strip().lower()
+    trade = str(pesticide.get("trade_Name") or "").strip().lower()
+    # Index by normalized company name (use `company_name`)
+    company = str(pesticide.get("company_name") or pesticide.get("COMPANY_NAME") or "").strip().lower()
+    ingredients: List[str] = []
+    for ing in pesticide.get("Active_Ingredients", []) or []:
+        if not isinstance(ing, dict):
+            continue
+        name = str(ing.get("name") or "").strip().lower()
+        if name:
+            ingredients.append(name)
+    return epa, trade, company, ingredients
+
+
+def _record_sort_key(r: Dict[str, Any]) -> Tuple[str, str]:
+    # Equivalent to a stable sort by trade name over filename-ordered records.
+    return str(r.get("trade_Name") or "").lower(), r["_source_file"]
+
+
+def _source_file_key(r: Dict[str, Any]) -> str:
+    return r["_source_file"]
+
+
+# Position-based partial indexes for one chunk of files: positions refer to the
+# chunk's own record list so they survive pickling back from a worker process.
+_PartialIndexes = Tuple[
+    List[Dict[str, Any]],
+    Dict[str, List[int]],
+    Dict[str, List[int]],
+    Dict[str, List[int]],
+    Dict[str, List[int]],
+    Dict[str, bytes],
+]
+
+
+def _parse_chunk(json_dir: str, names: List[str]) -> _PartialIndexes:
+    """Parse a chunk of files (in order) and index them by chunk-local position."""
+
+    records: List[Dict[str, Any]] = []
+    epa_pos: Dict[str, List[int]] = {}
+    trade_pos: Dict[str, List[int]] = {}
+    company_pos: Dict[str, List[int]] = {}
+    ingredient_pos: Dict[str, List[int]] = {}
+    digests: Dict[str, bytes] = {}
+
+    base = Path(json_dir)
+    for name in names:
+        pesticide, digests[name] = read_label_file(base / name)
+        if pesticide is None:
+            continue
+        i = len(records)
+        records.append(pesticide)
+
+        epa, trade, company, ingredients = _index_keys(pesticide)
+        if epa:
+            epa_pos.setdefault(epa, []).append(i)
+        if trade:
+            trade_pos.setdefault(trade, []).append(i)
+        if company:
+            company_pos.setdefault(company, []).append(i)
+        for ing_name in ingredients:
+            ingredient_pos.setdefault(ing_name, []).append(i)
+
+    return records, epa_pos, trade_pos, company_pos, ingredient_pos, digests
+
+
+# (parsed records, their content digests) -> the records the store keeps
+_Pack = Callable[[List[Dict[str, Any]], Dict[str, bytes]], List[Any]]
+
+
+def _merge_chunks(chunks: Iterable[_PartialIndexes], pack: Optional[_Pack] = None) -> Tuple[tuple, Dict[str, bytes]]:
+    """Merge file-ordered chunks into the store payload plus per-file digests.
+
+    The payload is (records, epa, file, trade, company, ingredient, epa_files).
+    Chunks must arrive in file order; merging them in that order reproduces the
+    serial loader exactly (same list order, same last-wins EPA collisions).
+    With `pack`, the indexes hold the records it returns (same order) instead
+    of the parsed dicts.
+    """
+
+    records: List[Dict[str, Any]] = []
+    epa_index: Dict[str, Dict[str, Any]] = {}
+    file_index: Dict[str, Dict[str, Any]] = {}
+    trade_index: Dict[str, List[Dict[str, Any]]] = {}
+    company_index: Dict[str, List[Dict[str, Any]]] = {}
+    ingredient_index: Dict[str, List[Dict[str, Any]]] = {}
+    # epa -> every source file carrying it (file order); the last one wins
+    epa_files: Dict[str, List[str]] = {}
+    digests: Dict[str, bytes] = {}
+
+    chunks = list(chunks)
+    for chunk in chunks:
+        digests.update(chunk[5])
+        for pesticide in chunk[0]:
+            # Here rather than in `_parse_chunk`: worker processes have their own symbol tables.
+            intern_record(pesticide)
+    if pack is not None:
+        packed = iter(pack([p for chunk in chunks for p in chunk[0]], digests))
+        chunks = [([next(packed) for _ in chunk[0]], *chunk[1:]) for chunk in chunks]
+
+    for chunk_records, epa_pos, trade_pos, company_pos, ingredient_pos, _ in chunks:
+        records.extend(chunk_records)
+        for pesticide in chunk_records:
+            # Exact lookup by source filename (unique per JSON/PDF)
+            file_index[pesticide["_source_file"]] = pesticide
+        for key, positions in epa_pos.items():
+            epa_index[key] = chunk_records[positions[-1]]
+            epa_files.setdefault(key, []).extend(chunk_records[i]["_source_file"] for i in positions)
+        for partial, index in (
+            (trade_pos, trade_index),
+            (company_pos, company_index),
+            (ingredient_pos, ingredient_index),
+        ):
+            for key, positions in partial.items():
+                index.setdefault(key, []).extend(chunk_records[i] for i in positions)
+
+    # Stable sort by trade name for consistent pagination
+    records.sort(key=lambda r: str(r.get("trade_Name") or "").lower())
+
+    payload = (records, epa_index, file_index, trade_index, company_index, ingredient_index, epa_files)
+    return payload, digests
+
+
+def _load_fingerprint(payload: tuple, digests: Dict[str, bytes]) -> Dict[str, Any]:
+    """A merged load as comparable, identity-free structures (records, order, every index by source file)."""
+
+    records, epa_index, file_index, trade_index, company_index, ingredient_index, epa_files = payload
+
+    def files(items: List[Dict[str, Any]]) -> List[str]:
+        return [r["_source_file"] for r in items]
+
+    return {
+        "records": records,
+        "order": files(records),
+        "epa": [(k, v["_source_file"]) for k, v in epa_index.items()],
+        "file": list(file_index),
+        "trade": [(k, files(v)) for k, v in trade_index.items()],
+        "company": [(k, files(v)) for k, v in company_index.items()],
+        "ingredient": [(k, files(v)) for k, v in ingredient_index.items()],
+        "epa_files": list(epa_files.items()),
+        "digests": digests,
+    }
+
+
+def check_parallel_matches_serial(chunks: List[_PartialIndexes], serial: _PartialIndexes) -> None:
+    """Raise RuntimeError unless merging `chunks` gives exactly the serial parse of the same files.
+
+    Compares the records, their order and `_source_file` values, and every
+    index (keys in order, records by source file).
+    """
+
+    parallel_fp = _load_fingerprint(*_merge_chunks(chunks))
+    serial_fp = _load_fingerprint(*_merge_chunks([serial]))
+    for key, expected in serial_fp.items():
+        if parallel_fp[key] != expected:
+            raise RuntimeError(f"Parallel load differs from the serial load in {key!r}")
+
+
+def _chunked(names: List[str], workers: int) -> List[List[str]]:
+    # A few chunks per worker keeps the pool busy when file sizes are uneven.
+    size = max(1, -(-len(names) // (workers * 4)))
+    return [names[i : i + size] for i in range(0, len(names), size)]
+
+
+def _remove_identity(items: List[Dict[str, Any]], record: Dict[str, Any]) -> None:
+    """Remove every occurrence of `record` (by identity) from a file-ordered list."""
+
+    i = bisect.bisect_left(items, record["_source_file"], key=_source_file_key)
+    while i < len(items) and items[i]["_source_file"] == record["_source_file"]:
+        if items[i] is record:
+            del items[i]
+        else:
+            i += 1
+
+
+def _manifest_id(manifest: Manifest) -> str:
+    """Content-derived id: identical JSON contents give the same id in every process."""
+
+    h = hashlib.blake2b(digest_size=8)
+    for name in sorted(manifest):
+        h.update(name.encode("utf-8"))
+        h.update(manifest[name][2])
+    return h.hexdigest()
+
+
+class DatasetGeneration:
+    """One fully indexed, read-only view of the JSON directory.
+
+    A generation is never mutated after it is published: reloads build a new
+    one (copying only what they change) and swap the store's reference, so a
+    reader that grabbed a generation keeps a consistent view for as long as it
+    holds it. `derived` holds caches computed lazily from this generation.
+    """
+
+    __slots__ = (
+        "records",
+        "epa_index",
+        "file_index",
+        "trade_index",
+        "company_index",
+        "ingredient_index",
+        "epa_files",
+        "manifest",
+        "id",
+        "derived",
+    )
+
+    def __init__(self, payload: tuple, manifest: Manifest, derived: Optional[Dict[str, Any]] = None):
+        (
+            self.records,
+            self.epa_index,
+            self.file_index,
+            self.trade_index,
+            self.company_index,
+            self.ingredient_index,
+            self.epa_files,
+        ) = payload
+        self.manifest = manifest
+        self.id = _manifest_id(manifest)
+        self.derived: Dict[str, Any] = {} if derived is None else derived
+
+    def payload(self) -> tuple:
+        return (
+            self.records,
+            self.epa_index,
+            self.file_index,
+            self.trade_index,
+            self.company_index,
+            self.ingredient_index,
+            self.epa_files,
+        )
+
+    def crop_refs(self) -> Dict[str, int]:
+        """normalized crop -> number of records mentioning it (built on first use)."""
+
+        refs = self.derived.get("crop_refs")
+        if refs is None:
+            refs = {}
+            for p in self.records:
+                for norm in _record_crop_keys(p):
+                    refs[norm] = refs.get(norm, 0) + 1
+            self.derived["crop_refs"] = refs
+        return refs
+
+    def crops(self) -> List[str]:
+        crops = self.derived.get("crops")
+        if crops is None:
+            crops = sorted((k.title() for k in self.crop_refs()), key=lambda x: x.lower())
+            self.derived["crops"] = crops
+        return crops
+
+    def summaries(self) -> Dict[int, Dict[str, Any]]:
+        """id(record) -> `pesticide_summary(record)`; ids are stable while this generation lives."""
+
+        out = self.derived.get("summaries")
+        if out is None:
+            out = self.derived["summaries"] = {id(p): pesticide_summary(p) for p in self.records}
+        return out
+
+    def search_index(self) -> TrigramIndex:
+        index = self.derived.get("search")
+        if index is None:
+            index = self.derived["search"] = TrigramIndex(self.records)
+        return index
+
+    def moa_masks(self) -> MoaMasks:
+        masks = self.derived.get("moa_masks")
+        if masks is None:
+            masks = self.derived["moa_masks"] = MoaMasks(self.records)
+        return masks
+
+    def prefix_index(self) -> PrefixIndex:
+        index = self.derived.get("prefix")
+        if index is None:
+            index = self.derived["prefix"] = PrefixIndex(self._suggest_vocabularies())
+        return index
+
+    def fuzzy_index(self) -> Optional[FuzzyIndex]:
+        """None when rapidfuzz is not installed."""
+
+        if not fuzzy_available():
+            return None
+        index = self.derived.get("fuzzy")
+        if index is None:
+            index = self.derived["fuzzy"] = FuzzyIndex(
+                {"trade_Name": self.trade_index, "active_ingredient": self.ingredient_index}
+            )
+        return index
+
+    def _suggest_vocabularies(self) -> Dict[str, Dict[str, Tuple[str, int]]]:
+        """Display value (as written on the first label, by filename) and label count per key."""
+
+        def ingredient_name(record: Dict[str, Any], key: str) -> str:
+            for ing in record.get("Active_Ingredients", []) or []:
+                if isinstance(ing, dict):
+                    name = str(ing.get("name") or "").strip()
+                    if name.lower() == key:
+                        return name
+            return key
+
+        return {
+            "trade_Name": {
+                k: (str(v[0].get("trade_Name") or "").strip(), len(v)) for k, v in self.trade_index.items()
+            },
+            "company": {
+                k: (str(v[0].get("company_name") or v[0].get("COMPANY_NAME") or "").strip(), len(v))
+                for k, v in self.company_index.items()
+            },
+            "active_ingredient": {
+                k: (ingredient_name(v[0], k), len(v)) for k, v in self.ingredient_index.items()
+            },
+            "epa_reg_no": {
+                k: (str(v.get("epa_reg_no") or "").strip(), len(self.epa_files.get(k, ())))
+                for k, v in self.epa_index.items()
+            },
+        }
+
+    def warm(self) -> None:
+        """Build the lazily derived indexes now instead of on the first request."""
+
+        self.summaries()
+        self.search_index()
+        self.prefix_index()
+        self.fuzzy_index()
+
+
+class _GenerationPatch:
+    """Copy-on-write builder that applies a file diff on top of a base generation.
+
+    Containers are shallow-copied up front and individual index lists are
+    copied the first time they are touched, so the base generation (which
+    readers may still be iterating) is never modified.
+    """
+
+    def __init__(self, base: DatasetGeneration):
+        self.records = list(base.records)
+        self.epa_index = dict(base.epa_index)
+        self.file_index = dict(base.file_index)
+        self.trade_index = dict(base.trade_index)
+        self.company_index = dict(base.company_index)
+        self.ingredient_index = dict(base.ingredient_index)
+        self.epa_files = dict(base.epa_files)
+        base_refs = base.derived.get("crop_refs")
+        self.crop_refs: Optional[Dict[str, int]] = dict(base_refs) if base_refs is not None else None
+        self._owned: set = set()
+
+    def _own(self, index: Dict[str, list], key: str) -> Optional[list]:
+        items = index.get(key)
+        if items is not None and (id(index), key) not in self._owned:
+            items = index[key] = list(items)
+            self._owned.add((id(index), key))
+        return items
+
+    def index(self, record: Dict[str, Any]) -> None:
+        name = record["_source_file"]
+        bisect.insort(self.records, record, key=_record_sort_key)
+        self.file_index[name] = record
+
+        epa, trade, company, ingredients = _index_keys(record)
+        if epa:
+            files = self._own(self.epa_files, epa)
+            if files is None:
+                files = self.epa_files[epa] = []
+                self._owned.add((id(self.epa_files), epa))
+            bisect.insort(files, name)
+            self.epa_index[epa] = self.file_index[files[-1]]
+        for index, key in (
+            (self.trade_index, trade),
+            (self.company_index, company),
+            *((self.ingredient_index, ing) for ing in ingredients),
+        ):
+            if not key:
+                continue
+            items = self._own(index, key)
+            if items is None:
+                items = index[key] = []
+                self._owned.add((id(index), key))
+            bisect.insort(items, record, key=_source_file_key)
+
+        self._patch_crop_refs(record, +1)
+
+    def unindex(self, record: Dict[str, Any]) -> None:
+        name = record["_source_file"]
+        i = bisect.bisect_left(self.records, _record_sort_key(record), key=_record_sort_key)
+        if i < len(self.records) and self.records[i] is record:
+            del self.records[i]
+        if self.file_index.get(name) is record:
+            del self.file_index[name]
+
+        epa, trade, company, ingredients = _index_keys(record)
+        files = self._own(self.epa_files, epa) if epa else None
+        if files is not None:
+            if name in files:
+                files.remove(name)
+            if files:
+                self.epa_index[epa] = self.file_index[files[-1]]
+            else:
+                del self.epa_files[epa]
+                self.epa_index.pop(epa, None)
+        for index, key in (
+            (self.trade_index, trade),
+            (self.company_index, company),
+            *((self.ingredient_index, ing) for ing in ingredients),
+        ):
+            items = self._own(index, key)
+            if items is None:
+                continue
+            _remove_identity(items, record)
+            if not items:
+                del index[key]
+
+        self._patch_crop_refs(record, -1)
+
+    def _patch_crop_refs(self, record: Dict[str, Any], delta: int) -> None:
+        if self.crop_refs is None:
+            return  # the base never built its crop list; the new generation builds lazily
+        for norm in _record_crop_keys(record):
+            n = self.crop_refs.get(norm, 0) + delta
+            if n > 0:
+                self.crop_refs[norm] = n
+            else:
+                self.crop_refs.pop(norm, None)
+
+    def finish(self, manifest: Manifest) -> DatasetGeneration:
+        payload = (
+            self.records,
+            self.epa_index,
+            self.file_index,
+            self.trade_index,
+            self.company_index,
+            self.ingredient_index,
+            self.epa_files,
+        )
+        derived = {} if self.crop_refs is None else {"crop_refs": self.crop_refs}
+        return DatasetGeneration(payload, manifest, derived)
+
+
 class JsonPesticideStore:
-    """Loads NYS pesticide JSON files and provides simple indexed lookups."""
+    """Loads NYS pesticide JSON files and provides simple indexed lookups.
+
+    All indexes live in an immutable `DatasetGeneration`. Reloads build the
+    next generation off to the side (incrementally: only added or changed
+    files are parsed, using a manifest of size, mtime and content digest) and
+    publish it with a single reference swap, so readers never block on a
+    reload and never see a half-built index. With `start_refresher()` the
+    reload happens on a background thread instead of on a request.
+
+    With `lazy_details`, records are `LabelRecord`s: Application_Info,
+    Safety_Information and PPE are written to a packed corpus file under
+    `corpus_dir` and read back (memory-mapped) only when accessed.
+    """
 
-    def __init__(self, json_dir: Optional[Path] = None, cache_seconds: int = 0):
+    def __init__(
+        self,
+        json_dir: Optional[Path] = None,
+        cache_seconds: int = 0,
+        snapshot_path: Optional[Path] = None,
+        use_snapshot: bool = True,
+        load_workers: int = 0,
+        detail_cache_bytes: int = 64 << 20,
+        lazy_details: bool = False,
+        corpus_dir: Optional[Path] = None,
+        verify_parallel_load: bool = False,
+    ):
         self.json_dir = json_dir or get_json_dir()
         self.cache_seconds = cache_seconds
+        # 0/1 = parse serially; N > 1 = parse in a pool of N processes.
+        self.load_workers = load_workers
+        # Debug: also parse serially after each parallel parse and compare (see check_parallel_matches_serial).
+        self.verify_parallel_load = verify_parallel_load
+        self.snapshot_path = (snapshot_path or get_snapshot_path()) if use_snapshot else None
+        self.corpus_dir = (corpus_dir or get_corpus_dir()) if lazy_details else None
 
+        # Serialized detail bodies, bounded by total bytes (0 disables caching).
+        self.detail_cache = SerializedRecords(detail_cache_bytes)
+
+        self._gen: Optional[DatasetGeneration] = None
         self._loaded_at: float = 0
-        self._records: List[Dict[str, Any]] = []
-        self._epa_index: Dict[str, Dict[str, Any]] = {}
-        self._file_index: Dict[str, Dict[str, Any]] = {}
-        self._trade_index: Dict[str, List[Dict[str, Any]]] = {}
-        self._company_index: Dict[str, List[Dict[str, Any]]] = {}
-        self._ingredient_index: Dict[str, List[Dict[str, Any]]] = {}
-        # Derived caches (computed lazily)
-        self._crops_cache: Optional[List[str]] = None
+        # Serializes builders only; readers never take it.
+        self._build_lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+        self._refresher_stop = threading.Event()
 
     def _needs_reload(self) -> bool:
-        if not self._records:
+        if self._gen is None or not self._gen.records:
             return True
-        if self.cache_seconds <= 0:
+        if self.cache_seconds <= 0 or self._refresher is not None:
             return False
         return (time.time() - self._loaded_at) > self.cache_seconds
 
@@ -131,84 +730,247 @@ class JsonPesticideStore:
         if not force and not self._needs_reload():
             return
 
+        if self._gen is not None and not force:
+            # Stale but usable: one thread rebuilds, the others keep serving
+            # the current generation instead of queueing behind the lock.
+            if not self._build_lock.acquire(blocking=False):
+                return
+        else:
+            self._build_lock.acquire()
+        try:
+            if force or self._needs_reload():
+                self._rebuild(force)
+        finally:
+            self._build_lock.release()
+
+    def refresh(self) -> bool:
+        """Pick up JSON changes now; returns True if a new generation was published."""
+
+        with self._build_lock:
+            before = self._gen
+            self._rebuild(force=False)
+            # Off the request path, so pay for the derived indexes before readers do.
+            self._gen.warm()
+            return self._gen is not before and (before is None or self._gen.id != before.id)
+
+    def generation(self) -> DatasetGeneration:
+        """Return the current generation (loading it first if needed)."""
+
+        self.load()
+        gen = self._gen
+        assert gen is not None
+        return gen
+
+    def start_refresher(self, interval: float) -> None:
+        """Poll the JSON directory every `interval` seconds on a daemon thread."""
+
+        if self._refresher is not None or interval <= 0:
+            return
+        self.load()
+        self._refresher_stop.clear()
+
+        def run() -> None:
+            while not self._refresher_stop.wait(interval):
+                try:
+                    self.refresh()
+                except Exception:
+                    # Keep serving the last good generation; try again next tick.
+                    continue
+
+        self._refresher = threading.Thread(target=run, name="nys-store-refresher", daemon=True)
+        self._refresher.start()
+
+    def stop_refresher(self) -> None:
+        thread = self._refresher
+        if thread is None:
+            return
+        self._refresher_stop.set()
+        thread.join()
+        self._refresher = None
+
+    def _rebuild(self, force: bool) -> None:
+        """Build and publish the next generation (caller holds `_build_lock`)."""
+
         if not self.json_dir.exists() or not self.json_dir.is_dir():
             raise FileNotFoundError(f"JSON directory not found: {self.json_dir}")
 
-        records: List[Dict[str, Any]] = []
-        epa_index: Dict[str, Dict[str, Any]] = {}
-        file_index: Dict[str, Dict[str, Any]] = {}
-        trade_index: Dict[str, List[Dict[str, Any]]] = {}
-        company_index: Dict[str, List[Dict[str, Any]]] = {}
-        ingredient_index: Dict[str, List[Dict[str, Any]]] = {}
+        scan = scan_json_dir(self.json_dir)
+        base = None if force else self._gen
+
+        if base is None:
+            snapshot = None if force else self._read_snapshot()
+            if snapshot is None:
+                payload, digests = self._parse_all(list(scan))
+                manifest = {name: (*stat, digests.get(name, b"")) for name, stat in scan.items()}
+                self._gen = DatasetGeneration(payload, manifest)
+                self._write_snapshot(self._gen)
+                self._prune_corpus(self._gen)
+            else:
+                # A stale snapshot is still a good base: only the diff is parsed.
+                base = DatasetGeneration(*snapshot)
+                self._gen = self._apply_diff(base, scan)
+                if self._gen is not base:
+                    self._write_snapshot(self._gen)
+                    self._prune_corpus(self._gen)
+            self._gen.warm()
+        else:
+            self._gen = self._apply_diff(base, scan)
 
-        for p in sorted(self.json_dir.glob("*.json")):
-            try:
-                data = json.loads(p.read_text(encoding="utf-8"))
-            except Exception:
-                continue
+        self._loaded_at = time.time()
 
-            # Expect the same overall shape as the existing pipeline output
-            pesticide = data.get("pesticide") if isinstance(data, dict) else None
-            if not isinstance(pesticide, dict):
-                continue
+    def _parse_all(self, names: List[str]) -> Tuple[tuple, Dict[str, bytes]]:
+        """Parse every file, serially or across `load_workers` processes."""
 
-            # Normalize company field: prefer altered_json's `company_name`
-            # but keep backwards-compat with older keys.
-            if "company_name" not in pesticide or not str(pesticide.get("company_name") or "").strip():
-                if str(pesticide.get("COMPANY_NAME") or "").strip():
-                    pesticide["company_name"] = pesticide.get("COMPANY_NAME")
-            if "COMPANY_NAME" not in pesticide or not str(pesticide.get("COMPANY_NAME") or "").strip():
-                if str(pesticide.get("company_name") or "").strip():
-                    pesticide["COMPANY_NAME"] = pesticide.get("company_name")
+        json_dir = str(self.json_dir)
+        pack = self._pack if self.corpus_dir is not None else None
+        if self.load_workers <= 1 or len(names) < 2:
+            return _merge_chunks([_parse_chunk(json_dir, names)], pack)
 
-            # Add filename so the UI/debugging can reference the source
-            pesticide = {**pesticide, "_source_file": p.name}
-            records.append(pesticide)
+        chunks = _chunked(names, self.load_workers)
+        with ProcessPoolExecutor(max_workers=self.load_workers) as pool:
+            # `map` yields in submission order, which keeps the merge deterministic.
+            parsed = list(pool.map(_parse_chunk, [json_dir] * len(chunks), chunks))
+        if self.verify_parallel_load:
+            check_parallel_matches_serial(parsed, _parse_chunk(json_dir, names))
+        return _merge_chunks(parsed, pack)
 
-            epa = str(pesticide.get("epa_reg_no") or "").strip()
-            if epa:
-                epa_index[epa.lower()] = pesticide
+    def _pack(self, records: List[Dict[str, Any]], digests: Dict[str, bytes]) -> List[Any]:
+        """Lazy mode: move the records' heavy sections into a packed corpus segment."""
 
-            # Exact lookup by source filename (unique per JSON/PDF)
-            file_index[p.name] = pesticide
+        assert self.corpus_dir is not None
+        return pack_records(records, digests, self.corpus_dir)
 
-            trade = str(pesticide.get("trade_Name") or "").strip().lower()
-            if trade:
-                trade_index.setdefault(trade, []).append(pesticide)
+    def _prune_corpus(self, gen: DatasetGeneration) -> None:
+        """Lazy mode: drop corpus segments the published generation no longer reads."""
 
-            # Index by normalized company name (use `company_name`)
-            company = str(pesticide.get("company_name") or pesticide.get("COMPANY_NAME") or "").strip().lower()
-            if company:
-                company_index.setdefault(company, []).append(pesticide)
+        if self.corpus_dir is not None:
+            prune_segments(self.corpus_dir, segments(gen.records))
 
-            for ing in pesticide.get("Active_Ingredients", []) or []:
-                if not isinstance(ing, dict):
-                    continue
-                name = str(ing.get("name") or "").strip().lower()
-                if name:
-                    ingredient_index.setdefault(name, []).append(pesticide)
-
-        # Stable sort by trade name for consistent pagination
-        records.sort(key=lambda r: str(r.get("trade_Name") or "").lower())
-
-        self._records = records
-        self._epa_index = epa_index
-        self._file_index = file_index
-        self._trade_index = trade_index
-        self._company_index = company_index
-        self._ingredient_index = ingredient_index
-        self._loaded_at = time.time()
-        self._crops_cache = None
+    def _apply_diff(self, base: DatasetGeneration, scan: Dict[str, Tuple[int, int]]) -> DatasetGeneration:
+        """Return `base` patched with the files that differ from its manifest.
+
+        Only added or changed files are read; files whose mtime moved but whose
+        content digest is unchanged are just re-stamped in the manifest.
+        """
+
+        removed = [name for name in base.manifest if name not in scan]
+        upserts: List[Dict[str, Any]] = []
+        dropped: List[str] = []
+        manifest = dict(base.manifest)
+        for name in removed:
+            del manifest[name]
+
+        for name, stat in scan.items():
+            known = manifest.get(name)
+            if known is not None and known[:2] == stat:
+                continue
+            record, digest = read_label_file(self.json_dir / name)
+            manifest[name] = (*stat, digest)
+            if known is not None and known[2] == digest:
+                continue  # touched, not changed
+            if record is not None:
+                intern_record(record)
+                upserts.append(record)
+            elif name in base.file_index:
+                dropped.append(name)  # became unparseable
+        if upserts and self.corpus_dir is not None:
+            upserts = self._pack(upserts, {r["_source_file"]: manifest[r["_source_file"]][2] for r in upserts})
+
+        if not removed and not upserts and not dropped:
+            if manifest == base.manifest:
+                return base
+            # Same data, fresher stamps: keep sharing the indexes and derived caches.
+            return DatasetGeneration(base.payload(), manifest, base.derived)
+
+        patch = _GenerationPatch(base)
+        for name in removed + dropped:
+            old = patch.file_index.get(name)
+            if old is not None:
+                patch.unindex(old)
+        for record in upserts:
+            old = patch.file_index.get(record["_source_file"])
+            if old is not None:
+                patch.unindex(old)
+            patch.index(record)
+        return patch.finish(manifest)
+
+    def _read_snapshot(self) -> Optional[Tuple[tuple, Manifest]]:
+        """Return (payload, manifest) from the snapshot if it belongs to this directory."""
+
+        if self.snapshot_path is None:
+            return None
+        header = self._snapshot_header()
+        try:
+            with self.snapshot_path.open("rb") as f:
+                buf = f.read()
+        except OSError:
+            return None
+        if not buf.startswith(header):
+            return None
+
+        # Unpickling allocates millions of small containers; the cyclic GC
+        # would otherwise rescan them repeatedly while the payload is built.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            payload, manifest = pickle.loads(memoryview(buf)[len(header):])
+            for record in payload[0]:
+                intern_record(record)
+            seed_name_keys(payload[0])
+            return payload, manifest
+        except Exception:
+            return None
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _write_snapshot(self, gen: DatasetGeneration) -> None:
+        if self.snapshot_path is None:
+            return
+        tmp = self.snapshot_path.with_name(f"{self.snapshot_path.name}.{os.getpid()}.tmp")
+        try:
+            self.snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+            with tmp.open("wb") as f:
+                f.write(self._snapshot_header())
+                pickle.dump((gen.payload(), gen.manifest), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp, self.snapshot_path)
+        except OSError:
+            # Snapshot is only an accelerator; a read-only checkout still works.
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+
+    def _snapshot_header(self) -> bytes:
+        # Lazy and eager stores pickle different records; neither reads the other's snapshot.
+        source = f"{self.json_dir}\0lazy" if self.corpus_dir is not None else str(self.json_dir)
+        dir_key = hashlib.blake2b(source.encode("utf-8"), digest_size=16).digest()
+        return _SNAPSHOT_MAGIC + SNAPSHOT_VERSION.to_bytes(2, "little") + dir_key
+
+    def project(self, items: List[Dict[str, Any]], fields: Optional[str] = None) -> List[Dict[str, Any]]:
+        """Summaries of `items` plus any top-level `fields` (comma-separated; "full" = whole record)."""
+
+        extra = parse_fields(fields)
+        if extra is None:
+            return [full_record(p) for p in items]
+        summaries = self.generation().summaries()
+        out = []
+        for p in items:
+            summary = summaries.get(id(p))
+            if summary is None:
+                summary = pesticide_summary(p)  # record from a generation published since
+            if extra:
+                summary = {**summary, **{k: p[k] for k in extra if k in p}}
+            out.append(summary)
+        return out
 
     def all_records(self) -> List[Dict[str, Any]]:
-        self.load()
-        return self._records
+        return self.generation().records
 
     def iter_applications(self) -> Iterable[Tuple[Dict[str, Any], Dict[str, Any]]]:
         """Yield (pesticide, application_info_entry)."""
 
-        self.load()
-        for p in self._records:
+        for p in self.generation().records:
             for app in p.get("Application_Info", []) or []:
                 if isinstance(app, dict):
                     yield p, app
@@ -216,76 +978,85 @@ class JsonPesticideStore:
     def list_crops(self) -> List[str]:
         """Return unique crop names (title-cased) from Application_Info.Target_Crop."""
 
-        self.load()
-        if self._crops_cache is not None:
-            return self._crops_cache
-
-        # norm_key -> display
-        crops: Dict[str, str] = {}
-        for _, app in self.iter_applications():
-            for crop in app.get("Target_Crop", []) or []:
-                if not isinstance(crop, dict):
-                    continue
-                raw = str(crop.get("name") or "").strip()
-                norm = normalize_crop_key(raw)
-                if not norm:
-                    continue
-                # Preserve a consistent display name (singular + title case)
-                crops.setdefault(norm, crop_display_name(raw))
-
-        self._crops_cache = sorted(crops.values(), key=lambda x: x.lower())
-        return self._crops_cache
+        return self.generation().crops()
 
     def stats(self) -> DatasetStats:
-        self.load()
+        gen = self.generation()
         json_files = list(self.json_dir.glob("*.json"))
         last_updated = None
         if json_files:
             last_updated = max((f.stat().st_mtime for f in json_files), default=None)
         return DatasetStats(
             total_files=len(json_files),
-            total_records=len(self._records),
+            total_records=len(gen.records),
             last_updated_ts=last_updated,
         )
 
     def list_page(self, page: int, per_page: int) -> Tuple[List[Dict[str, Any]], int]:
-        self.load()
+        records = self.generation().records
         if per_page <= 0:
             per_page = 50
         per_page = min(per_page, 500)
         page = max(page, 1)
 
-        total = len(self._records)
+        total = len(records)
         start = (page - 1) * per_page
         end = start + per_page
-        return self._records[start:end], total
+        return records[start:end], total
 
     def get_by_epa(self, epa_reg_no: str) -> Optional[Dict[str, Any]]:
-        self.load()
+        gen = self.generation()
         key = (epa_reg_no or "").strip().lower()
         if not key:
             return None
-        return self._epa_index.get(key)
+        return gen.epa_index.get(key)
+
+    def detail_body(
+        self, source_file: str = "", epa_reg_no: str = "", encoding: str = ""
+    ) -> Optional[Tuple[str, bytes]]:
+        """(ETag, serialized JSON) for one record, served from the bytes cache.
+
+        The record and its content digest come from the same generation, so
+        an ETag always matches the bytes it is sent with.
+        """
+
+        gen = self.generation()
+        if source_file:
+            record = gen.file_index.get(source_file.strip())
+        else:
+            record = gen.epa_index.get((epa_reg_no or "").strip().lower())
+        if record is None:
+            return None
+        name = record["_source_file"]
+        entry = gen.manifest.get(name)
+        key = (name, entry[2].hex() if entry and entry[2] else gen.id)
+        return self.detail_cache.etag(key, encoding), self.detail_cache.body(key, record, encoding)
 
     def get_by_source_file(self, source_file: str) -> Optional[Dict[str, Any]]:
         """Lookup a pesticide by its JSON filename (exact match)."""
-        self.load()
+        gen = self.generation()
         key = (source_file or "").strip()
         if not key:
             return None
-        return self._file_index.get(key)
+        return gen.file_index.get(key)
+
+    def suggest(self, prefix: str, limit: int = 8) -> Dict[str, List[Dict[str, Any]]]:
+        """Names starting with `prefix`, per search type, for search-as-you-type."""
+
+        q = (prefix or "").strip().lower()
+        if not q:
+            return {}
+        limit = min(max(int(limit), 1), 25)
+        return self.generation().prefix_index().suggest(q, limit)
 
     def search(self, query: str, search_type: str = "both", limit: int = 200) -> List[Dict[str, Any]]:
-        self.load()
+        gen = self.generation()
         q = (query or "").strip().lower()
         if not q:
             return []
 
         limit = min(max(int(limit), 1), 500)
 
-        def contains(text: Any) -> bool:
-            return q in str(text or "").lower()
-
         results: List[Dict[str, Any]] = []
         seen: set[int] = set()
 
@@ -301,64 +1072,45 @@ class JsonPesticideStore:
 
         # Exact-key indices
         if search_type == "epa_reg_no":
-            hit = self._epa_index.get(q)
+            hit = gen.epa_index.get(q)
             if hit:
                 return [hit]
-            # fallback partial scan
-            for r in self._records:
-                if contains(r.get("epa_reg_no")):
-                    add_many([r])
-            return results
+            # fallback partial match (trigram candidates, verified)
+            return gen.search_index().epa_contains(q, limit)
 
         if search_type == "trade_Name":
-            add_many(self._trade_index.get(q, []))
+            add_many(gen.trade_index.get(q, []))
             if results:
                 return results
 
         if search_type == "company":
-            add_many(self._company_index.get(q, []))
+            add_many(gen.company_index.get(q, []))
             if results:
                 return results
 
         if search_type == "active_ingredient":
-            add_many(self._ingredient_index.get(q, []))
+            add_many(gen.ingredient_index.get(q, []))
             if results:
                 return results
 
-        # "both" (and any unknown type) => partial scan with lightweight ranking
-        scored: List[Tuple[float, Dict[str, Any]]] = []
-        for r in self._records:
-            score = 0.0
-            trade = r.get("trade_Name")
-            epa = r.get("epa_reg_no")
-            company = r.get("company_name") or r.get("COMPANY_NAME")
-
-            tl = str(trade or "").lower()
-            if tl == q:
-                score += 10
-            elif tl.startswith(q):
-                score += 6
-            elif q in tl:
-                score += 4
-
-            el = str(epa or "").lower()
-            if el == q:
-                score += 8
-            elif q in el:
-                score += 3
-
-            if q in str(company or "").lower():
-                score += 1
-
-            if score == 0:
-                # Try ingredients
-                for ing in r.get("Active_Ingredients", []) or []:
-                    if isinstance(ing, dict) and q in str(ing.get("name") or "").lower():
-                        score += 2
-                        break
-
-            if score > 0:
-                scored.append((score, r))
-
-        scored.sort(key=lambda t: t[0], reverse=True)
-        return [r for _, r in scored[:limit]]
+        if search_type == "fuzzy":
+            # Typo-tolerant trade name / ingredient match; without rapidfuzz, use "both".
+            fuzzy = gen.fuzzy_index()
+            if fuzzy is not None:
+                return fuzzy.search(q, limit)
+
+        # "both" (and any unknown type) => partial match with lightweight ranking
+        return gen.search_index().search(q, limit)
+
+
+def freeze_heap() -> None:
+    """Move every object allocated so far out of the cyclic GC's reach (call right before forking).
+
+    A collection in a forked worker would otherwise write to the GC header of
+    each tracked object it visits, copying the parent's pages into every
+    worker. Frozen objects are never collected, so only call this once the
+    long-lived dataset is loaded.
+    """
+
+    gc.collect()
+    gc.freeze()
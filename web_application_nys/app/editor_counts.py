@@ -0,0 +1,142 @@
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict, Mapping, Optional, Sequence, Set, Tuple
+
+from .data import normalize_crop_key
+
+# (normalized original crop, normalized target name) as found together in one application
+Pair = Tuple[str, str]
+# (unified crop norm, display target type lower, refined target lower)
+Bucket = Tuple[str, str, str]
+
+
+def _bucket(
+    pair: Pair, target_mapping: Mapping[Pair, Mapping[str, Any]], unified: Mapping[str, str]
+) -> Optional[Bucket]:
+    """Editor bucket a (crop, target) pair counts towards, or None when it is unmapped or hidden.
+
+    `unified` maps each normalized original crop to its normalized unified crop.
+    """
+
+    info = target_mapping.get(pair)
+    if not info or not info.get("deployed", True):
+        return None
+    refined_l = str(info.get("refined_target_l") or "").strip().lower()
+    type_l = str(info.get("display_target_type_l") or "other").strip().lower()
+    crop = unified[pair[0]]
+    if not refined_l or not crop:
+        return None
+    return crop, type_l, refined_l
+
+
+class EditorLabelCounts:
+    """Label counts behind the editor pages, maintained across mapping edits.
+
+    The corpus is scanned once per dataset generation into mapping-independent
+    tables: EPA numbers per original crop, and the labels behind every
+    (original crop, target name) pair. Target counts are distinct labels per
+    editor bucket; each bucket keeps how many of its pairs reference each
+    label, so when the mappings change (a refined target is renamed, a crop
+    is re-unified, a row is hidden) only the pairs whose bucket changed are
+    moved and no application is revisited.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        file_ids: Dict[str, int] = {}
+        crop_epas: Dict[str, Set[str]] = {}
+        pair_files: Dict[Pair, Set[int]] = {}
+
+        for p in records:
+            epa = str(p.get("epa_reg_no") or "").strip()
+            source_file = str(p.get("_source_file") or "").strip() or epa
+            fid = file_ids.setdefault(source_file.lower(), len(file_ids)) if source_file else None
+            for app in p.get("Application_Info", []) or []:
+                if not isinstance(app, dict):
+                    continue
+                crops = []
+                for c in app.get("Target_Crop", []) or []:
+                    if isinstance(c, dict):
+                        norm = normalize_crop_key(str(c.get("name") or "").strip())
+                        if norm:
+                            crops.append(norm)
+                if not crops:
+                    continue
+                if epa:
+                    for crop in crops:
+                        crop_epas.setdefault(crop, set()).add(epa)
+                if fid is None:
+                    continue
+                for t in app.get("Target_Disease_Pest", []) or []:
+                    if not isinstance(t, dict):
+                        continue
+                    target = normalize_crop_key(str(t.get("name") or "").strip())
+                    if not target:
+                        continue
+                    for crop in crops:
+                        pair_files.setdefault((crop, target), set()).add(fid)
+
+        # normalized original crop -> distinct EPA numbers
+        self.crop_counts: Dict[str, int] = {crop: len(epas) for crop, epas in crop_epas.items()}
+        self._pair_files: Dict[Pair, Tuple[int, ...]] = {k: tuple(v) for k, v in pair_files.items()}
+        self._pair_crops = frozenset(crop for crop, _ in pair_files)
+        self._pair_bucket: Dict[Pair, Optional[Bucket]] = {}
+        # bucket -> {label id: number of the bucket's pairs that include it}
+        self._buckets: Dict[Bucket, Dict[int, int]] = {}
+        self._counts: Dict[Bucket, int] = {}
+        self._stamp: Any = None
+        # pairs moved by the last mapping change (all of them on the first call)
+        self.last_moved = 0
+        self._lock = threading.Lock()
+
+    def target_counts(
+        self,
+        stamp: Any,
+        target_mapping: Mapping[Pair, Mapping[str, Any]],
+        unified_mapping: Mapping[str, str],
+    ) -> Mapping[Bucket, int]:
+        """Distinct labels per editor bucket under the given mappings (identified by `stamp`)."""
+
+        with self._lock:
+            if stamp != self._stamp:
+                self.last_moved = self._sync(target_mapping, unified_mapping)
+                self._stamp = stamp
+            return self._counts
+
+    def _sync(self, target_mapping: Mapping[Pair, Mapping[str, Any]], unified_mapping: Mapping[str, str]) -> int:
+        """Move every pair whose bucket changed; returns how many moved."""
+
+        unified = {c: normalize_crop_key(unified_mapping.get(c, c)) for c in self._pair_crops}
+        moved = 0
+        for pair, files in self._pair_files.items():
+            new = _bucket(pair, target_mapping, unified)
+            old = self._pair_bucket.get(pair)
+            if new == old:
+                continue
+            if old is not None:
+                self._remove(old, files)
+            if new is not None:
+                self._add(new, files)
+            self._pair_bucket[pair] = new
+            moved += 1
+        return moved
+
+    def _add(self, bucket: Bucket, files: Tuple[int, ...]) -> None:
+        refs = self._buckets.setdefault(bucket, {})
+        for f in files:
+            refs[f] = refs.get(f, 0) + 1
+        self._counts[bucket] = len(refs)
+
+    def _remove(self, bucket: Bucket, files: Tuple[int, ...]) -> None:
+        refs = self._buckets[bucket]
+        for f in files:
+            n = refs[f] - 1
+            if n:
+                refs[f] = n
+            else:
+                del refs[f]
+        if refs:
+            self._counts[bucket] = len(refs)
+        else:
+            del self._buckets[bucket]
+            del self._counts[bucket]
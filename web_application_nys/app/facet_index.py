@@ -0,0 +1,306 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+from .data import normalize_crop_key
+
+FACETS = (
+    "crop",
+    "target_type",
+    "target",
+    "product_type",
+    "moa",
+    "signal_word",
+    "long_island_use_restriction",
+)
+# Target names and types come from the per-crop target mapping, so when crops
+# are selected these facets match only targets listed for one of those crops.
+CROP_SCOPED = ("target_type", "target")
+
+_MOA_RE = re.compile(r"^([A-Z]+)\s+(.+)$")
+_NO_VALUE = {"", "N/A", "NA", "NONE", "NAN"}
+
+Selection = Mapping[str, Iterable[str]]
+
+if hasattr(np, "bitwise_count"):
+
+    def _popcounts(words: np.ndarray) -> np.ndarray:
+        return np.bitwise_count(words)
+
+else:  # numpy < 2.0
+    _BYTE_POP = np.array([bin(i).count("1") for i in range(256)], dtype=np.uint8)
+
+    def _popcounts(words: np.ndarray) -> np.ndarray:
+        return _BYTE_POP[words.view(np.uint8)].reshape(-1, 8).sum(axis=1, dtype=np.uint64)
+
+
+def _words(ids: np.ndarray, nwords: int) -> np.ndarray:
+    """Packed bitmap (uint64 words, bit i = label id i) with the given ids set."""
+
+    bits = np.zeros(nwords * 64, dtype=bool)
+    bits[ids] = True
+    return np.packbits(bits, bitorder="little").view(np.uint64)
+
+
+def _container(ids: List[int], nwords: int) -> np.ndarray:
+    """Roaring-style container: a sorted uint32 id array while that is smaller than a bitmap."""
+
+    arr = np.unique(np.asarray(ids, dtype=np.uint32))
+    if len(arr) * 32 < nwords * 64:
+        return arr
+    return _words(arr, nwords)
+
+
+def normalize_value(facet: str, raw: str) -> List[str]:
+    """Index keys for one facet value, as stored at build time and accepted in queries."""
+
+    if facet in CROP_SCOPED:
+        # Same keys as the guided filter (refined_target_l / display_target_type_l)
+        key = str(raw or "").lower().strip()
+        return [key] if key else []
+    text = " ".join(str(raw or "").split())
+    if facet == "crop":
+        key = normalize_crop_key(text)
+        return [key] if key else []
+    if facet == "product_type":
+        return [part.strip().lower() for part in text.split(",") if part.strip()]
+    if facet == "moa":
+        # "HRAC 4/29" belongs to both groups
+        upper = text.upper()
+        if upper in _NO_VALUE:
+            return []
+        m = _MOA_RE.match(upper)
+        if m and "/" in m.group(2):
+            return [f"{m.group(1)} {part.strip()}".lower() for part in m.group(2).split("/") if part.strip()]
+        return [upper.lower()]
+    if facet == "signal_word":
+        # "DANGER / PELIGRO", "Caution!" -> danger, caution
+        word = text.upper().split("/")[0].strip(" !.")
+        return [word.lower()] if text.upper() not in _NO_VALUE and word else []
+    if facet == "long_island_use_restriction":
+        low = text.lower()
+        if low in ("true", "1", "yes", "y"):
+            return ["true"]
+        if low in ("false", "0", "no", "n"):
+            return ["false"]
+        return []
+    raise KeyError(facet)
+
+
+class FacetIndex:
+    """Bitmap facet engine behind /api/facets.
+
+    Every label gets a dense id (its position in the dataset generation's
+    record order) and every facet value a bitmap of label ids, stored as a
+    sorted id array while sparse and as packed uint64 words otherwise. A query
+    ORs the selected values within a facet, ANDs across facets and clears the
+    excluded values, so multi-select filters such as "apple AND (apple scab OR
+    powdery mildew) AND NOT FRAC 3" are a handful of word-wise operations.
+    Totals, facet counts and page offsets come from popcounts; only the ids on
+    the requested page are materialized.
+
+    Target facets follow the guided filter's target mapping: a target counts
+    for a crop only when some application lists both and the mapping entry for
+    that (crop, target) pair is deployed.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Dict[str, Any]],
+        target_mapping: Mapping[Tuple[str, str], Mapping[str, Any]],
+        unified_mapping: Mapping[str, str],
+    ):
+        self.records = records
+        self.nwords = (len(records) + 63) // 64
+
+        postings: Dict[str, Dict[Any, List[int]]] = {f: {} for f in FACETS}
+        scoped: Dict[str, Dict[Tuple[str, str], List[int]]] = {f: {} for f in CROP_SCOPED}
+        self.labels: Dict[str, Dict[str, str]] = {f: {} for f in FACETS}
+
+        def add(facet: str, key: str, rid: int, label: str) -> None:
+            postings[facet].setdefault(key, []).append(rid)
+            self.labels[facet].setdefault(key, label)
+
+        for rid, p in enumerate(records):
+            for facet, raw in (
+                ("product_type", p.get("product_type")),
+                ("signal_word", p.get("signal_word")),
+                ("long_island_use_restriction", p.get("long_island_use_restriction")),
+            ):
+                for key in normalize_value(facet, raw):
+                    add(facet, key, rid, key.upper() if facet != "long_island_use_restriction" else key)
+            for ai in p.get("Active_Ingredients", []) or []:
+                if isinstance(ai, dict):
+                    for key in normalize_value("moa", ai.get("mode_Of_Action")):
+                        add("moa", key, rid, key.upper())
+
+            for app in p.get("Application_Info", []) or []:
+                if not isinstance(app, dict):
+                    continue
+                targets = []
+                for t in app.get("Target_Disease_Pest", []) or []:
+                    if isinstance(t, dict):
+                        name = str(t.get("name") or "").strip()
+                        norm = normalize_crop_key(name) if name else ""
+                        if norm:
+                            targets.append(norm)
+                for c in app.get("Target_Crop", []) or []:
+                    if not isinstance(c, dict):
+                        continue
+                    crop = normalize_crop_key(str(c.get("name") or "").strip())
+                    if not crop:
+                        continue
+                    unified = unified_mapping.get(crop, crop)
+                    add("crop", unified, rid, unified)
+                    for target in targets:
+                        info = target_mapping.get((crop, target))
+                        if not info or not info.get("deployed", True):
+                            continue
+                        type_l = str(info.get("display_target_type_l", "")).lower().strip()
+                        target_l = str(info.get("refined_target_l", "")).lower().strip()
+                        for facet, key, label in (
+                            ("target_type", type_l, info.get("display_target_type", type_l)),
+                            ("target", target_l, info.get("refined_target_name", target_l)),
+                        ):
+                            if key:
+                                add(facet, key, rid, str(label))
+                                scoped[facet].setdefault((unified, key), []).append(rid)
+
+        self.bitmaps: Dict[str, Dict[Any, np.ndarray]] = {
+            f: {k: _container(ids, self.nwords) for k, ids in postings[f].items()} for f in FACETS
+        }
+        self.scoped: Dict[str, Dict[Tuple[str, str], np.ndarray]] = {
+            f: {k: _container(ids, self.nwords) for k, ids in scoped[f].items()} for f in CROP_SCOPED
+        }
+        # crop -> keys of each crop-scoped facet listed for it
+        self.scoped_keys: Dict[str, Dict[str, List[str]]] = {f: {} for f in CROP_SCOPED}
+        for f in CROP_SCOPED:
+            for crop, key in self.scoped[f]:
+                self.scoped_keys[f].setdefault(crop, []).append(key)
+        # Sparse containers of each facet concatenated, so all of a facet's
+        # counts take one gather + reduceat instead of a numpy call per value.
+        self._flat: Dict[str, Tuple[List[str], np.ndarray, np.ndarray]] = {}
+        for f in FACETS:
+            sparse = [(k, c) for k, c in self.bitmaps[f].items() if c.dtype == np.uint32]
+            starts = np.cumsum([0] + [len(c) for _, c in sparse[:-1]], dtype=np.int64)
+            flat = np.concatenate([c for _, c in sparse]) if sparse else np.zeros(0, dtype=np.uint32)
+            self._flat[f] = ([k for k, _ in sparse], flat, starts)
+        self._all = _words(np.arange(len(records), dtype=np.uint32), self.nwords)
+
+    @staticmethod
+    def normalize(selection: Optional[Selection]) -> Dict[str, List[str]]:
+        """Index keys per facet for a raw {facet: values} selection (unknown facets are ignored)."""
+
+        out: Dict[str, List[str]] = {}
+        for facet in FACETS:
+            keys: List[str] = []
+            for raw in (selection or {}).get(facet, ()) or ():
+                for key in normalize_value(facet, raw):
+                    if key not in keys:
+                        keys.append(key)
+            if keys:
+                out[facet] = keys
+        return out
+
+    def _dense(self, container: np.ndarray) -> np.ndarray:
+        return _words(container, self.nwords) if container.dtype == np.uint32 else container
+
+    def _containers(self, facet: str, keys: Sequence[str], crops: Optional[Sequence[str]]) -> List[np.ndarray]:
+        if facet in CROP_SCOPED and crops:
+            table = self.scoped[facet]
+            found = (table.get((c, k)) for c in crops for k in keys)
+        else:
+            table = self.bitmaps[facet]
+            found = (table.get(k) for k in keys)
+        return [c for c in found if c is not None]
+
+    def _union(self, facet: str, keys: Sequence[str], crops: Optional[Sequence[str]]) -> np.ndarray:
+        out = np.zeros(self.nwords, dtype=np.uint64)
+        for container in self._containers(facet, keys, crops):
+            out |= self._dense(container)
+        return out
+
+    def mask(self, include: Dict[str, List[str]], exclude: Dict[str, List[str]], skip: str = "") -> np.ndarray:
+        """Bitmap of matching labels for normalized selections; `skip` ignores one facet's includes."""
+
+        # Counting crops: scoped facets fall back to "on any crop"
+        crops = include.get("crop") if skip != "crop" else None
+        out = self._all.copy()
+        for facet, keys in include.items():
+            if facet != skip:
+                out &= self._union(facet, keys, crops)
+        for facet, keys in exclude.items():
+            out &= ~self._union(facet, keys, crops)
+        return out
+
+    @staticmethod
+    def count(mask: np.ndarray) -> int:
+        return int(_popcounts(mask).sum())
+
+    def _count_in(self, mask: np.ndarray, container: np.ndarray) -> int:
+        """popcount(mask & container) without densifying sparse containers."""
+
+        if container.dtype == np.uint32:
+            bits = mask[container >> 6] >> (container & 63).astype(np.uint64)
+            return int((bits & np.uint64(1)).sum())
+        return self.count(mask & container)
+
+    def _count_all(self, mask: np.ndarray, facet: str) -> Dict[str, int]:
+        """popcount(mask & bitmap) for every value of `facet`."""
+
+        keys, flat, starts = self._flat[facet]
+        counts: Dict[str, int] = {}
+        if keys:
+            bits = np.unpackbits(mask.view(np.uint8), bitorder="little")
+            counts = dict(zip(keys, np.add.reduceat(bits[flat], starts, dtype=np.int64).tolist()))
+        for key, container in self.bitmaps[facet].items():
+            if container.dtype != np.uint32:
+                counts[key] = self.count(mask & container)
+        return counts
+
+    def page(self, mask: np.ndarray, offset: int, limit: int) -> List[int]:
+        """Label ids ranked offset..offset+limit-1 in `mask`, unpacking only the words that hold them."""
+
+        if limit <= 0 or not self.nwords:
+            return []
+        cum = np.cumsum(_popcounts(mask), dtype=np.int64)
+        total = int(cum[-1])
+        if offset >= total:
+            return []
+        first = int(np.searchsorted(cum, offset, side="right"))
+        last = int(np.searchsorted(cum, min(offset + limit, total), side="left"))
+        skip = offset - (int(cum[first - 1]) if first else 0)
+        bits = np.unpackbits(mask[first : last + 1].view(np.uint8), bitorder="little")
+        return (np.flatnonzero(bits)[skip : skip + limit] + first * 64).tolist()
+
+    def search(self, include: Selection, exclude: Optional[Selection], offset: int, limit: int) -> Tuple[int, List[int]]:
+        """(total, label ids on the page) for raw include/exclude selections."""
+
+        m = self.mask(self.normalize(include), self.normalize(exclude))
+        return self.count(m), self.page(m, offset, limit)
+
+    def facet_counts(self, include: Selection, exclude: Optional[Selection], facet: str) -> List[Dict[str, Any]]:
+        """Matching-label count per value of `facet`, ignoring that facet's own selection.
+
+        Values with no matching labels are left out; the rest are ordered by
+        count (descending), then value.
+        """
+
+        inc, exc = self.normalize(include), self.normalize(exclude)
+        m = self.mask(inc, exc, skip=facet)
+        crops = inc.get("crop") if facet in CROP_SCOPED else None
+        if crops and len(crops) == 1:
+            table = self.scoped[facet]
+            counts = {key: self._count_in(m, table[(crops[0], key)]) for key in self.scoped_keys[facet].get(crops[0], ())}
+        elif crops:
+            keys = {key for crop in crops for key in self.scoped_keys[facet].get(crop, ())}
+            counts = {key: self.count(m & self._union(facet, [key], crops)) for key in keys}
+        else:
+            counts = self._count_all(m, facet)
+        labels = self.labels[facet]
+        rows = [{"value": k, "label": labels.get(k, k), "count": n} for k, n in counts.items() if n > 0]
+        rows.sort(key=lambda r: (-r["count"], r["value"]))
+        return rows
@@ -0,0 +1,198 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .application_table import iter_application_ids
+from .data import normalize_crop_key
+
+# (unified crop_norm, target_type_norm, target_norm), as in Supabase label_crop_target
+FilterKey = Tuple[str, str, str]
+
+# Distinct query results kept per index (cleared wholesale when full).
+_MEMO_LIMIT = 4096
+
+
+class GuidedFilterIndex:
+    """Inverted index behind the local (non-Supabase) guided filter.
+
+    Built once per dataset generation and target/crop mapping version, with
+    the row rules scripts/build_supabase_label_index.py uses for the Supabase
+    label_crop_target table: per application, crops whose mapping entry is
+    not deployed are skipped, each target is attributed to the first
+    remaining crop with a target mapping entry, and the pair is kept only if
+    that entry is deployed. The key is (unified crop, display target type or
+    "other", refined target), so local /api/filter returns the labels the
+    Supabase index does.
+
+    Postings hold application ids (see iter_application_ids), so a lookup can
+    be restricted to applications selected by the range index. Results keep
+    record order, are deduped by source file and memoized per query.
+    """
+
+    def __init__(
+        self,
+        records: Sequence[Dict[str, Any]],
+        target_mapping: Mapping[Tuple[str, str], Mapping[str, Any]],
+        unified_mapping: Mapping[str, str],
+        deployed_crops: Mapping[str, bool],
+    ):
+        self.records = records
+
+        # key -> application ids with a label_crop_target row for it
+        self.postings: Dict[FilterKey, Set[int]] = {}
+        # keys with a row on the main target list (BOOL_OR in label_crop_target_counts)
+        self.main: Set[FilterKey] = set()
+        # unified crop -> normalized original crops its postings came from
+        self.originals: Dict[str, Set[str]] = {}
+        # application id -> record id
+        self.app_record: List[int] = []
+        # record id -> dedupe key (see _dedupe_key)
+        self.dedupe_keys = [_dedupe_key(p) for p in records]
+
+        for aid, rid, app in iter_application_ids(records):
+            self.app_record.append(rid)
+            self._index_application(aid, app, target_mapping, unified_mapping, deployed_crops)
+
+        self._memo: Dict[FilterKey, List[Dict[str, Any]]] = {}
+
+    def _index_application(
+        self,
+        aid: int,
+        app: Dict[str, Any],
+        target_mapping: Mapping[Tuple[str, str], Mapping[str, Any]],
+        unified_mapping: Mapping[str, str],
+        deployed_crops: Mapping[str, bool],
+    ) -> None:
+        crops = app.get("Target_Crop", []) or []
+        targets = app.get("Target_Disease_Pest", []) or []
+        if not isinstance(crops, list) or not isinstance(targets, list):
+            return
+
+        # (original crop, unified crop) for the deployed crops of this application
+        crop_pairs: List[Tuple[str, str]] = []
+        for c in crops:
+            if not isinstance(c, dict):
+                continue
+            orig = normalize_crop_key(str(c.get("name") or "").strip())
+            if not orig or deployed_crops.get(orig, True) is False:
+                continue
+            crop_pairs.append((orig, normalize_crop_key(unified_mapping.get(orig, orig)) or orig))
+        if not crop_pairs:
+            return
+
+        for t in targets:
+            if not isinstance(t, dict):
+                continue
+            target = normalize_crop_key(str(t.get("name") or "").strip())
+            if not target:
+                continue
+            # First crop with a mapping entry for this target wins
+            for orig, unified in crop_pairs:
+                info = target_mapping.get((orig, target))
+                if info:
+                    break
+            else:
+                continue
+            if not info.get("deployed", True):
+                continue
+            key = (unified, info.get("display_target_type_l") or "other", info.get("refined_target_l", ""))
+            self.postings.setdefault(key, set()).add(aid)
+            self.originals.setdefault(unified, set()).add(orig)
+            if info.get("main_target_list", False):
+                self.main.add(key)
+
+    def matching_crops(self, crop: str) -> Set[str]:
+        """Normalized original crop names behind the filter's `crop` param (for the range index)."""
+
+        return self.originals.get(normalize_crop_key(crop), set())
+
+    def lookup(
+        self, crop: str, target_type: str, target: str, applications: Optional[Set[int]] = None
+    ) -> List[Dict[str, Any]]:
+        """Every matching record, in record order (the caller slices the page).
+
+        The params are normalized as the Supabase filter normalizes them.
+        `applications` restricts the match to those application ids (e.g.
+        from ApplicationRangeIndex); such lookups are not memoized.
+        """
+
+        key = (normalize_crop_key(crop), target_type.lower().strip(), target.lower().strip())
+        if applications is None:
+            hit = self._memo.get(key)
+            if hit is not None:
+                return hit
+
+        aids = self.postings.get(key, set())
+        if applications is not None:
+            aids = aids & applications
+        out: List[Dict[str, Any]] = []
+        seen: Set[str] = set()
+        for rid in sorted({self.app_record[aid] for aid in aids}):
+            source_file = self.dedupe_keys[rid]
+            if source_file is None or source_file in seen:
+                continue
+            seen.add(source_file)
+            out.append(self.records[rid])
+
+        if applications is None:
+            if len(self._memo) >= _MEMO_LIMIT:
+                self._memo.clear()
+            self._memo[key] = out
+        return out
+
+
+def _dedupe_key(p: Dict[str, Any]) -> Optional[str]:
+    """Lowercased source file (EPA number as a fallback), as the original filter deduped."""
+
+    source_file = str(p.get("_source_file") or "").strip()
+    if not source_file:
+        source_file = str(p.get("epa_reg_no") or "").strip()
+    return source_file.lower() or None
+
+
+class CropTargetCounts:
+    """Guided-filter dropdown counts: crop -> target type -> target -> labels.
+
+    Built in one pass over a GuidedFilterIndex's postings and aggregated like
+    the Supabase label_crop_target_counts view (distinct labels per key, main
+    if any of its rows is on the main target list), so a target's count is
+    also the `total` local /api/filter returns for it. The sorted dropdown
+    lists are kept per crop, so /api/enums/targets and
+    /api/enums/target-types answer by lookup.
+    """
+
+    def __init__(self, index: GuidedFilterIndex):
+        # crop_norm -> target_type_norm -> (main targets, other targets), each sorted by count desc, name
+        self.targets: Dict[str, Dict[str, Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]]] = {}
+        # crop_norm -> title-cased target types
+        self.target_types: Dict[str, List[str]] = {}
+
+        for key, aids in index.postings.items():
+            crop, type_l, target_l = key
+            if not target_l:
+                continue  # the filter requires a target; the Supabase dropdown skips these too
+            labels = {index.dedupe_keys[index.app_record[aid]] for aid in aids}
+            labels.discard(None)
+            if not labels:
+                continue
+            main = key in index.main
+            obj = {"name": target_l.title(), "count": len(labels), "main_target_list": main}
+            main_targets, other_targets = self.targets.setdefault(crop, {}).setdefault(type_l, ([], []))
+            (main_targets if main else other_targets).append(obj)
+
+        for crop, by_type in self.targets.items():
+            for main_targets, other_targets in by_type.values():
+                main_targets.sort(key=lambda x: (-x["count"], x["name"].lower()))
+                other_targets.sort(key=lambda x: (-x["count"], x["name"].lower()))
+            self.target_types[crop] = sorted({t.title() for t in by_type}, key=lambda x: x.lower())
+
+    def types(self, crop: str) -> List[str]:
+        """Title-cased target types with labels for a crop."""
+
+        return self.target_types.get(normalize_crop_key(crop), [])
+
+    def lookup(self, crop: str, target_type: str) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """(main targets, other targets) for a crop and target type."""
+
+        by_type = self.targets.get(normalize_crop_key(crop), {})
+        return by_type.get(target_type.lower().strip(), ([], []))
@@ -0,0 +1,282 @@
+from __future__ import annotations
+
+import math
+import mmap
+import os
+import re
+import struct
+import sys
+import threading
+from array import array
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+# On-disk BM25 index over extracted label text (PDFs/nyspad_label_txt[_OCR]).
+#
+# One file, built offline by scripts/build_fulltext_index.py and memory-mapped
+# by the web app. Layout (native byte order, recorded in the header):
+#   header
+#   doc_len    u32[n_docs]          tokens per label
+#   doc_off    u64[n_docs + 1]      offsets into doc_names
+#   doc_names  utf-8 blob           altered_json filename per doc id
+#   term_off   u64[n_terms + 1]     offsets into terms
+#   terms      utf-8 blob           terms sorted by their utf-8 bytes
+#   post_off   u64[n_terms + 1]     offsets (in u32 units) into postings
+#   postings   u32[]                per doc: doc_id, tf, n_pages, page...
+# Sections start on 8-byte boundaries. A query binary-searches the term table
+# and touches only its terms' postings, so its cost does not grow with the
+# number of labels in the corpus (only with how many labels match).
+
+FULLTEXT_VERSION = 1
+_MAGIC = b"NYSFTS\0\0"
+# magic, version, byteorder (0 little / 1 big), n_docs, n_terms, avgdl, 7 section offsets
+_HEADER = struct.Struct("=8sHHIId7Q")
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+_PAGE_RE = re.compile(r"\*\*\*PAGE (\d+) (START|END)\*\*\*")
+
+# Standard Okapi BM25 parameters.
+BM25_K1 = 1.2
+BM25_B = 0.75
+
+
+def get_fulltext_index_path() -> Path:
+    """Defaults to `web_application_nys/.cache/fulltext.idx`; override with `NYS_FULLTEXT_INDEX`."""
+
+    override = os.environ.get("NYS_FULLTEXT_INDEX")
+    if override:
+        return Path(override).expanduser().resolve()
+    return Path(__file__).resolve().parents[1] / ".cache" / "fulltext.idx"
+
+
+def tokenize(text: str) -> List[str]:
+    return [t for t in _TOKEN_RE.findall(text.lower()) if len(t) > 1]
+
+
+def split_pages(text: str) -> List[Tuple[int, str]]:
+    """Split pipeline text on its `***PAGE N START***` markers into (page, text).
+
+    Text outside any marker (e.g. files without markers) is attributed to page 1.
+    """
+
+    pages: List[Tuple[int, str]] = []
+    page = 1
+    pos = 0
+    for m in _PAGE_RE.finditer(text):
+        chunk = text[pos : m.start()]
+        if chunk.strip():
+            pages.append((page, chunk))
+        if m.group(2) == "START":
+            page = int(m.group(1))
+        pos = m.end()
+    tail = text[pos:]
+    if tail.strip():
+        pages.append((page, tail))
+    return pages
+
+
+def _pad(f, align: int = 8) -> int:
+    pos = f.tell()
+    if pos % align:
+        f.write(b"\0" * (align - pos % align))
+    return f.tell()
+
+
+def write_fulltext_index(docs: Iterable[Tuple[str, str]], out_path: Path) -> Dict[str, int]:
+    """Index (source_file, label text) pairs into `out_path` (written atomically)."""
+
+    names: List[str] = []
+    doc_len = array("I")
+    postings: Dict[str, array] = {}
+
+    for name, text in docs:
+        doc_id = len(names)
+        names.append(name)
+        term_pages: Dict[str, List[int]] = {}
+        term_tf: Dict[str, int] = {}
+        total = 0
+        for page, chunk in split_pages(text):
+            for term in tokenize(chunk):
+                total += 1
+                term_tf[term] = term_tf.get(term, 0) + 1
+                pages = term_pages.setdefault(term, [])
+                if not pages or pages[-1] != page:
+                    pages.append(page)
+        doc_len.append(total)
+        for term, tf in term_tf.items():
+            pages = sorted(set(term_pages[term]))
+            out = postings.get(term)
+            if out is None:
+                out = postings[term] = array("I")
+            out.extend((doc_id, tf, len(pages)))
+            out.extend(pages)
+
+    terms = sorted(postings, key=lambda t: t.encode("utf-8"))
+    avgdl = (sum(doc_len) / len(doc_len)) if doc_len else 0.0
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets: List[int] = []
+
+        offsets.append(_pad(f))
+        doc_len.tofile(f)
+
+        encoded = [n.encode("utf-8") for n in names]
+        offsets.append(_pad(f))
+        _cumulative(len(b) for b in encoded).tofile(f)
+        offsets.append(f.tell())
+        f.write(b"".join(encoded))
+
+        encoded = [t.encode("utf-8") for t in terms]
+        offsets.append(_pad(f))
+        _cumulative(len(b) for b in encoded).tofile(f)
+        offsets.append(f.tell())
+        f.write(b"".join(encoded))
+
+        offsets.append(_pad(f))
+        _cumulative(len(postings[t]) for t in terms).tofile(f)
+        offsets.append(_pad(f))
+        for t in terms:
+            postings[t].tofile(f)
+
+        f.seek(0)
+        byteorder = 0 if sys.byteorder == "little" else 1
+        f.write(_HEADER.pack(_MAGIC, FULLTEXT_VERSION, byteorder, len(names), len(terms), avgdl, *offsets))
+    os.replace(tmp, out_path)
+    return {"docs": len(names), "terms": len(terms), "bytes": out_path.stat().st_size}
+
+
+def _cumulative(sizes: Iterable[int]) -> array:
+    out = array("Q", [0])
+    total = 0
+    for n in sizes:
+        total += n
+        out.append(total)
+    return out
+
+
+class FulltextIndex:
+    """Read-only, memory-mapped view of a file written by `write_fulltext_index`."""
+
+    def __init__(self, path: Path):
+        self.path = path
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        (magic, version, byteorder, self.n_docs, self.n_terms, self.avgdl, *offsets) = _HEADER.unpack_from(buf)
+        if magic != _MAGIC or version != FULLTEXT_VERSION:
+            raise ValueError(f"Not a v{FULLTEXT_VERSION} full-text index: {path}")
+        if byteorder != (0 if sys.byteorder == "little" else 1):
+            raise ValueError(f"Full-text index was built on a different byte order: {path}")
+
+        o_doc_len, o_doc_off, o_doc_names, o_term_off, o_terms, o_post_off, o_postings = offsets
+        n, v = self.n_docs, self.n_terms
+        self._doc_len = buf[o_doc_len : o_doc_len + 4 * n].cast("I")
+        self._doc_off = buf[o_doc_off : o_doc_off + 8 * (n + 1)].cast("Q")
+        self._doc_names = buf[o_doc_names : o_doc_names + (self._doc_off[n] if n else 0)]
+        self._term_off = buf[o_term_off : o_term_off + 8 * (v + 1)].cast("Q")
+        self._terms = buf[o_terms : o_terms + (self._term_off[v] if v else 0)]
+        self._post_off = buf[o_post_off : o_post_off + 8 * (v + 1)].cast("Q")
+        self._postings = buf[o_postings : o_postings + 4 * (self._post_off[v] if v else 0)].cast("I")
+
+    def doc_name(self, doc_id: int) -> str:
+        return bytes(self._doc_names[self._doc_off[doc_id] : self._doc_off[doc_id + 1]]).decode("utf-8")
+
+    def _term_id(self, term: str) -> Optional[int]:
+        key = term.encode("utf-8")
+        lo, hi = 0, self.n_terms
+        while lo < hi:
+            mid = (lo + hi) // 2
+            probe = bytes(self._terms[self._term_off[mid] : self._term_off[mid + 1]])
+            if probe < key:
+                lo = mid + 1
+            elif probe > key:
+                hi = mid
+            else:
+                return mid
+        return None
+
+    def _postings_for(self, term_id: int) -> Iterable[Tuple[int, int, memoryview]]:
+        """Yield (doc_id, tf, pages) for one term."""
+
+        post = self._postings
+        i, end = self._post_off[term_id], self._post_off[term_id + 1]
+        while i < end:
+            doc_id, tf, n_pages = post[i], post[i + 1], post[i + 2]
+            yield doc_id, tf, post[i + 3 : i + 3 + n_pages]
+            i += 3 + n_pages
+
+    def search(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
+        """BM25-ranked labels for `query`, each with the pages its terms occur on.
+
+        Pages are ordered by how many distinct query terms they contain, then
+        by page number.
+        """
+
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms or not self.n_docs:
+            return []
+
+        scores: Dict[int, float] = {}
+        page_hits: Dict[int, Dict[int, int]] = {}
+        avgdl = self.avgdl or 1.0
+        for term in terms:
+            term_id = self._term_id(term)
+            if term_id is None:
+                continue
+            entries = list(self._postings_for(term_id))
+            df = len(entries)
+            idf = math.log(1 + (self.n_docs - df + 0.5) / (df + 0.5))
+            for doc_id, tf, pages in entries:
+                norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc_id] / avgdl)
+                scores[doc_id] = scores.get(doc_id, 0.0) + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                hits = page_hits.setdefault(doc_id, {})
+                for page in pages:
+                    hits[page] = hits.get(page, 0) + 1
+
+        ranked = sorted(scores.items(), key=lambda t: (-t[1], t[0]))[: max(limit, 0)]
+        results = []
+        for doc_id, score in ranked:
+            hits = page_hits[doc_id]
+            results.append(
+                {
+                    "source_file": self.doc_name(doc_id),
+                    "score": round(score, 4),
+                    "pages": sorted(hits, key=lambda p: (-hits[p], p)),
+                }
+            )
+        return results
+
+
+_OPEN_LOCK = threading.Lock()
+_OPEN: Dict[str, Tuple[Tuple[int, int], FulltextIndex]] = {}
+
+
+def load_fulltext_index(path: Optional[Path] = None) -> Optional[FulltextIndex]:
+    """Return the mapped index at `path` (None if it has not been built).
+
+    The mapping is reused until the file is replaced by a rebuild; readers
+    still holding the previous mapping keep a valid view of the old file.
+    """
+
+    path = path or get_fulltext_index_path()
+    try:
+        st = path.stat()
+    except OSError:
+        return None
+    stamp = (st.st_size, st.st_mtime_ns)
+    cached = _OPEN.get(str(path))
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _OPEN_LOCK:
+        cached = _OPEN.get(str(path))
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        try:
+            index = FulltextIndex(path)
+        except (OSError, ValueError, struct.error):
+            return None
+        _OPEN[str(path)] = (stamp, index)
+        return index
@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+import gzip
+import json
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+try:
+    import orjson  # type: ignore
+except Exception:  # pragma: no cover
+    orjson = None  # type: ignore
+
+try:
+    import brotli  # type: ignore
+except Exception:  # pragma: no cover
+    brotli = None  # type: ignore
+
+
+def dumps(obj: Any) -> bytes:
+    """Serialize like `jsonify` (sorted keys, compact), with orjson when available."""
+
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_SORT_KEYS)
+        except TypeError:
+            pass  # e.g. non-str dict keys; the stdlib path handles those
+    return json.dumps(obj, sort_keys=True, separators=(",", ":")).encode("utf-8")
+
+
+def loads(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _serialize(record: Any) -> bytes:
+    # Records read lazily from a packed corpus carry their serialized JSON already.
+    packed = getattr(record, "packed", None)
+    return packed() if packed is not None else dumps(record)
+
+
+def pick_encoding(accept_encoding: str) -> str:
+    """Best content-coding we can produce for an Accept-Encoding header ("" = identity)."""
+
+    offered = {part.split(";")[0].strip().lower() for part in (accept_encoding or "").split(",")}
+    if brotli is not None and "br" in offered:
+        return "br"
+    if "gzip" in offered:
+        return "gzip"
+    return ""
+
+
+def encode(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body)
+    if encoding == "gzip":
+        # mtime=0 keeps the bytes (and so the ETag) identical across processes
+        return gzip.compress(body, compresslevel=6, mtime=0)
+    return body
+
+
+class BytesLRU:
+    """Thread-safe LRU of immutable byte strings, bounded by total size."""
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self._items: "OrderedDict[Hashable, bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[bytes]:
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+            return hit
+
+    def get_or_build(self, key: Hashable, build: Callable[[], bytes]) -> bytes:
+        with self._lock:
+            hit = self._items.get(key)
+            if hit is not None:
+                self._items.move_to_end(key)
+                return hit
+
+        # Build outside the lock; a concurrent miss just builds the same bytes twice.
+        value = build()
+        if self.max_bytes <= 0 or len(value) > self.max_bytes:
+            return value
+        with self._lock:
+            if key not in self._items:
+                self._items[key] = value
+                self._size += len(value)
+                while self._size > self.max_bytes:
+                    _, old = self._items.popitem(last=False)
+                    self._size -= len(old)
+        return value
+
+    def clear(self) -> None:
+        with self._lock:
+            self._items.clear()
+            self._size = 0
+
+    def stats(self) -> Tuple[int, int]:
+        """(entries, bytes) currently cached."""
+
+        with self._lock:
+            return len(self._items), self._size
+
+
+class SerializedRecords:
+    """Pre-serialized (and optionally compressed) JSON bodies, keyed by content digest.
+
+    `key` identifies one version of one record (source file + content digest),
+    so entries stay valid across dataset generations that did not change that
+    file and simply age out of the LRU once it changes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.cache = BytesLRU(max_bytes)
+
+    def body(self, key: Hashable, record: Any, encoding: str = "") -> bytes:
+        if not encoding:
+            return self.cache.get_or_build((key, ""), lambda: _serialize(record))
+        return self.cache.get_or_build((key, encoding), lambda: encode(self.body(key, record), encoding))
+
+    @staticmethod
+    def etag(key: Tuple[str, str], encoding: str = "") -> str:
+        """Strong ETag for one representation; `key` is (source file, content digest hex)."""
+
+        return f"{key[1]}-{encoding}" if encoding else key[1]
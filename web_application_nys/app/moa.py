@@ -0,0 +1,86 @@
+from __future__ import annotations
+
+import re
+from typing import Any, Dict, Iterable, List, Sequence
+
+# Mode-of-action codes ("FRAC 3", "IRAC 4A", "HRAC 15") as the application log
+# stores them, plus per-label code bitmasks for rotation-aware filtering.
+
+_MOA_RE = re.compile(r"\b(FRAC|IRAC|HRAC)\s*([0-9]+[A-Z]?)\b", re.IGNORECASE)
+
+
+def normalize_moa_code(code: str) -> str:
+    raw = str(code or "").strip()
+    if not raw or raw == "?":
+        return ""
+    s = " ".join(raw.upper().split())
+    m = _MOA_RE.search(s)
+    if m:
+        return f"{m.group(1).upper()} {m.group(2).upper()}".strip()
+    return s
+
+
+def parse_moa_codes(raw_moa: str) -> list[str]:
+    s = str(raw_moa or "").strip()
+    if not s or s == "?" or s.upper() == "N/A":
+        return []
+    parts = re.split(r"[,/;]+", s)
+    out: list[str] = []
+    seen: set[str] = set()
+    for p in parts:
+        norm = normalize_moa_code(p)
+        if not norm or norm in seen:
+            continue
+        seen.add(norm)
+        out.append(norm)
+    return out
+
+
+def label_moa_codes(p: Dict[str, Any]) -> List[str]:
+    """Distinct MOA codes across a label's active ingredients."""
+
+    out: List[str] = []
+    for ai in p.get("Active_Ingredients", []) or []:
+        if not isinstance(ai, dict):
+            continue
+        for code in parse_moa_codes(ai.get("mode_Of_Action") or ai.get("mode_of_action") or ""):
+            if code not in out:
+                out.append(code)
+    return out
+
+
+class MoaMasks:
+    """Each label's MOA codes as one integer bitmask (bit i = `codes[i]`).
+
+    Built once per dataset generation; excluding a set of codes is then one
+    AND per label instead of re-parsing its active ingredients.
+    """
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        per_record = [(id(p), label_moa_codes(p)) for p in records]
+        self.codes: List[str] = sorted({c for _, codes in per_record for c in codes})
+        self.bits: Dict[str, int] = {c: 1 << i for i, c in enumerate(self.codes)}
+        # id(record) -> mask; ids are stable while the generation lives
+        self.by_record: Dict[int, int] = {}
+        for rid, codes in per_record:
+            mask = 0
+            for c in codes:
+                mask |= self.bits[c]
+            self.by_record[rid] = mask
+
+    def mask(self, codes: Iterable[str]) -> int:
+        """Bitmask for codes (normalized first); codes no label carries are ignored."""
+
+        out = 0
+        for c in codes:
+            out |= self.bits.get(normalize_moa_code(c), 0)
+        return out
+
+    def exclude(self, records: Iterable[Dict[str, Any]], codes: Iterable[str]) -> List[Dict[str, Any]]:
+        """`records` without the labels carrying any of `codes` (order kept)."""
+
+        m = self.mask(codes)
+        if not m:
+            return list(records)
+        by_record = self.by_record
+        return [p for p in records if not by_record.get(id(p), 0) & m]
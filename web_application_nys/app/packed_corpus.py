@@ -0,0 +1,352 @@
+from __future__ import annotations
+
+import hashlib
+import mmap
+import os
+import struct
+import sys
+import threading
+import weakref
+from array import array
+from collections import OrderedDict, abc
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Set, Tuple
+
+from .json_cache import dumps, loads
+
+# Label records packed into memory-mapped files, for the store's lazy mode
+# (NYS_LAZY_DETAILS=1): the heavy sections of each label (HEAVY_FIELDS) stay
+# in the file and are decoded on access, while the fields the list, search
+# and filter tables read stay resident in a small `LabelRecord`.
+#
+# One file (a segment) holds the labels of one full load or one incremental
+# reload. It is named by the content digests of those labels, so every worker
+# process maps the same file and its pages sit in the page cache once.
+# Layout (native byte order, recorded in the header):
+#   header
+#   name_off   u64[n_records + 1]   offsets into names
+#   names      utf-8 blob           source file per record
+#   body_off   u64[n_records + 1]   offsets into bodies
+#   bodies     json                 each record as `json_cache.dumps` writes it
+#   term_off   u64[n_terms + 1]     offsets into terms
+#   terms      utf-8 blob           distinct Target_Crop / Target_Disease_Pest names
+# Sections start on 8-byte boundaries. A body is byte-for-byte the detail
+# response for its record, so /api/pesticide-file sends it without decoding.
+
+PACKED_CORPUS_VERSION = 1
+_MAGIC = b"NYSCORP\0"
+# magic, version, byteorder (0 little / 1 big), n_records, n_terms, 6 section offsets
+_HEADER = struct.Struct("=8sHHII6Q")
+
+# Top-level record fields that are read from the file instead of kept resident
+HEAVY_FIELDS = frozenset({"Application_Info", "Safety_Information", "PPE"})
+
+# Decoded bodies kept per file, so reading several heavy fields of a label decodes it once
+_DECODED_ENTRIES = 32
+
+
+def get_corpus_dir() -> Path:
+    """Defaults to `web_application_nys/.cache/corpus`; override with `NYS_CORPUS_DIR`."""
+
+    override = os.environ.get("NYS_CORPUS_DIR")
+    if override:
+        return Path(override).expanduser().resolve()
+    return Path(__file__).resolve().parents[1] / ".cache" / "corpus"
+
+
+def _pad(f, align: int = 8) -> int:
+    pos = f.tell()
+    if pos % align:
+        f.write(b"\0" * (align - pos % align))
+    return f.tell()
+
+
+def _cumulative(sizes: Iterable[int]) -> array:
+    out = array("Q", [0])
+    total = 0
+    for n in sizes:
+        total += n
+        out.append(total)
+    return out
+
+
+def _record_terms(record: Mapping[str, Any]) -> Iterator[str]:
+    for app in record.get("Application_Info", []) or []:
+        if not isinstance(app, dict):
+            continue
+        for field in ("Target_Crop", "Target_Disease_Pest"):
+            for item in app.get(field, []) or []:
+                if isinstance(item, dict) and type(item.get("name")) is str:
+                    yield item["name"]
+
+
+def write_packed_corpus(records: Sequence[Mapping[str, Any]], out_path: Path) -> Dict[str, int]:
+    """Write `records` (parsed label dicts, in order) to `out_path` (atomically)."""
+
+    names = [str(p["_source_file"]).encode("utf-8") for p in records]
+    bodies = [dumps(p) for p in records]
+    terms = [t.encode("utf-8") for t in dict.fromkeys(t for p in records for t in _record_terms(p))]
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets: List[int] = []
+        for blobs in (names, bodies, terms):
+            offsets.append(_pad(f))
+            _cumulative(len(b) for b in blobs).tofile(f)
+            offsets.append(f.tell())
+            f.write(b"".join(blobs))
+
+        f.seek(0)
+        byteorder = 0 if sys.byteorder == "little" else 1
+        f.write(_HEADER.pack(_MAGIC, PACKED_CORPUS_VERSION, byteorder, len(records), len(terms), *offsets))
+    os.replace(tmp, out_path)
+    return {"records": len(records), "terms": len(terms), "bytes": out_path.stat().st_size}
+
+
+class PackedCorpus:
+    """Read-only, memory-mapped view of a file written by `write_packed_corpus`."""
+
+    def __init__(self, path: Path):
+        self.path = str(path)
+        with path.open("rb") as f:
+            self._mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        buf = memoryview(self._mm)
+        (magic, version, byteorder, self.n_records, self.n_terms, *offsets) = _HEADER.unpack_from(buf)
+        if magic != _MAGIC or version != PACKED_CORPUS_VERSION:
+            raise ValueError(f"Not a v{PACKED_CORPUS_VERSION} packed corpus: {path}")
+        if byteorder != (0 if sys.byteorder == "little" else 1):
+            raise ValueError(f"Packed corpus was built on a different byte order: {path}")
+
+        o_name_off, o_names, o_body_off, o_bodies, o_term_off, o_terms = offsets
+        n, v = self.n_records, self.n_terms
+        self._name_off = buf[o_name_off : o_name_off + 8 * (n + 1)].cast("Q")
+        self._names = buf[o_names : o_names + self._name_off[n]]
+        self._body_off = buf[o_body_off : o_body_off + 8 * (n + 1)].cast("Q")
+        self._o_bodies = o_bodies
+        self._bodies = buf[o_bodies : o_bodies + self._body_off[n]]
+        self._term_off = buf[o_term_off : o_term_off + 8 * (v + 1)].cast("Q")
+        self._terms = buf[o_terms : o_terms + self._term_off[v]]
+        # source file -> record number
+        self._docs = {self.name(i): i for i in range(n)}
+
+        self._decoded: "OrderedDict[int, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self.n_records
+
+    def name(self, doc: int) -> str:
+        return bytes(self._names[self._name_off[doc] : self._name_off[doc + 1]]).decode("utf-8")
+
+    def locate(self, source_file: str) -> Optional[Tuple[int, int]]:
+        """(offset, length) of a record's JSON in the file, None if it is not in this file."""
+
+        doc = self._docs.get(source_file)
+        if doc is None:
+            return None
+        start = self._body_off[doc]
+        return self._o_bodies + start, self._body_off[doc + 1] - start
+
+    def body(self, doc: int) -> bytes:
+        return bytes(self._bodies[self._body_off[doc] : self._body_off[doc + 1]])
+
+    def record(self, doc: int) -> Dict[str, Any]:
+        """The decoded record (shared with other readers: do not modify it)."""
+
+        with self._lock:
+            hit = self._decoded.get(doc)
+            if hit is not None:
+                self._decoded.move_to_end(doc)
+                return hit
+        record = loads(self.body(doc))
+        with self._lock:
+            self._decoded[doc] = record
+            while len(self._decoded) > _DECODED_ENTRIES:
+                self._decoded.popitem(last=False)
+        return record
+
+    def terms(self) -> List[str]:
+        """Distinct Target_Crop / Target_Disease_Pest names, as written on the labels."""
+
+        off, blob = self._term_off, self._terms
+        return [bytes(blob[off[i] : off[i + 1]]).decode("utf-8") for i in range(self.n_terms)]
+
+
+_OPEN_LOCK = threading.Lock()
+# Closed (unmapped) once no record refers to it any more
+_OPEN: "weakref.WeakValueDictionary[str, PackedCorpus]" = weakref.WeakValueDictionary()
+
+
+def open_corpus(path: Path) -> PackedCorpus:
+    """The mapping of `path`, shared by every record that reads from it."""
+
+    key = str(path)
+    corpus = _OPEN.get(key)
+    if corpus is not None:
+        return corpus
+    with _OPEN_LOCK:
+        corpus = _OPEN.get(key)
+        if corpus is None:
+            corpus = _OPEN[key] = PackedCorpus(Path(key))
+        return corpus
+
+
+class _Layout:
+    """Key order and resident-value positions shared by every record with the same keys."""
+
+    __slots__ = ("keys", "keyset", "resident")
+
+    def __init__(self, keys: Tuple[str, ...], resident: Tuple[str, ...]):
+        self.keys = keys
+        self.keyset = frozenset(keys)
+        self.resident = {k: i for i, k in enumerate(resident)}
+
+
+_LAYOUTS: Dict[Tuple[Tuple[str, ...], Tuple[str, ...]], _Layout] = {}
+
+
+def _layout(keys: Tuple[str, ...], resident: Tuple[str, ...]) -> _Layout:
+    layout = _LAYOUTS.get((keys, resident))
+    if layout is None:
+        layout = _LAYOUTS.setdefault((keys, resident), _Layout(keys, resident))
+    return layout
+
+
+class LabelRecord(abc.Mapping):
+    """A label whose HEAVY_FIELDS live in a PackedCorpus.
+
+    Reads like the parsed dict (`get`, `[]`, `in`, iteration); the heavy
+    fields are decoded from the mapped file when accessed. `to_dict()`
+    returns the full record and `packed()` its serialized JSON.
+    """
+
+    __slots__ = ("_layout", "_values", "_corpus", "_doc")
+
+    def __init__(self, layout: _Layout, values: Tuple[Any, ...], corpus: PackedCorpus, doc: int):
+        self._layout = layout
+        self._values = values
+        self._corpus = corpus
+        self._doc = doc
+
+    def __getitem__(self, key: str) -> Any:
+        i = self._layout.resident.get(key)
+        if i is not None:
+            return self._values[i]
+        if key in self._layout.keyset:
+            return self._corpus.record(self._doc)[key]
+        raise KeyError(key)
+
+    def get(self, key: str, default: Any = None) -> Any:
+        i = self._layout.resident.get(key)
+        if i is not None:
+            return self._values[i]
+        if key in self._layout.keyset:
+            return self._corpus.record(self._doc)[key]
+        return default
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._layout.keyset
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._layout.keys)
+
+    def __len__(self) -> int:
+        return len(self._layout.keys)
+
+    @property
+    def corpus(self) -> PackedCorpus:
+        return self._corpus
+
+    def packed(self) -> bytes:
+        return self._corpus.body(self._doc)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return loads(self.packed())
+
+    def __reduce__(self):
+        layout = self._layout
+        return _restore, (self._corpus.path, layout.keys, tuple(layout.resident), self._values, self._doc)
+
+    def __repr__(self) -> str:
+        return f"LabelRecord({self.get('_source_file')!r})"
+
+
+def _restore(
+    path: str, keys: Tuple[str, ...], resident: Tuple[str, ...], values: Tuple[Any, ...], doc: int
+) -> LabelRecord:
+    return LabelRecord(_layout(keys, resident), values, open_corpus(Path(path)), doc)
+
+
+def _segment_path(records: Sequence[Mapping[str, Any]], digests: Mapping[str, bytes], directory: Path) -> Path:
+    h = hashlib.blake2b(digest_size=16)
+    for p in records:
+        name = str(p["_source_file"])
+        h.update(name.encode("utf-8"))
+        h.update(b"\0")
+        h.update(digests.get(name, b""))
+    return directory / f"{h.hexdigest()}.bin"
+
+
+def pack_records(
+    records: Sequence[Dict[str, Any]], digests: Mapping[str, bytes], directory: Path
+) -> List[Mapping[str, Any]]:
+    """`records` as LabelRecords backed by one segment file in `directory`.
+
+    The segment is reused when another process (or an earlier run) already
+    wrote the same labels; `digests` are the files' content digests. If the
+    directory is not writable the records are returned unchanged.
+    """
+
+    if not records:
+        return list(records)
+    path = _segment_path(records, digests, directory)
+    try:
+        corpus = open_corpus(path)
+        if len(corpus) != len(records) or any(corpus.name(i) != p["_source_file"] for i, p in enumerate(records)):
+            raise ValueError(f"Packed corpus does not match its labels: {path}")
+    except (OSError, ValueError, struct.error):
+        try:
+            write_packed_corpus(records, path)
+            with _OPEN_LOCK:
+                corpus = _OPEN[str(path)] = PackedCorpus(path)
+        except OSError:
+            # Lazy loading is only a memory saving; a read-only checkout keeps the dicts.
+            return list(records)
+
+    out: List[Mapping[str, Any]] = []
+    for doc, p in enumerate(records):
+        resident = tuple(k for k in p if k not in HEAVY_FIELDS)
+        out.append(LabelRecord(_layout(tuple(p), resident), tuple(p[k] for k in resident), corpus, doc))
+    return out
+
+
+def segments(records: Iterable[Any]) -> Set[PackedCorpus]:
+    """Files the LabelRecords among `records` read from."""
+
+    return {r.corpus for r in records if isinstance(r, LabelRecord)}
+
+
+def prune_segments(directory: Path, keep: Iterable[PackedCorpus]) -> int:
+    """Delete segment files in `directory` other than `keep`; returns how many were removed.
+
+    Processes that still map a deleted file keep reading it (the data stays
+    until the last mapping goes away); a snapshot that refers to one is
+    rebuilt on its next load.
+    """
+
+    kept = {os.path.basename(c.path) for c in keep}
+    removed = 0
+    try:
+        entries = list(os.scandir(directory))
+    except OSError:
+        return 0
+    for entry in entries:
+        if entry.name.endswith(".bin") and entry.name not in kept:
+            try:
+                os.unlink(entry.path)
+                removed += 1
+            except OSError:
+                pass
+    return removed
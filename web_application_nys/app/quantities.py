@@ -0,0 +1,136 @@
+from __future__ import annotations
+
+import math
+import re
+from typing import Any, Mapping, NamedTuple, Optional, Tuple
+
+from nys_mappings.keys import unit_key
+
+# Parsing of the free-text quantities in Application_Info (REI, PHI, rates,
+# max product per season) into numbers the range index can sort on.
+#
+# Durations that list several values ("1 day for forage; 7 days for hay",
+# "72 hours for detasseling, 12 hours for other activities") parse to the
+# longest one, so an REI/PHI filter never admits an application that needs a
+# longer interval for some use. Text without a usable number reads as unknown.
+
+_HOURS_PER_UNIT = {
+    "minute": 1 / 60,
+    "hour": 1.0,
+    "day": 24.0,
+    "week": 24.0 * 7,
+    "month": 24.0 * 30,
+    "year": 24.0 * 365,
+}
+_UNIT_ALIASES = {
+    "min": "minute", "mins": "minute", "minute": "minute", "minutes": "minute",
+    "h": "hour", "hr": "hour", "hrs": "hour", "hour": "hour", "hours": "hour",
+    "d": "day", "day": "day", "days": "day",
+    "wk": "week", "wks": "week", "week": "week", "weeks": "week",
+    "month": "month", "months": "month",
+    "yr": "year", "yrs": "year", "year": "year", "years": "year",
+}
+_DURATION_RE = re.compile(
+    r"(\d+(?:\.\d+)?)\s*-?\s*(" + "|".join(sorted(_UNIT_ALIASES, key=len, reverse=True)) + r")\b",
+    re.IGNORECASE,
+)
+_BARE_NUMBER_RE = re.compile(r"^\s*(\d+(?:\.\d+)?)\s*$")
+_ZERO_PHRASES = ("no interval", "no preharvest interval", "day of harvest")
+_NUMBER_RE = re.compile(r"(\d+(?:,\d{3})*(?:\.\d+)?|\.\d+)")
+
+
+# Range-filterable columns; rate and season_max are only comparable within one unit.
+RANGE_COLUMNS = ("rei_hours", "phi_days", "rate", "season_max")
+UNIT_COLUMNS = {"rate": "rate_units", "season_max": "season_units"}
+
+
+class ApplicationQuantities(NamedTuple):
+    """Parsed quantities of one Application_Info entry (None = missing or unparseable)."""
+
+    rei_hours: Optional[float]
+    phi_days: Optional[float]
+    # high_rate (else low_rate) in `rate_units`
+    rate: Optional[float]
+    rate_units: str
+    # max_product_per_acre_per_season in `season_units`
+    season_max: Optional[float]
+    season_units: str
+
+
+def duration_hours(value: Any, bare_unit: str) -> Optional[float]:
+    """Hours in an REI/PHI value; bare numbers are read in `bare_unit` ("hour" or "day")."""
+
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) * _HOURS_PER_UNIT[bare_unit] if math.isfinite(value) else None
+    text = str(value)
+    found = [float(n) * _HOURS_PER_UNIT[_UNIT_ALIASES[u.lower()]] for n, u in _DURATION_RE.findall(text)]
+    if found:
+        return max(found)
+    m = _BARE_NUMBER_RE.match(text)
+    if m:
+        return float(m.group(1)) * _HOURS_PER_UNIT[bare_unit]
+    low = text.lower()
+    if any(phrase in low for phrase in _ZERO_PHRASES):
+        return 0.0
+    return None
+
+
+def to_number(value: Any) -> Optional[float]:
+    """Float for numeric rate cells (ints, floats, "1.5", "1,000"); None for "N/A" and the like."""
+
+    if value is None or isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value) if math.isfinite(value) else None
+    try:
+        out = float(str(value).replace(",", "").strip())
+    except ValueError:
+        return None
+    return out if math.isfinite(out) else None
+
+
+def unified_unit(unit: Any, unit_lookup: Mapping[str, str]) -> str:
+    """Unified unit for a raw unit string ("" when it is not in units_unified.csv)."""
+
+    return unit_lookup.get(unit_key(unit), "")
+
+
+def season_amount(value: Any, unit_lookup: Mapping[str, str]) -> Tuple[Optional[float], str]:
+    """(amount, unified unit) from max_product_per_acre_per_season text.
+
+    Takes the first number and the longest run of following words (up to six)
+    that units_unified.csv knows, e.g. "17.5 pints per acre per 12 month
+    period" -> (17.5, "PT/A").
+    """
+
+    text = str(value or "")
+    m = _NUMBER_RE.search(text)
+    if not m:
+        return None, ""
+    words = text[m.end():].replace("(", " ").replace(")", " ").split()[:6]
+    for n in range(len(words), 0, -1):
+        unit = unified_unit(" ".join(words[:n]).rstrip(".,;"), unit_lookup)
+        if unit:
+            return float(m.group(1).replace(",", "")), unit
+    return None, ""
+
+
+def parse_application(app: Mapping[str, Any], unit_lookup: Mapping[str, str]) -> ApplicationQuantities:
+    rate = to_number(app.get("high_rate"))
+    if rate is None:
+        rate = to_number(app.get("low_rate"))
+    rate_units = unified_unit(app.get("units"), unit_lookup) if rate is not None else ""
+    if not rate_units:
+        rate = None
+    season, season_units = season_amount(app.get("max_product_per_acre_per_season"), unit_lookup)
+    phi_hours = duration_hours(app.get("PHI"), "day")
+    return ApplicationQuantities(
+        rei_hours=duration_hours(app.get("REI"), "hour"),
+        phi_days=phi_hours / 24.0 if phi_hours is not None else None,
+        rate=rate,
+        rate_units=rate_units,
+        season_max=season,
+        season_units=season_units,
+    )
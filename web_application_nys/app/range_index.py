@@ -0,0 +1,81 @@
+from __future__ import annotations
+
+from typing import Dict, Iterable, Mapping, Optional, Set, Tuple
+
+import numpy as np
+
+from .application_table import ApplicationTable, iter_application_ids  # noqa: F401 (re-exported)
+from .quantities import RANGE_COLUMNS, UNIT_COLUMNS
+
+# column -> (min or None, max or None)
+Bounds = Mapping[str, Tuple[Optional[float], Optional[float]]]
+
+
+class ApplicationRangeIndex:
+    """Numeric REI/PHI/rate columns per application, sorted per crop for range scans.
+
+    Quantities come from the columnar application table (parsed once per
+    dataset generation, see quantities.py), indexed by application id. For
+    every normalized original crop, each column keeps its application ids
+    sorted by value (rates and season maxima per unified unit), so a bound is
+    two binary searches and a query is the intersection of the matching id
+    ranges.
+    """
+
+    def __init__(self, table: ApplicationTable):
+        self.app_record = table.app_record
+        self.columns = table.columns
+        self.units = {c: np.asarray(table.units, dtype=object)[ids] for c, ids in table.unit_ids.items()}
+
+        # (column, crop, unit) -> (sorted values, application ids in the same order); unit "" for unitless columns
+        self.sorted: Dict[Tuple[str, str, str], Tuple[np.ndarray, np.ndarray]] = {}
+        for crop, ids in table.crop_applications().items():
+            for column in RANGE_COLUMNS:
+                col = self.columns[column][ids]
+                known = ~np.isnan(col)
+                groups = [("", known)]
+                if column in UNIT_COLUMNS:
+                    unit_col = table.unit_ids[column][ids]
+                    groups = [(table.units[u], known & (unit_col == u)) for u in np.unique(unit_col[known]).tolist()]
+                for unit, sel in groups:
+                    if not sel.any():
+                        continue
+                    order = np.argsort(col[sel], kind="stable")
+                    self.sorted[(column, crop, unit)] = (col[sel][order], ids[sel][order])
+
+    def applications(self, crops: Iterable[str], bounds: Bounds, unit: str = "") -> np.ndarray:
+        """Sorted ids of applications for any of `crops` whose values satisfy every bound.
+
+        Applications with an unknown value for a bounded column never match.
+        `unit` selects the unified unit for the rate and season_max columns.
+        """
+
+        crops = list(crops)
+        result: Optional[np.ndarray] = None
+        for column, (lo, hi) in bounds.items():
+            if lo is None and hi is None:
+                continue
+            key_unit = unit if column in UNIT_COLUMNS else ""
+            parts = []
+            for crop in crops:
+                entry = self.sorted.get((column, crop, key_unit))
+                if entry is None:
+                    continue
+                vals, ids = entry
+                start = 0 if lo is None else int(np.searchsorted(vals, lo, side="left"))
+                end = len(vals) if hi is None else int(np.searchsorted(vals, hi, side="right"))
+                parts.append(ids[start:end])
+            matched = np.unique(np.concatenate(parts)) if parts else np.zeros(0, dtype=np.int32)
+            result = matched if result is None else np.intersect1d(result, matched, assume_unique=True)
+            if not len(result):
+                break
+        return result if result is not None else np.zeros(0, dtype=np.int32)
+
+    def records(self, application_ids: np.ndarray) -> Set[int]:
+        """Record ids owning the given applications."""
+
+        return set(self.app_record[application_ids].tolist())
+
+
+def has_bounds(bounds: Bounds) -> bool:
+    return any(lo is not None or hi is not None for lo, hi in bounds.values())
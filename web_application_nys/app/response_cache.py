@@ -0,0 +1,133 @@
+from __future__ import annotations
+
+import hashlib
+import os
+import shutil
+import threading
+from pathlib import Path
+from typing import Dict, Hashable, Optional
+
+from .json_cache import BytesLRU
+
+# Serialized API responses for hot read-only queries, keyed by endpoint +
+# normalized query parameters and scoped to one dataset version (see
+# routes._dataset_etag). A new version (store reload, mapping CSV save, new
+# code) empties the cache on its first request, so entries never outlive the
+# data they were built from.
+#
+# With a shared directory, entries are also written there as one file each so
+# every worker process on the host can reuse them; a local stand-in for a
+# Redis-style shared cache.
+
+
+class SharedResponseDir:
+    """File-per-entry response store under `root/<version>/`, shared by worker processes."""
+
+    def __init__(self, root: Path):
+        self.root = Path(root)
+
+    def _path(self, version: str, digest: str) -> Path:
+        return self.root / version / digest
+
+    def get(self, version: str, digest: str) -> Optional[bytes]:
+        try:
+            return self._path(version, digest).read_bytes()
+        except OSError:
+            return None
+
+    def put(self, version: str, digest: str, body: bytes) -> None:
+        path = self._path(version, digest)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_name(f"{digest}.{os.getpid()}.tmp")
+            tmp.write_bytes(body)
+            # Atomic within a directory: readers see the old file or the whole new one
+            os.replace(tmp, path)
+        except OSError:
+            pass
+
+    def clear(self, keep: str = "") -> None:
+        """Remove every version directory except `keep`."""
+
+        try:
+            entries = list(self.root.iterdir())
+        except OSError:
+            return
+        for entry in entries:
+            if entry.name != keep and entry.is_dir():
+                shutil.rmtree(entry, ignore_errors=True)
+
+
+class ResponseCache:
+    """Byte-budgeted LRU of response bodies with per-endpoint hit/miss counters."""
+
+    def __init__(self, max_bytes: int, shared_dir: Optional[Path] = None):
+        self.memory = BytesLRU(max_bytes)
+        self.shared = SharedResponseDir(shared_dir) if shared_dir else None
+        self._version = ""
+        self._lock = threading.Lock()
+        # endpoint -> [hits, shared hits, misses]
+        self._counters: Dict[str, list] = {}
+
+    @property
+    def enabled(self) -> bool:
+        return self.memory.max_bytes > 0 or self.shared is not None
+
+    def _use_version(self, version: str) -> None:
+        if version == self._version:
+            return
+        with self._lock:
+            if version == self._version:
+                return
+            self.memory.clear()
+            self._version = version
+        if self.shared is not None:
+            self.shared.clear(keep=version)
+
+    def _count(self, endpoint: str, slot: int) -> None:
+        with self._lock:
+            self._counters.setdefault(endpoint, [0, 0, 0])[slot] += 1
+
+    @staticmethod
+    def _digest(endpoint: str, params: Hashable) -> str:
+        return hashlib.blake2b(repr((endpoint, params)).encode("utf-8"), digest_size=16).hexdigest()
+
+    def get(self, version: str, endpoint: str, params: Hashable) -> Optional[bytes]:
+        self._use_version(version)
+        key = (endpoint, params)
+        body = self.memory.get(key)
+        if body is not None:
+            self._count(endpoint, 0)
+            return body
+        if self.shared is not None:
+            body = self.shared.get(version, self._digest(endpoint, params))
+            if body is not None:
+                self.memory.get_or_build(key, lambda: body)
+                self._count(endpoint, 1)
+                return body
+        self._count(endpoint, 2)
+        return None
+
+    def put(self, version: str, endpoint: str, params: Hashable, body: bytes) -> None:
+        if version != self._version:
+            return  # built from a version that has been replaced meanwhile
+        self.memory.get_or_build((endpoint, params), lambda: body)
+        if self.shared is not None:
+            self.shared.put(version, self._digest(endpoint, params), body)
+
+    def clear(self) -> None:
+        """Drop every entry (and the shared directory's entries) now."""
+
+        with self._lock:
+            self.memory.clear()
+            self._version = ""
+        if self.shared is not None:
+            self.shared.clear()
+
+    def stats(self) -> Dict[str, object]:
+        entries, size = self.memory.stats()
+        with self._lock:
+            endpoints = {
+                ep: {"hits": c[0], "shared_hits": c[1], "misses": c[2]} for ep, c in sorted(self._counters.items())
+            }
+        return {"entries": entries, "bytes": size, "shared": self.shared is not None, "endpoints": endpoints}
@@ -1,11 +1,17 @@
 from __future__ import annotations
 
+import functools
+import hashlib
 import os
 from pathlib import Path
+from typing import Any, Callable, Mapping
 
-import pandas as pd
-from flask import Blueprint, abort, jsonify, render_template, request, send_from_directory
+import numpy as np
+from flask import Blueprint, Response, abort, jsonify, make_response, render_template, request, send_from_directory
+from nys_mappings import mapping_artifact, mapping_cache, mapping_journal
 
+from .application_log_routes import moa_use_counts
+from .application_table import ApplicationTable
 from .auth import (
     get_authenticated_supabase_client,
     get_current_user_id,
@@ -13,7 +19,16 @@ from .auth import (
     is_editor,
     refresh_access_token,
 )
-from .data import JsonPesticideStore, normalize_crop_key
+from .data import JsonPesticideStore, full_record, normalize_crop_key
+from .editor_counts import EditorLabelCounts
+from .facet_index import FACETS, FacetIndex
+from .filter_index import CropTargetCounts, GuidedFilterIndex
+from .fulltext_index import load_fulltext_index
+from .json_cache import pick_encoding
+from .moa import parse_moa_codes
+from .quantities import unit_key
+from .range_index import UNIT_COLUMNS, ApplicationRangeIndex, has_bounds
+from .response_cache import ResponseCache
 from .supabase_client import get_supabase_client, is_supabase_configured
 from .target_lookup_csv import TargetLookupCsv
 
@@ -21,14 +36,135 @@ bp = Blueprint("routes", __name__)
 
 # Simple global store (fine for dev + single-process; later can be refactored)
 _STORE = JsonPesticideStore(
-    cache_seconds=int(os.environ.get("NYS_CACHE_SECONDS", "0"))
+    cache_seconds=int(os.environ.get("NYS_CACHE_SECONDS", "0")),
+    load_workers=int(os.environ.get("NYS_LOAD_WORKERS", "0")),
+    verify_parallel_load=os.environ.get("NYS_VERIFY_PARALLEL_LOAD", "0") == "1",
+    detail_cache_bytes=int(float(os.environ.get("NYS_DETAIL_CACHE_MB", "64")) * (1 << 20)),
+    lazy_details=os.environ.get("NYS_LAZY_DETAILS", "0") == "1",
 )
 _TARGET_LOOKUP = TargetLookupCsv()
 
+
+def preload_dataset() -> None:
+    """Load the dataset and build every per-generation index now.
+
+    Run in the gunicorn master with `preload_app` (NYS_PRELOAD=1): workers
+    forked afterwards share the result copy-on-write instead of each loading
+    and indexing their own copy.
+    """
+    gen = _STORE.generation()
+    gen.warm()
+    gen.moa_masks()
+    _guided_filter_index()
+    _crop_target_counts()
+    _facet_index()
+    _range_index()
+    _editor_label_counts()
+
+
+def start_store_refresher() -> None:
+    """Reload altered_json on a background thread every NYS_REFRESH_SECONDS (0 = off).
+
+    With the refresher running, requests never trigger a reload themselves;
+    they always read the last fully built dataset generation.
+    """
+    interval = float(os.environ.get("NYS_REFRESH_SECONDS", "0") or 0)
+    if interval > 0:
+        _STORE.start_refresher(interval)
+
+
 def _use_supabase_index() -> bool:
     return os.environ.get("NYS_USE_SUPABASE_INDEX", "0") == "1" and is_supabase_configured()
 
 
+# Read-only API responses are revalidated with a dataset-version ETag. The
+# version covers the JSON contents (generation id), the mapping CSVs and the
+# app code (so a deploy never 304s a body in an old format); it is the same in
+# every worker process. NYS_API_MAX_AGE > 0 lets browsers skip revalidation.
+_API_MAX_AGE = int(os.environ.get("NYS_API_MAX_AGE", "0") or 0)
+_API_CACHE_CONTROL = f"public, max-age={_API_MAX_AGE}" if _API_MAX_AGE > 0 else "no-cache"
+
+
+def _code_digest() -> bytes:
+    h = hashlib.blake2b(digest_size=8)
+    for path in sorted(Path(__file__).resolve().parent.glob("*.py")):
+        h.update(path.name.encode("utf-8"))
+        h.update(path.read_bytes())
+    return h.digest()
+
+
+_CODE_DIGEST = _code_digest()
+
+
+def _compact_mappings() -> None:
+    mapping_cache.compact_journals()
+    mapping_artifact.load_mappings()  # rewrite the artifact the pipeline and Supabase builder read
+
+
+# Folds the editor's journaled mapping edits into the CSVs once saves pause
+# for NYS_JOURNAL_COMPACT_SECONDS.
+_JOURNAL_COMPACTOR = mapping_journal.Compactor(
+    _compact_mappings, float(os.environ.get("NYS_JOURNAL_COMPACT_SECONDS", "30") or 0)
+)
+
+# Bodies of hot guided-filter responses for the current dataset version
+# (NYS_RESPONSE_CACHE_MB, 0 = off; NYS_RESPONSE_CACHE_DIR shares them across workers).
+_RESPONSE_CACHE = ResponseCache(
+    max_bytes=int(float(os.environ.get("NYS_RESPONSE_CACHE_MB", "32")) * (1 << 20)),
+    shared_dir=Path(os.environ["NYS_RESPONSE_CACHE_DIR"]) if os.environ.get("NYS_RESPONSE_CACHE_DIR") else None,
+)
+
+
+def _dataset_etag() -> str:
+    h = hashlib.blake2b(_CODE_DIGEST, digest_size=8)
+    h.update(_STORE.generation().id.encode("ascii"))
+    h.update(_mappings().version.encode("ascii"))
+    return h.hexdigest()
+
+
+def _dataset_versioned(
+    supabase_backed: bool = False, per_user: tuple[str, ...] = (), cache: bool = False
+) -> Callable:
+    """Strong ETag, Cache-Control and 304s for a read-only view of the local dataset.
+
+    `supabase_backed` views are left alone while they read from Supabase, and
+    so are requests carrying any `per_user` argument (their body depends on
+    the session). The ETag is taken before the view runs, so a body is never
+    older than the version it is tagged with. With `cache`, 200 bodies are
+    kept in `_RESPONSE_CACHE` under the query parameters (in any order).
+    """
+
+    def decorate(view: Callable) -> Callable:
+        endpoint = view.__name__
+
+        @functools.wraps(view)
+        def wrapper(*args: Any, **kwargs: Any) -> Response:
+            if (supabase_backed and _use_supabase_index()) or any(a in request.args for a in per_user):
+                return view(*args, **kwargs)
+            etag = _dataset_etag()
+            if request.if_none_match.contains_weak(etag):
+                resp = Response(status=304)
+            elif cache and _RESPONSE_CACHE.enabled:
+                params = (tuple(sorted((k, tuple(v)) for k, v in request.args.lists())), tuple(sorted(kwargs.items())))
+                body = _RESPONSE_CACHE.get(etag, endpoint, params)
+                if body is not None:
+                    resp = Response(body, mimetype="application/json")
+                else:
+                    resp = make_response(view(*args, **kwargs))
+                    if resp.status_code == 200:
+                        _RESPONSE_CACHE.put(etag, endpoint, params, resp.get_data())
+            else:
+                resp = make_response(view(*args, **kwargs))
+            if resp.status_code in (200, 304):
+                resp.set_etag(etag)
+                resp.headers["Cache-Control"] = _API_CACHE_CONTROL
+            return resp
+
+        return wrapper
+
+    return decorate
+
+
 def _pesticide_summary_from_label_index_row(row: dict) -> dict:
     """Map Supabase label_index row -> frontend-compatible pesticide summary dict."""
     source_file = (row.get("source_file") or "").strip()
@@ -91,38 +227,12 @@ def api_editor_crop_names():
     if not is_authenticated() or not is_editor():
         abort(403)
     
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "crop_names_unified.csv"
-    
     # Get label counts per crop
     label_counts = _count_labels_per_crop()
     
-    if not csv_path.exists():
-        return jsonify({"crops": []})
-    
     try:
-        df = pd.read_csv(csv_path, low_memory=False)
         crops = []
-        for _, row in df.iterrows():
-            original = str(row.get("original_crop_name", "")).strip()
-            if not original or original.lower() == "nan":
-                continue
-            
-            edited = str(row.get("edited_crop_name", "")).strip()
-            if edited.lower() == "nan":
-                edited = ""
-            
-            # Handle deployed (default True)
-            deployed_raw = row.get("deployed", True)
-            deployed = True
-            if pd.notna(deployed_raw):
-                if isinstance(deployed_raw, bool):
-                    deployed = deployed_raw
-                elif isinstance(deployed_raw, str):
-                    deployed = deployed_raw.lower() in ("true", "1", "yes", "y")
-                elif isinstance(deployed_raw, (int, float)):
-                    deployed = bool(deployed_raw)
-            
+        for original, edited, deployed in _mappings().crops.rows:
             # Get label count for this crop (normalize to match)
             normalized_original = normalize_crop_key(original)
             label_count = label_counts.get(normalized_original, 0)
@@ -148,11 +258,9 @@ def api_editor_save_crop_names():
     if not data or "crops" not in data:
         return jsonify({"error": "Invalid request"}), 400
     
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "crop_names_unified.csv"
-    
     try:
-        crops_data = []
+        current = {row.original_crop_name: row for row in _mappings().crops.rows}
+        records = []
         for crop in data["crops"]:
             original = str(crop.get("original_crop_name", "")).strip()
             if not original:
@@ -162,18 +270,15 @@ def api_editor_save_crop_names():
             deployed = crop.get("deployed", True)
             if isinstance(deployed, str):
                 deployed = deployed.lower() in ("true", "1", "yes", "y")
+            deployed = bool(deployed)
             
-            crops_data.append({
-                "original_crop_name": original,
-                "edited_crop_name": edited if edited else "",
-                "deployed": deployed
-            })
-        
-        df = pd.DataFrame(crops_data)
-        df = df.sort_values("original_crop_name")
-        df.to_csv(csv_path, index=False)
+            row = current.get(original)
+            if row is not None and row.edited_crop_name == edited and row.deployed == deployed:
+                continue
+            records.append({"key": [original], "set": {"edited_crop_name": edited, "deployed": str(deployed)}})
         
-        return jsonify({"success": True, "message": f"Saved {len(crops_data)} crop names"})
+        _record_mapping_edits(mapping_cache.CROP_NAMES_CSV, records)
+        return jsonify({"success": True, "message": f"Saved {len(records)} crop name changes"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
@@ -188,37 +293,27 @@ def api_editor_target_names():
     if not is_authenticated() or not is_editor():
         abort(403)
     
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "target_names_unified.csv"
-    
     # Load unified crop names mapping
     unified_crop_mapping, _ = _load_unified_crop_names()
     
     # Count labels per target (per unified crop + type + refined target)
     target_label_counts = _count_labels_per_target()
     
-    if not csv_path.exists():
-        return jsonify({"targets": [], "unified_crops": []})
-    
     try:
-        df = pd.read_csv(csv_path, low_memory=False)
-        
         # Deduplicate by (unified_crop, refined_target_name, source_target_type)
         # where refined_target_name = new_target_name if exists, else original_target_name
         deduplicated: dict[tuple[str, str, str], dict] = {}  # (unified_crop, refined_target_name, source_target_type) -> target data
         crops_seen: set[str] = set()
         
-        for _, row in df.iterrows():
-            original_target = str(row.get("original_target_name", "")).strip()
-            original_crop = str(row.get("original_crop", "")).strip()
-            original_target_type = str(row.get("original_target_type", "")).strip()
-            source_target_type = str(row.get("source_target_type", "")).strip()
-            
-            if not original_target or not original_crop:
-                continue
-            
-            new_target = str(row.get("new_target_name", "")).strip()
-            new_target_species = str(row.get("new_target_species", "")).strip()
+        for row in _mappings().target_rows:
+            original_target = row.original_target_name
+            original_crop = row.original_crop
+            original_target_type = row.original_target_type
+            source_target_type = row.source_target_type
+            new_target = row.new_target_name
+            new_target_species = row.new_target_species
+            deployed = row.deployed
+            main_target_list = row.main_target_list
             
             # Handle "nan" string values - convert to empty string
             if new_target.lower() == "nan":
@@ -241,30 +336,6 @@ def api_editor_target_names():
             
             crops_seen.add(unified_crop_display)
             
-            # Handle deployed (default True) - OR merge across duplicates
-            deployed = True
-            if "deployed" in df.columns:
-                deployed_raw = row.get("deployed", True)
-                if pd.notna(deployed_raw):
-                    if isinstance(deployed_raw, bool):
-                        deployed = deployed_raw
-                    elif isinstance(deployed_raw, str):
-                        deployed = deployed_raw.lower() in ("true", "1", "yes", "y")
-                    elif isinstance(deployed_raw, (int, float)):
-                        deployed = bool(deployed_raw)
-            
-            # Handle main_target_list (default False) - OR merge across duplicates
-            main_target_list = False
-            if "main_target_list" in df.columns:
-                main_raw = row.get("main_target_list", False)
-                if pd.notna(main_raw):
-                    if isinstance(main_raw, bool):
-                        main_target_list = main_raw
-                    elif isinstance(main_raw, str):
-                        main_target_list = main_raw.lower() in ("true", "1", "yes", "y")
-                    elif isinstance(main_raw, (int, float)):
-                        main_target_list = bool(main_raw)
-            
             # Deduplication key: (unified_crop, refined_target_name, source_target_type)
             key = (unified_crop_display, refined_target_name, display_target_type)
             
@@ -324,53 +395,12 @@ def api_editor_save_target_names():
     if not data or "targets" not in data:
         return jsonify({"error": "Invalid request"}), 400
     
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "target_names_unified.csv"
-    
-    if not csv_path.exists():
+    if not mapping_cache.csv_path(mapping_cache.TARGET_NAMES_CSV).exists():
         return jsonify({"error": "target_names_unified.csv not found"}), 404
     
     try:
-        # Load existing CSV
-        df = pd.read_csv(csv_path, low_memory=False)
-        
-        # Ensure required columns exist
-        if "source_target_type" not in df.columns:
-            df["source_target_type"] = ""
-        if "new_target_name" not in df.columns:
-            df["new_target_name"] = ""
-        if "new_target_species" not in df.columns:
-            df["new_target_species"] = ""
-        
-        # Load unified crop names mapping for crop-scoped updates
-        unified_crop_mapping, _ = _load_unified_crop_names()  # normalized_original -> unified_lower
-
-        # Precompute normalized unified crop for each row
-        def _row_unified_crop_norm(x: Any) -> str:
-            raw = str(x or "").strip()
-            if not raw or raw.lower() == "nan":
-                return ""
-            norm = normalize_crop_key(raw)
-            return normalize_crop_key(unified_crop_mapping.get(norm, norm))
-
-        df_unified_crop_norm = df["original_crop"].apply(_row_unified_crop_norm) if "original_crop" in df.columns else pd.Series([""] * len(df))
-
-        # Precompute refined name + display type (as the editor sees them) for matching
-        df_new = df["new_target_name"].fillna("").astype(str) if "new_target_name" in df.columns else pd.Series([""] * len(df))
-        df_new = df_new.apply(lambda s: "" if str(s).strip().lower() == "nan" else str(s))
-        df_orig = df["original_target_name"].fillna("").astype(str) if "original_target_name" in df.columns else pd.Series([""] * len(df))
-        df_refined = df_new.apply(lambda s: str(s).strip())  # candidate
-        df_refined = df_refined.where(df_refined != "", df_orig.apply(lambda s: str(s).strip()))
-        df_refined_l = df_refined.str.lower()
-
-        df_source = df["source_target_type"].fillna("").astype(str) if "source_target_type" in df.columns else pd.Series([""] * len(df))
-        df_source = df_source.apply(lambda s: "" if str(s).strip().lower() == "nan" else str(s))
-        df_orig_type = df["original_target_type"].fillna("").astype(str) if "original_target_type" in df.columns else pd.Series(["Other"] * len(df))
-        df_display_type = df_source.apply(lambda s: str(s).strip())
-        df_display_type = df_display_type.where(df_display_type != "", df_orig_type.apply(lambda s: str(s).strip() or "Other"))
-        df_display_type_l = df_display_type.str.lower()
-
-        # Process each edited target
+        groups = _target_edit_groups()
+        records = []
         for target in data["targets"]:
             refined_target_name = str(target.get("refined_target_name", "")).strip()
             source_target_type = str(target.get("source_target_type", "")).strip()
@@ -382,49 +412,94 @@ def api_editor_save_target_names():
             if not refined_target_name or not source_target_type or not unified_crop:
                 continue
 
-            crop_norm = normalize_crop_key(unified_crop)
-            refined_l = refined_target_name.lower().strip()
-            type_l = source_target_type.lower().strip()
-
             # Match by unified crop + refined name + displayed type
-            mask = (
-                (df_unified_crop_norm == crop_norm) &
-                (df_refined_l == refined_l) &
-                (df_display_type_l == type_l)
-            )
-            
-            if mask.any():
-                # Update matching rows
-                if new_target_name:
-                    df.loc[mask, "new_target_name"] = new_target_name
-                if new_target_type:
-                    # Overwrite source_target_type with new_target_type
-                    df.loc[mask, "source_target_type"] = new_target_type
-                if new_target_species:
-                    df.loc[mask, "new_target_species"] = new_target_species
-                
-                # Update deployed and main_target_list if provided
-                if "deployed" in target:
-                    deployed = target["deployed"]
-                    if isinstance(deployed, str):
-                        deployed = deployed.lower() in ("true", "1", "yes", "y")
-                    df.loc[mask, "deployed"] = deployed
-                
-                if "main_target_list" in target:
-                    main_target_list = target["main_target_list"]
-                    if isinstance(main_target_list, str):
-                        main_target_list = main_target_list.lower() in ("true", "1", "yes", "y")
-                    df.loc[mask, "main_target_list"] = main_target_list
-        
-        # Save updated CSV
-        df = df.sort_values(["original_crop", "source_target_type", "original_target_name"])
-        df.to_csv(csv_path, index=False)
+            rows = groups.get((normalize_crop_key(unified_crop), refined_target_name.lower(), source_target_type.lower()))
+            if not rows:
+                continue
+
+            changes: dict[str, str] = {}
+            if new_target_name:
+                changes["new_target_name"] = new_target_name
+            if new_target_type:
+                # Overwrite source_target_type with new_target_type
+                changes["source_target_type"] = new_target_type
+            if new_target_species:
+                changes["new_target_species"] = new_target_species
+            for flag in ("deployed", "main_target_list"):
+                if flag in target:
+                    value = target[flag]
+                    if isinstance(value, str):
+                        value = value.lower() in ("true", "1", "yes", "y")
+                    changes[flag] = str(bool(value))
+
+            # One record per row, holding only the cells that actually change
+            for key, row in rows:
+                current = {
+                    "new_target_name": _clean_cell(row.new_target_name),
+                    "source_target_type": _clean_cell(row.source_target_type),
+                    "new_target_species": _clean_cell(row.new_target_species),
+                    "deployed": str(row.deployed),
+                    "main_target_list": str(row.main_target_list),
+                }
+                diff = {col: v for col, v in changes.items() if current[col] != v}
+                if diff:
+                    records.append({"key": list(key), "set": diff})
         
-        return jsonify({"success": True, "message": f"Saved changes to target entries"})
+        _record_mapping_edits(mapping_cache.TARGET_NAMES_CSV, records)
+        return jsonify({"success": True, "message": f"Saved changes to {len(records)} target entries"})
     except Exception as e:
         return jsonify({"error": str(e)}), 500
 
 
+def _clean_cell(text: str) -> str:
+    """Editor row text ("nan" for empty cells) as the cell value a journal record would compare."""
+    return "" if text.lower() == "nan" else text
+
+
+def _record_mapping_edits(name: str, records: list[dict]) -> None:
+    """Journal editor changes; readers pick them up right away and the CSV is rewritten later."""
+    if not records:
+        return
+    mapping_cache.record_edits(name, records)
+    _RESPONSE_CACHE.clear()
+    _count_labels_per_target()  # move the edited pairs now, not on the next page load
+    _JOURNAL_COMPACTOR.schedule()
+
+
+# (stamp, groups) for _target_edit_groups
+_TARGET_EDIT_GROUPS: tuple = (None, {})
+
+
+def _target_edit_groups() -> Mapping[tuple[str, str, str], list]:
+    """target_names_unified.csv rows as the editor groups them, per mapping version.
+
+    (unified_crop_norm, refined_target_lower, display_type_lower) -> [(journal key, TargetNameRow)]
+    """
+    global _TARGET_EDIT_GROUPS
+    stamp = mapping_cache.mapping_stamp()
+    if _TARGET_EDIT_GROUPS[0] == stamp:
+        return _TARGET_EDIT_GROUPS[1]
+
+    unified_crop_mapping, _ = _load_unified_crop_names()  # normalized_original -> unified_lower
+    groups: dict[tuple[str, str, str], list] = {}
+    for row in _mappings().target_rows:
+        key = (
+            _clean_cell(row.original_crop),
+            _clean_cell(row.original_target_name),
+            _clean_cell(row.original_target_type),
+        )
+        crop, target, target_type = key
+        if not crop:
+            continue
+        crop_norm = normalize_crop_key(crop)
+        crop_norm = normalize_crop_key(unified_crop_mapping.get(crop_norm, crop_norm))
+        refined = _clean_cell(row.new_target_name) or target
+        display_type = _clean_cell(row.source_target_type) or target_type or "Other"
+        groups.setdefault((crop_norm, refined.lower(), display_type.lower()), []).append((key, row))
+    _TARGET_EDIT_GROUPS = (stamp, groups)
+    return groups
+
+
 @bp.route("/pdf-viewer")
 def pdf_viewer():
     """
@@ -492,20 +567,24 @@ def api_stats():
             "total_files": stats.total_files,
             "total_records": stats.total_records,
             "last_updated_ts": stats.last_updated_ts,
+            "response_cache": _RESPONSE_CACHE.stats(),
         }
     )
 
 
 @bp.route("/api/pesticides")
+@_dataset_versioned()
 def api_pesticides():
     page = request.args.get("page", default=1, type=int)
     per_page = request.args.get("per_page", default=50, type=int)
 
+    fields = request.args.get("fields", default="", type=str)
+
     items, total = _STORE.list_page(page=page, per_page=per_page)
 
     return jsonify(
         {
-            "pesticides": items,
+            "pesticides": _STORE.project(items, fields),
             "pagination": {
                 "page": page,
                 "per_page": min(max(per_page, 1), 500),
@@ -519,10 +598,12 @@ def api_pesticides():
 
 
 @bp.route("/api/search")
+@_dataset_versioned(supabase_backed=True)
 def api_search():
     query = request.args.get("q", default="", type=str)
     search_type = request.args.get("type", default="both", type=str)
     limit = request.args.get("limit", default=200, type=int)
+    fields = request.args.get("fields", default="", type=str)
 
     if _use_supabase_index():
         client = get_supabase_client()
@@ -554,7 +635,7 @@ def api_search():
         rows = resp.data or []
         results = [_pesticide_summary_from_label_index_row(r) for r in rows if isinstance(r, dict)]
     else:
-        results = _STORE.search(query=query, search_type=search_type, limit=limit)
+        results = _STORE.project(_STORE.search(query=query, search_type=search_type, limit=limit), fields)
 
     return jsonify(
         {
@@ -566,12 +647,51 @@ def api_search():
     )
 
 
+@bp.route("/api/suggest")
+@_dataset_versioned()
+def api_suggest():
+    """Prefix suggestions (trade names, companies, ingredients, EPA numbers) for search-as-you-type."""
+    query = request.args.get("q", default="", type=str)
+    limit = request.args.get("limit", default=8, type=int)
+    return jsonify({"query": query, "suggestions": _STORE.suggest(query, limit=limit)})
+
+
+@bp.route("/api/fulltext")
+def api_fulltext():
+    """BM25 search over extracted label text; each hit lists the matching PDF pages."""
+    query = request.args.get("q", default="", type=str)
+    limit = min(max(request.args.get("limit", default=20, type=int), 1), 100)
+
+    index = load_fulltext_index()
+    if index is None:
+        return jsonify({"error": "Full-text index not built (run scripts/build_fulltext_index.py)"}), 503
+
+    results = index.search(query, limit=limit)
+    for hit in results:
+        p = _STORE.get_by_source_file(hit["source_file"]) or {}
+        hit["trade_Name"] = p.get("trade_Name")
+        hit["epa_reg_no"] = p.get("epa_reg_no")
+    return jsonify({"query": query, "total": len(results), "results": results})
+
+
+def _detail_response(etag: str, body: bytes, encoding: str) -> Response:
+    """Send cached detail bytes; answers 304 when the client already has this ETag."""
+    resp = Response(body, mimetype="application/json")
+    resp.set_etag(etag)
+    resp.headers["Cache-Control"] = _API_CACHE_CONTROL
+    resp.vary.add("Accept-Encoding")
+    if encoding:
+        resp.headers["Content-Encoding"] = encoding
+    return resp.make_conditional(request)
+
+
 @bp.route("/api/pesticide/<path:epa_reg_no>")
 def api_pesticide_detail(epa_reg_no: str):
-    p = _STORE.get_by_epa(epa_reg_no)
-    if not p:
+    encoding = pick_encoding(request.headers.get("Accept-Encoding", ""))
+    hit = _STORE.detail_body(epa_reg_no=epa_reg_no, encoding=encoding)
+    if not hit:
         return jsonify({"error": "Pesticide not found", "epa_reg_no": epa_reg_no}), 404
-    return jsonify(p)
+    return _detail_response(*hit, encoding)
 
 
 @bp.route("/api/pesticide-file/<path:source_file>")
@@ -579,87 +699,41 @@ def api_pesticide_detail_by_file(source_file: str):
     """Fetch pesticide details by JSON filename to avoid EPA-reg-no collisions."""
     # Only allow basename lookups (prevent path traversal / accidental slashes)
     fname = os.path.basename(source_file or "")
-    p = _STORE.get_by_source_file(fname)
-    if not p:
+    encoding = pick_encoding(request.headers.get("Accept-Encoding", ""))
+    hit = _STORE.detail_body(source_file=fname, encoding=encoding) if fname else None
+    if not hit:
         return jsonify({"error": "Pesticide not found", "source_file": fname}), 404
-    return jsonify(p)
+    return _detail_response(*hit, encoding)
+
+
+_MAPPINGS: tuple = (None, None)
+
 
+def _mappings() -> mapping_artifact.MappingArtifact:
+    """Compiled crop/target mappings, loaded like the pipeline and Supabase builder load them.
 
-def _load_unified_crop_names() -> tuple[dict[str, str], dict[str, bool]]:
-    """Load crop_names_unified.csv and return mappings for unified names and deployed status.
+    Reloaded through mapping_artifact.load_mappings when mapping_cache.mapping_stamp()
+    changes. Editor saves do not rewrite the artifact; journal compaction does.
+    """
+    global _MAPPINGS
+    stamp = mapping_cache.mapping_stamp()
+    if _MAPPINGS[0] == stamp:
+        return _MAPPINGS[1]
+    mappings = mapping_artifact.load_mappings(write=False)
+    _MAPPINGS = (stamp, mappings)
+    return mappings
+
+
+def _load_unified_crop_names() -> tuple[Mapping[str, str], Mapping[str, bool]]:
+    """Unified names and deployed status from crop_names_unified.csv (compiled, read-only).
     
     Returns:
         Tuple of:
-        - Dictionary mapping normalized_original_crop_name -> unified_crop_name
-        - Dictionary mapping normalized_original_crop_name -> deployed (bool)
+        - Mapping normalized_original_crop_name -> unified_crop_name
+        - Mapping normalized_original_crop_name -> deployed (bool)
     """
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "crop_names_unified.csv"
-    
-    if not csv_path.exists():
-        return {}, {}
-    
-    try:
-        df = pd.read_csv(csv_path, low_memory=False)
-        if "original_crop_name" not in df.columns:
-            return {}, {}
-        
-        # Map normalized original crop name -> unified crop name
-        mapping: dict[str, str] = {}
-        deployed_map: dict[str, bool] = {}
-        
-        for _, row in df.iterrows():
-            original_raw = row.get("original_crop_name")
-            edited_raw = row.get("edited_crop_name")
-            deployed_raw = row.get("deployed", True)  # Default to True if column doesn't exist
-            
-            # Handle pandas NaN and string "nan"
-            original = ""
-            if pd.notna(original_raw):
-                original = str(original_raw).strip()
-            if original.lower() == "nan":
-                original = ""
-            
-            edited = ""
-            if pd.notna(edited_raw):
-                edited = str(edited_raw).strip()
-            if edited.lower() == "nan":
-                edited = ""
-            
-            # Handle deployed (default True)
-            deployed = True
-            if pd.notna(deployed_raw):
-                if isinstance(deployed_raw, bool):
-                    deployed = deployed_raw
-                elif isinstance(deployed_raw, str):
-                    deployed = deployed_raw.lower() in ("true", "1", "yes", "y")
-                elif isinstance(deployed_raw, (int, float)):
-                    deployed = bool(deployed_raw)
-            
-            # Skip empty original crop names
-            if not original:
-                continue
-            
-            # Normalize the original crop name to match how _STORE.list_crops() normalizes
-            normalized_original = normalize_crop_key(original)
-            if not normalized_original:
-                continue
-            
-            # Determine unified name: use edited if provided and not empty, otherwise use normalized original
-            if edited and edited.strip():
-                # Normalize the edited name too for consistency
-                unified = normalize_crop_key(edited)
-                if unified:
-                    mapping[normalized_original] = unified
-                else:
-                    mapping[normalized_original] = normalized_original
-            else:
-                mapping[normalized_original] = normalized_original
-            
-            deployed_map[normalized_original] = deployed
-        return mapping, deployed_map
-    except Exception:
-        return {}, {}
+    names = _mappings().crops
+    return names.unified, names.deployed
 
 
 def _get_unified_crop_name(crop_name: str, unified_mapping: dict[str, str]) -> str:
@@ -667,11 +741,11 @@ def _get_unified_crop_name(crop_name: str, unified_mapping: dict[str, str]) -> s
     return unified_mapping.get(crop_name, crop_name)
 
 
-def _load_unified_target_names() -> dict[str, dict[str, Any]]:
-    """Load target_names_unified.csv and return a mapping.
+def _load_unified_target_names() -> Mapping[tuple[str, str], Mapping[str, Any]]:
+    """Unified targets from target_names_unified.csv (compiled, read-only).
     
     Returns:
-        Dictionary mapping (normalized_target, normalized_crop) -> {
+        Mapping (normalized_target, normalized_crop) -> {
             'unified_target': str,
             'unified_target_type': str,
             'original_target_type': str,
@@ -679,269 +753,50 @@ def _load_unified_target_names() -> dict[str, dict[str, Any]]:
             'main_target_list': bool
         }
     """
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "target_names_unified.csv"
-    
-    if not csv_path.exists():
-        return {}
-    
-    try:
-        df = pd.read_csv(csv_path, low_memory=False)
-        required_cols = ["original_target_name", "original_crop", "original_target_type"]
-        if not all(col in df.columns for col in required_cols):
-            return {}
-        
-        mapping: dict[tuple[str, str], dict[str, Any]] = {}
-        
-        for _, row in df.iterrows():
-            original_target_raw = row.get("original_target_name")
-            original_crop_raw = row.get("original_crop")
-            original_target_type_raw = row.get("original_target_type")
-            
-            # Handle pandas NaN
-            original_target = ""
-            if pd.notna(original_target_raw):
-                original_target = str(original_target_raw).strip()
-            if original_target.lower() == "nan" or not original_target:
-                continue
-            
-            original_crop = ""
-            if pd.notna(original_crop_raw):
-                original_crop = str(original_crop_raw).strip()
-            if original_crop.lower() == "nan" or not original_crop:
-                continue
-            
-            original_target_type = ""
-            if pd.notna(original_target_type_raw):
-                original_target_type = str(original_target_type_raw).strip()
-            if original_target_type.lower() == "nan" or not original_target_type:
-                original_target_type = "Other"
-            
-            new_target_raw = row.get("new_target_name", "")
-            new_target_type_raw = row.get("new_target_type", "")
-            
-            new_target = ""
-            if pd.notna(new_target_raw):
-                new_target = str(new_target_raw).strip()
-            if new_target.lower() == "nan":
-                new_target = ""
-            
-            new_target_type = ""
-            if pd.notna(new_target_type_raw):
-                new_target_type = str(new_target_type_raw).strip()
-            if new_target_type.lower() == "nan":
-                new_target_type = ""
-            
-            # Handle deployed (default True)
-            deployed = True
-            if "deployed" in df.columns:
-                deployed_raw = row.get("deployed", True)
-                if pd.notna(deployed_raw):
-                    if isinstance(deployed_raw, bool):
-                        deployed = deployed_raw
-                    elif isinstance(deployed_raw, str):
-                        deployed = deployed_raw.lower() in ("true", "1", "yes", "y")
-                    elif isinstance(deployed_raw, (int, float)):
-                        deployed = bool(deployed_raw)
-            
-            # Handle main_target_list (default False)
-            main_target_list = False
-            if "main_target_list" in df.columns:
-                main_raw = row.get("main_target_list", False)
-                if pd.notna(main_raw):
-                    if isinstance(main_raw, bool):
-                        main_target_list = main_raw
-                    elif isinstance(main_raw, str):
-                        main_target_list = main_raw.lower() in ("true", "1", "yes", "y")
-                    elif isinstance(main_raw, (int, float)):
-                        main_target_list = bool(main_raw)
-            
-            # Normalize for lookup key (CSV is now unique by crop+target, not crop+target+type)
-            normalized_target = original_target.lower().strip()
-            normalized_crop = normalize_crop_key(original_crop)
-            key = (normalized_target, normalized_crop)
-            
-            # Determine unified values
-            unified_target = new_target.lower().strip() if new_target else normalized_target
-            unified_target_type = new_target_type.lower().strip() if new_target_type else original_target_type.lower().strip()
-            
-            mapping[key] = {
-                'unified_target': unified_target,
-                'unified_target_type': unified_target_type,
-                'original_target_type': original_target_type.lower().strip(),
-                'deployed': deployed,
-                'main_target_list': main_target_list
-            }
-        
-        return mapping
-    except Exception:
-        return {}
+    return _mappings().target_unified
+
 
+def _editor_label_counts() -> EditorLabelCounts:
+    """Editor count tables for the current dataset generation (scanned once per generation)."""
+    gen = _STORE.generation()
+    counts = gen.derived.get("editor_counts")
+    if counts is None:
+        counts = gen.derived["editor_counts"] = EditorLabelCounts(gen.records)
+    return counts
 
-def _count_labels_per_crop() -> dict[str, int]:
+
+def _count_labels_per_crop() -> Mapping[str, int]:
     """Count the number of unique pesticide labels (EPA reg nos) per normalized crop."""
-    crop_label_counts: dict[str, set[str]] = {}  # normalized_crop -> set of epa_reg_nos
-    
-    for p, app in _STORE.iter_applications():
-        epa = str(p.get("epa_reg_no") or "").strip()
-        if not epa:
-            continue
-        
-        for crop in app.get("Target_Crop", []) or []:
-            if not isinstance(crop, dict):
-                continue
-            raw = str(crop.get("name") or "").strip()
-            if not raw:
-                continue
-            normalized = normalize_crop_key(raw)
-            if normalized:
-                crop_label_counts.setdefault(normalized, set()).add(epa)
-    
-    # Convert to counts
-    return {crop: len(epas) for crop, epas in crop_label_counts.items()}
+    return _editor_label_counts().crop_counts
 
 
-def _build_target_mapping_from_csv() -> dict[tuple[str, str], dict[str, Any]]:
-    """Build a lookup from (normalized_original_crop, normalized_target_name) -> unified info.
+def _build_target_mapping_from_csv() -> Mapping[tuple[str, str], Mapping[str, Any]]:
+    """Lookup from (normalized_original_crop, normalized_target_name) -> unified info.
 
     This is the canonical mapping used by guided filter + editor to:
     - map raw JSON target names to refined names (new_target_name) when present
     - use source_target_type when present (otherwise original_target_type)
     - respect deployed/main_target_list flags
-    """
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "target_names_unified.csv"
-    if not csv_path.exists():
-        return {}
 
-    try:
-        df = pd.read_csv(csv_path, low_memory=False)
-    except Exception:
-        return {}
-
-    mapping: dict[tuple[str, str], dict[str, Any]] = {}
-
-    for _, row in df.iterrows():
-        original_target = str(row.get("original_target_name", "")).strip()
-        original_crop = str(row.get("original_crop", "")).strip()
-        original_target_type = str(row.get("original_target_type", "")).strip() or "Other"
-        source_target_type = str(row.get("source_target_type", "")).strip()
-        new_target = str(row.get("new_target_name", "")).strip()
-
-        if not original_target or not original_crop:
-            continue
-
-        if new_target.lower() == "nan":
-            new_target = ""
-        if source_target_type.lower() == "nan":
-            source_target_type = ""
-
-        refined_target_name = (new_target if new_target else original_target).strip()
-        display_target_type = (source_target_type if source_target_type else original_target_type).strip() or "Other"
-
-        # deployed (default True)
-        deployed = True
-        if "deployed" in df.columns:
-            deployed_raw = row.get("deployed", True)
-            if pd.notna(deployed_raw):
-                if isinstance(deployed_raw, bool):
-                    deployed = deployed_raw
-                elif isinstance(deployed_raw, str):
-                    deployed = deployed_raw.lower() in ("true", "1", "yes", "y")
-                elif isinstance(deployed_raw, (int, float)):
-                    deployed = bool(deployed_raw)
-
-        # main_target_list (default False)
-        main_target_list = False
-        if "main_target_list" in df.columns:
-            main_raw = row.get("main_target_list", False)
-            if pd.notna(main_raw):
-                if isinstance(main_raw, bool):
-                    main_target_list = main_raw
-                elif isinstance(main_raw, str):
-                    main_target_list = main_raw.lower() in ("true", "1", "yes", "y")
-                elif isinstance(main_raw, (int, float)):
-                    main_target_list = bool(main_raw)
-
-        key = (normalize_crop_key(original_crop), normalize_crop_key(original_target))
-        mapping[key] = {
-            "refined_target_name": refined_target_name,
-            "refined_target_l": refined_target_name.lower().strip(),
-            "display_target_type": display_target_type,
-            "display_target_type_l": display_target_type.lower().strip(),
-            "deployed": deployed,
-            "main_target_list": main_target_list,
-        }
-
-    return mapping
+    Compiled once per version of target_names_unified.csv (see _mappings).
+    """
+    return _mappings().target_mapping
 
 
-def _count_labels_per_target() -> dict[tuple[str, str, str], int]:
+def _count_labels_per_target() -> Mapping[tuple[str, str, str], int]:
     """Count unique labels per (unified_crop, display_target_type, refined_target_name).
 
     Key is normalized: (unified_crop_norm, display_type_lower, refined_target_lower).
+    Mapping edits only move the affected (crop, target) pairs between keys.
     """
-    target_mapping = _build_target_mapping_from_csv()
-    if not target_mapping:
-        return {}
-
     unified_crop_mapping, _ = _load_unified_crop_names()  # normalized_original -> unified_lower
-
-    # (unified_crop_norm, type_l, refined_target_l) -> set[source_file]
-    counts: dict[tuple[str, str, str], set[str]] = {}
-
-    for p, app in _STORE.iter_applications():
-        source_file = str(p.get("_source_file") or "").strip()
-        if not source_file:
-            epa = str(p.get("epa_reg_no") or "").strip()
-            if not epa:
-                continue
-            source_file = epa.lower()
-        source_file_l = source_file.lower()
-
-        # Collect all crop variants in this application (original + unified)
-        crop_pairs: list[tuple[str, str]] = []  # (normalized_original_crop, unified_crop_norm)
-        for crop in app.get("Target_Crop", []) or []:
-            if not isinstance(crop, dict):
-                continue
-            raw = str(crop.get("name") or "").strip()
-            if not raw:
-                continue
-            norm_orig = normalize_crop_key(raw)
-            if not norm_orig:
-                continue
-            unified_norm = normalize_crop_key(unified_crop_mapping.get(norm_orig, norm_orig))
-            crop_pairs.append((norm_orig, unified_norm))
-
-        if not crop_pairs:
-            continue
-
-        for t in app.get("Target_Disease_Pest", []) or []:
-            if not isinstance(t, dict):
-                continue
-            target_name = str(t.get("name") or "").strip()
-            if not target_name:
-                continue
-            norm_target = normalize_crop_key(target_name)
-            if not norm_target:
-                continue
-
-            for norm_orig_crop, unified_crop_norm in crop_pairs:
-                info = target_mapping.get((norm_orig_crop, norm_target))
-                if not info:
-                    continue
-                if not info.get("deployed", True):
-                    continue
-                refined_l = str(info.get("refined_target_l") or "").strip().lower()
-                type_l = str(info.get("display_target_type_l") or "other").strip().lower()
-                if not refined_l or not unified_crop_norm:
-                    continue
-                counts.setdefault((unified_crop_norm, type_l, refined_l), set()).add(source_file_l)
-
-    return {k: len(v) for k, v in counts.items()}
+    return _editor_label_counts().target_counts(
+        mapping_cache.mapping_stamp(), _build_target_mapping_from_csv(), unified_crop_mapping
+    )
 
 
 @bp.route("/api/enums/crops")
+@_dataset_versioned(supabase_backed=True)
 def api_enums_crops():
     """Return unique crops for guided filtering, using unified crop names if available.
     
@@ -995,8 +850,9 @@ def api_enums_crops():
 
 
 @bp.route("/api/enums/target-types")
+@_dataset_versioned(supabase_backed=True, cache=True)
 def api_enums_target_types():
-    """Return target types for a given crop from target_names_unified.csv."""
+    """Return target types that have guided-filter results for a given crop."""
     crop = normalize_crop_key(request.args.get("crop", default="", type=str))
 
     if _use_supabase_index():
@@ -1022,63 +878,13 @@ def api_enums_target_types():
         types = sorted(set(types), key=lambda x: x.lower()) or ["Other"]
         return jsonify({"crop": crop, "target_types": types})
 
-    script_dir = Path(__file__).resolve().parent.parent.parent
-    csv_path = script_dir / "target_names_unified.csv"
-    
-    # Load unified crop names mapping
-    unified_crop_mapping, _ = _load_unified_crop_names()
-    
-    # Create reverse mapping: unified -> list of originals
-    unified_to_originals: dict[str, list[str]] = {}
-    for orig, unified in unified_crop_mapping.items():
-        unified_to_originals.setdefault(unified, []).append(orig)
-    # Also add crops that aren't in the mapping
-    all_crops = _STORE.list_crops()
-    for c in all_crops:
-        if c not in unified_crop_mapping:
-            unified_to_originals.setdefault(c, []).append(c)
-    
-    # Get all original crop names that map to the selected unified crop
-    if crop:
-        matching_originals = unified_to_originals.get(crop, [crop])
-        matching_originals_normalized = {normalize_crop_key(c) for c in matching_originals}
-    else:
-        matching_originals_normalized = None
-    
-    if not csv_path.exists():
-        return jsonify({"crop": crop, "target_types": ["Other"]})
-    
-    try:
-        df = pd.read_csv(csv_path, low_memory=False)
-        
-        # Filter by crop if specified
-        if crop and matching_originals_normalized:
-            # Filter rows where original_crop matches any of the matching originals
-            crop_mask = df['original_crop'].apply(
-                lambda x: normalize_crop_key(str(x) if pd.notna(x) else "") in matching_originals_normalized
-            )
-            df_filtered = df[crop_mask]
-        else:
-            df_filtered = df
-        
-        # Get unique target types from original_target_type column
-        target_types = df_filtered['original_target_type'].dropna().unique()
-        target_types = [str(t).strip() for t in target_types if t and str(t).strip()]
-        
-        # Remove duplicates and sort
-        target_types = sorted(set(target_types))
-        
-        # If no target types found, return "Other"
-        if not target_types:
-            target_types = ["Other"]
-        
-        return jsonify({"crop": crop, "target_types": target_types})
-    except Exception as e:
-        # Fallback to Other if there's an error
-        return jsonify({"crop": crop, "target_types": ["Other"], "error": str(e)})
+    counts = _crop_target_counts()
+    types = counts.types(crop) if counts is not None and crop else []
+    return jsonify({"crop": crop, "target_types": types or ["Other"]})
 
 
 @bp.route("/api/enums/targets")
+@_dataset_versioned(supabase_backed=True, cache=True)
 def api_enums_targets():
     """Return simplified targets (with counts) for crop + target type, using unified targets.
     
@@ -1134,11 +940,86 @@ def api_enums_targets():
             }
         )
 
-    unified_mapping, _ = _load_unified_crop_names()
-    target_mapping = _build_target_mapping_from_csv()
-    if not target_mapping:
-        return jsonify({"crop": crop, "target_type": target_type, "targets": [], "main_targets": []})
+    counts = _crop_target_counts()
+    main_targets, other_targets = counts.lookup(crop, target_type) if counts is not None else ([], [])
+    return jsonify({
+        "crop": crop,
+        "target_type": target_type,
+        "targets": main_targets + other_targets,
+        "main_targets": [t["name"] for t in main_targets],
+        "has_more": len(other_targets) > 0
+    })
+
+
+@bp.route("/api/enums/units")
+@_dataset_versioned()
+def api_enums_units():
+    """Return unique unified units from units_unified.csv."""
+    if not mapping_cache.csv_path(mapping_cache.UNITS_CSV).exists():
+        return jsonify({"error": "units_unified.csv not found"}), 404
     
+    units = mapping_cache.units()
+    if units is None:
+        return jsonify({"error": "Unified column not found in units_unified.csv"}), 500
+    
+    return jsonify({"units": list(units)})
+
+
+def _guided_filter_index() -> GuidedFilterIndex | None:
+    """Guided-filter index for the current dataset generation and mapping CSVs.
+
+    None when target_names_unified.csv is missing/unreadable (the filter then
+    falls back to the per-request scan with the legacy target lookup).
+    """
+    gen = _STORE.generation()
+    stamp = mapping_cache.mapping_stamp()
+    cached = gen.derived.get("guided_filter")
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    target_mapping = _build_target_mapping_from_csv()
+    index = None
+    if target_mapping:
+        unified_mapping, deployed_map = _load_unified_crop_names()
+        index = GuidedFilterIndex(gen.records, target_mapping, unified_mapping, deployed_map)
+    gen.derived["guided_filter"] = (stamp, index)
+    return index
+
+
+def _crop_target_counts() -> CropTargetCounts | None:
+    """Dropdown counts for the current guided-filter index (None when it is unavailable).
+
+    Built from the index's postings, so each count is the local /api/filter total
+    and the label_count of the Supabase label_crop_target_counts view.
+    """
+    gen = _STORE.generation()
+    index = _guided_filter_index()
+    cached = gen.derived.get("crop_target_counts")
+    if cached is not None and cached[0] is index:
+        return cached[1]
+
+    counts = CropTargetCounts(index) if index is not None else None
+    gen.derived["crop_target_counts"] = (index, counts)
+    return counts
+
+
+def _facet_index() -> FacetIndex:
+    """Facet bitmaps for the current dataset generation and mapping CSVs."""
+    gen = _STORE.generation()
+    stamp = mapping_cache.mapping_stamp()
+    cached = gen.derived.get("facets")
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+
+    unified_mapping, _ = _load_unified_crop_names()
+    index = FacetIndex(gen.records, _build_target_mapping_from_csv(), unified_mapping)
+    gen.derived["facets"] = (stamp, index)
+    return index
+
+
+def _matching_original_crops(crop: str) -> set[str]:
+    """Normalized original crop names that the unified `crop` stands for."""
+    unified_mapping, _ = _load_unified_crop_names()
     # Create reverse mapping: unified -> list of originals
     unified_to_originals: dict[str, list[str]] = {}
     for orig, unified in unified_mapping.items():
@@ -1151,146 +1032,131 @@ def api_enums_targets():
 
     # Get all original crop names that map to the selected unified crop
     matching_originals = unified_to_originals.get(crop, [crop])
-    matching_originals_normalized = {normalize_crop_key(c) for c in matching_originals}
+    return {normalize_crop_key(c) for c in matching_originals}
 
-    # refined_target_name -> {'count': int, 'main_target_list': bool, 'source_files': set}
-    buckets: dict[str, dict[str, Any]] = {}
-    normalized_type = target_type.lower().strip()
 
-    for p, app in _STORE.iter_applications():
-        # Crop match: collect all matching original crop variants in this application
-        matched_crop_norms: set[str] = set()
-        for c in app.get("Target_Crop", []) or []:
-            if not isinstance(c, dict):
-                continue
-            original_crop = str(c.get("name") or "").strip()
-            norm = normalize_crop_key(original_crop)
-            if norm and norm in matching_originals_normalized:
-                matched_crop_norms.add(norm)
+def _application_table() -> ApplicationTable:
+    """Columnar Application_Info for the current dataset generation and units CSV.
 
-        if not matched_crop_norms:
-            continue
+    Only units_unified.csv goes into the table, so crop/target edits do not rebuild it.
+    """
+    gen = _STORE.generation()
+    unit_lookup = mapping_cache.unit_lookup()
+    cached = gen.derived.get("application_table")
+    if cached is not None and cached[0] is unit_lookup:
+        return cached[1]
 
-        source_file = str(p.get("_source_file") or "").strip()
-        if not source_file:
-            source_file = str(p.get("epa_reg_no") or "").strip().lower()
-        
-        for t in app.get("Target_Disease_Pest", []) or []:
-            if not isinstance(t, dict):
-                continue
-            name = str(t.get("name") or "").strip()
-            if not name:
-                continue
+    table = ApplicationTable(gen.records, unit_lookup)
+    gen.derived["application_table"] = (unit_lookup, table)
+    return table
 
-            normalized_target = normalize_crop_key(name)
-            if not normalized_target:
-                continue
 
-            # Find first matching mapping among crop variants
-            hit_info = None
-            for crop_norm in matched_crop_norms:
-                hit_info = target_mapping.get((crop_norm, normalized_target))
-                if hit_info:
-                    break
-            if not hit_info:
-                continue
+def _range_index() -> ApplicationRangeIndex:
+    """Numeric REI/PHI/rate index for the current dataset generation and units CSV."""
+    gen = _STORE.generation()
+    table = _application_table()
+    cached = gen.derived.get("ranges")
+    if cached is not None and cached[0] is table:
+        return cached[1]
 
-            if not hit_info.get("deployed", True):
-                continue
-            if hit_info.get("display_target_type_l", "").lower().strip() != normalized_type:
-                continue
+    index = ApplicationRangeIndex(table)
+    gen.derived["ranges"] = (table, index)
+    return index
 
-            refined_target_name = str(hit_info.get("refined_target_name") or "").strip()
-            if not refined_target_name:
-                continue
 
-            bucket_key = refined_target_name.lower().strip()
-            refined_target_display = refined_target_name.title()
-            main_target_list = bool(hit_info.get("main_target_list", False))
+# /api/filter range parameters (<prefix>_min / <prefix>_max) -> ApplicationRangeIndex columns
+_RANGE_PARAMS = {"rei": "rei_hours", "phi": "phi_days", "rate": "rate", "season": "season_max"}
 
-            if bucket_key not in buckets:
-                buckets[bucket_key] = {
-                    "name": refined_target_display,
-                    "count": 0,
-                    "main_target_list": main_target_list,
-                    "source_files": set(),
-                }
 
-            buckets[bucket_key]["source_files"].add(source_file)
-            buckets[bucket_key]["count"] = len(buckets[bucket_key]["source_files"])
+def _range_bounds() -> dict[str, tuple[float | None, float | None]]:
+    return {
+        column: (request.args.get(f"{prefix}_min", type=float), request.args.get(f"{prefix}_max", type=float))
+        for prefix, column in _RANGE_PARAMS.items()
+    }
 
-    # Convert to list and sort: main_target_list first, then by count descending, then alphabetically
-    targets = []
-    main_targets = []
-    other_targets = []
-    
-    for unified_target, data in buckets.items():
-        target_obj = {
-            "name": data['name'],
-            "count": data['count'],
-            "main_target_list": data['main_target_list']
-        }
-        if data['main_target_list']:
-            main_targets.append(target_obj)
-        else:
-            other_targets.append(target_obj)
-    
-    # Sort main targets by count desc, then name
-    main_targets.sort(key=lambda x: (-x["count"], x["name"].lower()))
-    # Sort other targets by count desc, then name
-    other_targets.sort(key=lambda x: (-x["count"], x["name"].lower()))
-    
-    # Combine: main targets first, then other targets
-    targets = main_targets + other_targets
-    
-    return jsonify({
-        "crop": crop,
-        "target_type": target_type,
-        "targets": targets,
-        "main_targets": [t["name"] for t in main_targets],
-        "has_more": len(other_targets) > 0
-    })
 
+def _scan_filter_without_mapping(crop: str, target_type: str, target: str) -> list[dict]:
+    """Legacy guided filter scan, used only when the target mapping CSV is unavailable."""
+    matching_originals_normalized = _matching_original_crops(crop)
 
-@bp.route("/api/enums/units")
-def api_enums_units():
-    """Return unique unified units from units_unified.csv."""
-    try:
-        script_dir = Path(__file__).resolve().parent.parent.parent
-        units_csv_path = script_dir / "units_unified.csv"
-        
-        if not units_csv_path.exists():
-            return jsonify({"error": "units_unified.csv not found"}), 404
+    matched: list[dict] = []
+    seen_source_files: set[str] = set()
+
+    target_l = target.lower()
+
+    for p, app in _STORE.iter_applications():
+        # Use source_file (unique per label) for deduplication instead of EPA reg no
+        source_file = str(p.get("_source_file") or "").strip()
+        if not source_file:
+            # Fallback to EPA reg no if source_file is missing (shouldn't happen in normal operation)
+            epa = str(p.get("epa_reg_no") or "").strip()
+            if not epa:
+                continue
+            source_file = epa.lower()  # Use normalized EPA as fallback
         
-        df = pd.read_csv(units_csv_path, low_memory=False)
+        # Normalize source_file to lowercase for consistent deduplication
+        source_file_normalized = source_file.lower()
         
-        # Get unique non-blank values from the "Unified" column
-        unified_col = None
-        for c in df.columns:
-            if str(c).strip().lower() == "unified":
-                unified_col = c
+        # Skip if we've already added this pesticide label (check at the very start)
+        if source_file_normalized in seen_source_files:
+            continue
+
+        # Crop match - check if any original crop matches the unified crop
+        crop_ok = False
+        crop_normalized = None
+        for c in app.get("Target_Crop", []) or []:
+            if isinstance(c, dict):
+                original_crop = str(c.get("name") or "").strip()
+                normalized_original = normalize_crop_key(original_crop)
+                if normalized_original in matching_originals_normalized:
+                    crop_ok = True
+                    crop_normalized = normalized_original
+                    break
+        if not crop_ok or not crop_normalized:
+            continue
+
+        # Target match (legacy target lookup)
+        hit = False
+
+        for t in app.get("Target_Disease_Pest", []) or []:
+            if not isinstance(t, dict):
+                continue
+            name = str(t.get("name") or "").strip()
+            if not name:
+                continue
+            info = _TARGET_LOOKUP.lookup(name)
+            if info.target_type != target_type:
+                continue
+            simplified = (info.simplified or name).strip().lower()
+            if simplified == target_l:
+                hit = True
                 break
-        
-        if unified_col is None:
-            return jsonify({"error": "Unified column not found in units_unified.csv"}), 500
-        
-        units = df[unified_col].dropna().unique()
-        units = [str(u).strip() for u in units if str(u).strip()]
-        units = sorted(units)
-        
-        return jsonify({"units": units})
-    except Exception as e:
-        return jsonify({"error": str(e)}), 500
+
+        if hit:
+            # Mark as seen BEFORE appending to ensure we never add duplicates
+            # This prevents the same pesticide label from being added multiple times
+            # even if it has multiple Application_Info entries with different crop variants
+            seen_source_files.add(source_file_normalized)
+            matched.append(p)
+
+    return matched
 
 
 @bp.route("/api/filter")
+@_dataset_versioned(supabase_backed=True, per_user=("max_moa_uses",), cache=True)
 def api_filter():
-    """Filter pesticides by crop + target type + simplified target (guided filter)."""
+    """Filter pesticides by crop + target type + simplified target (guided filter).
+
+    `exclude_moa` (repeatable, comma-separated) drops labels carrying any of
+    those MOA codes; `max_moa_uses=N` also drops codes the signed-in user has
+    applied N or more times on one block this `year` (see /api/application-log/moa-risk).
+    """
     crop = request.args.get("crop", default="", type=str).strip()  # This is already unified
     target_type = request.args.get("target_type", default="", type=str).strip()
     target = request.args.get("target", default="", type=str).strip()
     page = request.args.get("page", default=1, type=int)
     per_page = request.args.get("per_page", default=50, type=int)
+    fields = request.args.get("fields", default="", type=str)
 
     if not crop or not target_type or not target:
         return jsonify({"error": "crop, target_type, and target are required"}), 400
@@ -1298,7 +1164,28 @@ def api_filter():
     page = max(page, 1)
     per_page = min(max(per_page, 1), 500)
 
+    bounds = _range_bounds()
+    ranged = has_bounds(bounds)
+    rate_units = request.args.get("rate_units", default="", type=str).strip()
+    if any(bounds[c] != (None, None) for c in UNIT_COLUMNS) and not rate_units:
+        return jsonify({"error": "rate_units is required with rate/season filters"}), 400
+
+    exclude_moa = [code for raw in request.args.getlist("exclude_moa") for code in parse_moa_codes(raw)]
+    max_moa_uses = request.args.get("max_moa_uses", default=None, type=int)
+    if max_moa_uses is not None:
+        counts, error = moa_use_counts(request.args.get("year", default=None, type=int))
+        if error:
+            return jsonify({"error": error}), 500
+        if counts is None:
+            return jsonify({"error": "Authentication required for max_moa_uses"}), 401
+        exclude_moa += [code for code, uses in counts.items() if uses >= max_moa_uses]
+    exclude_moa = sorted(set(exclude_moa))
+
     if _use_supabase_index():
+        if ranged:
+            return jsonify({"error": "REI/PHI/rate filters are not available with the Supabase index"}), 400
+        if exclude_moa:
+            return jsonify({"error": "MOA rotation filters are not available with the Supabase index"}), 400
         client = get_supabase_client()
         if not client:
             return jsonify({"error": "Supabase not configured"}), 500
@@ -1347,122 +1234,81 @@ def api_filter():
             }
         )
 
-    unified_mapping, _ = _load_unified_crop_names()
-    # Create reverse mapping: unified -> list of originals
-    unified_to_originals: dict[str, list[str]] = {}
-    for orig, unified in unified_mapping.items():
-        unified_to_originals.setdefault(unified, []).append(orig)
-    # Also add crops that aren't in the mapping
-    all_crops = _STORE.list_crops()
-    for c in all_crops:
-        if c not in unified_mapping:
-            unified_to_originals.setdefault(c, []).append(c)
-
-    # Get all original crop names that map to the selected unified crop
-    matching_originals = unified_to_originals.get(crop, [crop])
-    matching_originals_normalized = {normalize_crop_key(c) for c in matching_originals}
-
-    # Build target mapping from CSV once
-    target_mapping = _build_target_mapping_from_csv()
-
-    matched: list[dict] = []
-    seen_source_files: set[str] = set()
-
-    target_l = target.lower()
-    target_type_l = target_type.lower().strip()
-
-    for p, app in _STORE.iter_applications():
-        # Use source_file (unique per label) for deduplication instead of EPA reg no
-        source_file = str(p.get("_source_file") or "").strip()
-        if not source_file:
-            # Fallback to EPA reg no if source_file is missing (shouldn't happen in normal operation)
-            epa = str(p.get("epa_reg_no") or "").strip()
-            if not epa:
-                continue
-            source_file = epa.lower()  # Use normalized EPA as fallback
-        
-        # Normalize source_file to lowercase for consistent deduplication
-        source_file_normalized = source_file.lower()
-        
-        # Skip if we've already added this pesticide label (check at the very start)
-        if source_file_normalized in seen_source_files:
-            continue
+    index = _guided_filter_index()
+    applications: set[int] | None = None
+    if ranged:
+        unit = mapping_cache.unit_lookup().get(unit_key(rate_units), rate_units)
+        crops = index.matching_crops(crop) if index is not None else _matching_original_crops(crop)
+        applications = set(_range_index().applications(crops, bounds, unit).tolist())
 
-        # Crop match - check if any original crop matches the unified crop
-        crop_ok = False
-        crop_normalized = None
-        for c in app.get("Target_Crop", []) or []:
-            if isinstance(c, dict):
-                original_crop = str(c.get("name") or "").strip()
-                normalized_original = normalize_crop_key(original_crop)
-                if normalized_original in matching_originals_normalized:
-                    crop_ok = True
-                    crop_normalized = normalized_original
-                    break
-        if not crop_ok or not crop_normalized:
-            continue
+    if index is not None:
+        matched = index.lookup(crop, target_type, target, applications)
+    else:
+        matched = _scan_filter_without_mapping(crop, target_type, target)
+        if applications is not None:
+            records = _STORE.generation().records
+            allowed = {id(records[rid]) for rid in _range_index().records(np.fromiter(applications, dtype=np.int32))}
+            matched = [p for p in matched if id(p) in allowed]
+    if exclude_moa:
+        matched = _STORE.generation().moa_masks().exclude(matched, exclude_moa)
 
-        # Target match (by refined_target_name + source_target_type)
-        hit = False
+    total = len(matched)
+    start = (page - 1) * per_page
+    end = start + per_page
+    return jsonify(
+        {
+            "pesticides": _STORE.project(matched[start:end], fields),
+            "total": total,
+            "excluded_moa": exclude_moa,
+            "pagination": {
+                "page": page,
+                "per_page": per_page,
+                "has_next": end < total,
+                "total_pages": (total + per_page - 1) // per_page if total else 0,
+            },
+        }
+    )
 
-        if target_mapping:
-            for t in app.get("Target_Disease_Pest", []) or []:
-                if not isinstance(t, dict):
-                    continue
-                name = str(t.get("name") or "").strip()
-                if not name:
-                    continue
 
-                normalized_target = normalize_crop_key(name)
-                if not normalized_target:
-                    continue
+# Facets counted by /api/facets unless `counts=` says otherwise
+_DEFAULT_FACET_COUNTS = ("target_type", "product_type", "moa", "signal_word", "long_island_use_restriction")
 
-                info = target_mapping.get((crop_normalized, normalized_target))
-                if not info:
-                    continue
-                if not info.get("deployed", True):
-                    continue
-                if info.get("display_target_type_l", "").lower().strip() != target_type_l:
-                    continue
-                if info.get("refined_target_l", "").lower().strip() == target_l:
-                    hit = True
-                    break
-        else:
-            # Fallback to old lookup if CSV doesn't exist / couldn't be read
-            for t in app.get("Target_Disease_Pest", []) or []:
-                if not isinstance(t, dict):
-                    continue
-                name = str(t.get("name") or "").strip()
-                if not name:
-                    continue
-                info = _TARGET_LOOKUP.lookup(name)
-                if info.target_type != target_type:
-                    continue
-                simplified = (info.simplified or name).strip().lower()
-                if simplified == target_l:
-                    hit = True
-                    break
 
-        if hit:
-            # Mark as seen BEFORE appending to ensure we never add duplicates
-            # This prevents the same pesticide label from being added multiple times
-            # even if it has multiple Application_Info entries with different crop variants
-            seen_source_files.add(source_file_normalized)
-            matched.append(p)
+@bp.route("/api/facets")
+@_dataset_versioned()
+def api_facets():
+    """Multi-select faceted filter over the local dataset.
 
-    total = len(matched)
+    Each facet (crop, target_type, target, product_type, moa, signal_word,
+    long_island_use_restriction) may be repeated: values of one facet are
+    OR'ed, facets are AND'ed, and `not_<facet>` values are excluded. With a
+    crop selected, target/target_type match targets listed for that crop.
+    `counts` lists the facets to return per-value counts for.
+    """
+    include = {f: request.args.getlist(f) for f in FACETS}
+    exclude = {f: request.args.getlist(f"not_{f}") for f in FACETS}
+    page = max(request.args.get("page", default=1, type=int), 1)
+    per_page = min(max(request.args.get("per_page", default=50, type=int), 1), 500)
+    fields = request.args.get("fields", default="", type=str)
+    counts_arg = request.args.get("counts", default=None, type=str)
+    count_facets = _DEFAULT_FACET_COUNTS if counts_arg is None else [
+        f for f in (part.strip() for part in counts_arg.split(",")) if f in FACETS
+    ]
+
+    index = _facet_index()
     start = (page - 1) * per_page
-    end = start + per_page
+    total, ids = index.search(include, exclude, start, per_page)
     return jsonify(
         {
-            "pesticides": matched[start:end],
+            "pesticides": _STORE.project([index.records[i] for i in ids], fields),
             "total": total,
             "pagination": {
                 "page": page,
                 "per_page": per_page,
-                "has_next": end < total,
+                "has_next": start + per_page < total,
                 "total_pages": (total + per_page - 1) // per_page if total else 0,
             },
+            "facets": {f: index.facet_counts(include, exclude, f) for f in count_facets},
         }
     )
 
@@ -1506,7 +1352,7 @@ def api_favorites():
             if not pesticide and epa:
                 pesticide = _STORE.get_by_epa(epa)
             if pesticide:
-                favorites.append(pesticide)
+                favorites.append(full_record(pesticide))
         return jsonify({"favorites": favorites, "total": len(favorites)})
     except Exception as e:
         error_msg = str(e)
@@ -1538,7 +1384,7 @@ def api_favorites():
                             if not pesticide and epa:
                                 pesticide = _STORE.get_by_epa(epa)
                             if pesticide:
-                                favorites.append(pesticide)
+                                favorites.append(full_record(pesticide))
                         return jsonify({"favorites": favorites, "total": len(favorites)})
                     except Exception as retry_error:
                         return jsonify({"error": "Session expired. Please log in again."}), 401
@@ -0,0 +1,290 @@
+from __future__ import annotations
+
+import bisect
+import re
+from array import array
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+try:
+    from rapidfuzz import fuzz, process  # type: ignore
+except Exception:  # pragma: no cover
+    fuzz = None  # type: ignore
+    process = None  # type: ignore
+
+
+# (trade, epa, company, ingredient names), lowercased exactly as the old scan did
+_Fields = Tuple[str, str, str, Tuple[str, ...]]
+
+# Once the running intersection is this small, verifying candidates directly is
+# cheaper than walking the remaining (longer) posting lists.
+_VERIFY_BELOW = 64
+
+
+def _search_fields(r: Dict[str, Any]) -> _Fields:
+    company = r.get("company_name") or r.get("COMPANY_NAME")
+    ingredients = tuple(
+        str(ing.get("name") or "").lower()
+        for ing in r.get("Active_Ingredients", []) or []
+        if isinstance(ing, dict)
+    )
+    return (
+        str(r.get("trade_Name") or "").lower(),
+        str(r.get("epa_reg_no") or "").lower(),
+        str(company or "").lower(),
+        ingredients,
+    )
+
+
+def _trigrams(text: str) -> set:
+    return {text[i : i + 3] for i in range(len(text) - 2)}
+
+
+def score_fields(fields: _Fields, q: str) -> float:
+    """Ranking used by the "both" search (0 means no match)."""
+
+    tl, el, cl, ingredients = fields
+    score = 0.0
+    if tl == q:
+        score += 10
+    elif tl.startswith(q):
+        score += 6
+    elif q in tl:
+        score += 4
+
+    if el == q:
+        score += 8
+    elif q in el:
+        score += 3
+
+    if q in cl:
+        score += 1
+
+    if score == 0:
+        for name in ingredients:
+            if q in name:
+                score += 2
+                break
+    return score
+
+
+class TrigramIndex:
+    """Trigram inverted index over trade name, EPA number, company and ingredients.
+
+    Record ids are positions in the generation's (sorted) record list and every
+    posting list is ascending, so candidates come back in record order. Lookups
+    only narrow the candidate set; each candidate is still verified and scored
+    against its lowercased fields, which keeps results identical to a full scan.
+    Queries shorter than three characters have no trigram and fall back to a
+    scan of the precomputed fields.
+    """
+
+    __slots__ = ("records", "fields", "postings")
+
+    def __init__(self, records: Sequence[Dict[str, Any]]):
+        self.records = records
+        self.fields: List[_Fields] = []
+        self.postings: Dict[str, array] = {}
+
+        for i, r in enumerate(records):
+            fields = _search_fields(r)
+            self.fields.append(fields)
+            grams: set = set()
+            for text in (fields[0], fields[1], fields[2], *fields[3]):
+                grams |= _trigrams(text)
+            for gram in grams:
+                ids = self.postings.get(gram)
+                if ids is None:
+                    ids = self.postings[gram] = array("I")
+                ids.append(i)
+
+    def candidates(self, q: str) -> Optional[List[int]]:
+        """Ascending ids that may contain `q`; None means "every record"."""
+
+        if len(q) < 3:
+            return None
+        lists = []
+        for gram in _trigrams(q):
+            ids = self.postings.get(gram)
+            if ids is None:
+                return []
+            lists.append(ids)
+        lists.sort(key=len)
+
+        found = set(lists[0])
+        for ids in lists[1:]:
+            if len(found) < _VERIFY_BELOW:
+                break
+            found.intersection_update(ids)
+        return sorted(found)
+
+    def _ids(self, q: str) -> Sequence[int]:
+        ids = self.candidates(q)
+        return range(len(self.records)) if ids is None else ids
+
+    def search(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        """Ranked substring search; `q` must already be stripped and lowercased."""
+
+        scored: List[Tuple[float, Dict[str, Any]]] = []
+        fields, records = self.fields, self.records
+        for i in self._ids(q):
+            score = score_fields(fields[i], q)
+            if score > 0:
+                scored.append((score, records[i]))
+
+        scored.sort(key=lambda t: t[0], reverse=True)
+        return [r for _, r in scored[:limit]]
+
+    def epa_contains(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        """Records whose EPA number contains `q`, in record order."""
+
+        out: List[Dict[str, Any]] = []
+        for i in self._ids(q):
+            if q in self.fields[i][1]:
+                out.append(self.records[i])
+                if len(out) >= limit:
+                    break
+        return out
+
+
+class PrefixIndex:
+    """Sorted-vocabulary prefix lookup for search-as-you-type suggestions.
+
+    One sorted key list per kind (lowercased, as in the store's exact-key
+    indexes) plus parallel display values and record counts. A lookup is a
+    bisect to the first key >= the prefix followed by at most `limit` steps,
+    so its cost does not depend on how many names share the prefix.
+    """
+
+    __slots__ = ("keys", "values", "counts")
+
+    def __init__(self, vocabularies: Dict[str, Dict[str, Tuple[str, int]]]):
+        # kind (an /api/search `type`) -> {lowercased key: (display value, record count)}
+        self.keys: Dict[str, List[str]] = {}
+        self.values: Dict[str, List[str]] = {}
+        self.counts: Dict[str, List[int]] = {}
+        for kind, vocab in vocabularies.items():
+            keys = sorted(vocab)
+            self.keys[kind] = keys
+            self.values[kind] = [vocab[k][0] for k in keys]
+            self.counts[kind] = [vocab[k][1] for k in keys]
+
+    def suggest(self, prefix: str, limit: int) -> Dict[str, List[Dict[str, Any]]]:
+        """Up to `limit` names per kind starting with `prefix` (already lowercased), A-Z."""
+
+        out: Dict[str, List[Dict[str, Any]]] = {}
+        for kind, keys in self.keys.items():
+            values, counts = self.values[kind], self.counts[kind]
+            hits: List[Dict[str, Any]] = []
+            i = bisect.bisect_left(keys, prefix)
+            while i < len(keys) and len(hits) < limit and keys[i].startswith(prefix):
+                hits.append({"value": values[i], "count": counts[i]})
+                i += 1
+            out[kind] = hits
+        return out
+
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+# Per-token similarity (rapidfuzz ratio, 0-100) a vocabulary token needs to
+# count as a match, and the mean over query tokens a name needs to be returned.
+FUZZY_TOKEN_CUTOFF = 75
+FUZZY_NAME_CUTOFF = 75
+
+
+def fuzzy_available() -> bool:
+    return process is not None
+
+
+class FuzzyIndex:
+    """Typo-tolerant lookup of trade names and active ingredients.
+
+    Names are split into tokens and the distinct tokens form one sorted
+    vocabulary, which grows far slower than the number of labels. A query is
+    tokenized the same way and scored against the whole vocabulary in a single
+    `process.cdist` call; a vocabulary token that starts with a query token
+    (3+ characters) also counts as a full match, so partially typed words
+    work. A name's score is the mean of its best match per query token
+    (unmatched tokens count 0), and matching names are mapped back to records
+    through the store's exact-key indexes.
+    """
+
+    __slots__ = ("indexes", "names", "vocab", "token_names")
+
+    def __init__(self, indexes: Dict[str, Dict[str, List[Dict[str, Any]]]]):
+        # kind (an /api/search `type`) -> exact-key index (lowercased name -> records)
+        self.indexes = indexes
+        self.names: List[Tuple[str, str]] = []
+        token_names: Dict[str, List[int]] = {}
+        for kind, index in indexes.items():
+            for key in index:
+                name_id = len(self.names)
+                self.names.append((kind, key))
+                for token in set(_TOKEN_RE.findall(key)):
+                    token_names.setdefault(token, []).append(name_id)
+        self.vocab: List[str] = sorted(token_names)
+        self.token_names: List[array] = [array("I", token_names[t]) for t in self.vocab]
+
+    def _token_scores(self, tokens: List[str]) -> List[Dict[int, float]]:
+        """For each query token: {vocabulary token id: score} above the cutoff."""
+
+        matrix = process.cdist(
+            tokens,
+            self.vocab,
+            scorer=fuzz.ratio,
+            processor=None,
+            score_cutoff=FUZZY_TOKEN_CUTOFF,
+            workers=1,
+        )
+        out: List[Dict[int, float]] = []
+        for row, token in zip(matrix, tokens):
+            hits = {int(i): float(row[i]) for i in row.nonzero()[0]}
+            if len(token) >= 3:
+                i = bisect.bisect_left(self.vocab, token)
+                while i < len(self.vocab) and self.vocab[i].startswith(token):
+                    hits[i] = 100.0
+                    i += 1
+            out.append(hits)
+        return out
+
+    def match_names(self, q: str) -> List[Tuple[float, str, str]]:
+        """(score, kind, key) for every name scoring >= FUZZY_NAME_CUTOFF, best first."""
+
+        tokens = list(dict.fromkeys(_TOKEN_RE.findall(q)))
+        if not tokens or not self.vocab:
+            return []
+
+        best: Dict[int, List[float]] = {}
+        for j, hits in enumerate(self._token_scores(tokens)):
+            for token_id, score in hits.items():
+                for name_id in self.token_names[token_id]:
+                    row = best.get(name_id)
+                    if row is None:
+                        row = best[name_id] = [0.0] * len(tokens)
+                    if score > row[j]:
+                        row[j] = score
+
+        matched = []
+        for name_id, row in best.items():
+            score = sum(row) / len(tokens)
+            if score >= FUZZY_NAME_CUTOFF:
+                kind, key = self.names[name_id]
+                matched.append((score, kind, key))
+        # Ties keep kind order (trade names first), then alphabetical.
+        kind_rank = {kind: i for i, kind in enumerate(self.indexes)}
+        matched.sort(key=lambda t: (-t[0], kind_rank[t[1]], t[2]))
+        return matched
+
+    def search(self, q: str, limit: int) -> List[Dict[str, Any]]:
+        """Records behind the best-matching names; `q` must already be lowercased."""
+
+        results: List[Dict[str, Any]] = []
+        seen: set = set()
+        for _, kind, key in self.match_names(q):
+            for record in self.indexes[kind].get(key, []):
+                if id(record) in seen:
+                    continue
+                seen.add(id(record))
+                results.append(record)
+                if len(results) >= limit:
+                    return results
+        return results
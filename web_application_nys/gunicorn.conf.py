@@ -0,0 +1,18 @@
+"""Gunicorn settings, read automatically when gunicorn runs from this directory.
+
+NYS_PRELOAD=1 imports the app in the master process: the dataset and its
+indexes are built once there and the workers forked from it share those
+pages copy-on-write (see "Shared dataset across workers" in README_web_app.md).
+"""
+
+import os
+
+preload_app = os.environ.get("NYS_PRELOAD", "0") == "1"
+
+
+def post_fork(server, worker):
+    if preload_app:
+        # Threads do not survive fork(), so each worker starts its own refresher.
+        from app.routes import start_store_refresher
+
+        start_store_refresher()
@@ -0,0 +1,4 @@
+# Crop/target/unit mapping CSVs compiled into read-only lookups, shared by the
+# web app (`app`), the pipeline (nys_altered_json.py) and the scripts. Nothing
+# here imports Flask or the `app` package, so the pipeline can load the
+# mappings without the web stack.
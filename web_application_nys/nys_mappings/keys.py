@@ -0,0 +1,106 @@
+from __future__ import annotations
+
+import sys
+from typing import Any, Dict
+
+# Name keys shared by the web app, the pipeline (nys_altered_json.py) and the
+# Supabase index builder: crop/target names and units normalized the same way
+# everywhere the mapping CSVs are matched against label JSON.
+
+# Phrase-level plural fixes
+_PHRASE_SINGULARS = {
+    "dry bulb onions": "dry bulb onion",
+    "green onions": "green onion",
+}
+
+_IRREGULAR_SINGULARS = {
+    "strawberries": "strawberry",
+    "blueberries": "blueberry",
+    "raspberries": "raspberry",
+    "blackberries": "blackberry",
+    "cranberries": "cranberry",
+    "cherries": "cherry",
+    "potatoes": "potato",
+    "tomatoes": "tomato",
+    "grapes": "grape",
+    "apples": "apple",
+    "onions": "onion",
+    "soybeans": "soybean",
+    "pumpkins": "pumpkin",
+    "beans": "bean",
+}
+
+# Symbol table for names loaded from the corpus: raw crop/target name ->
+# interned normalized key. Filled by the store's `intern_record` (through
+# `remember_name_key`), so normalizing a loaded
+# name (the hot loops over Application_Info) is one dict lookup. Names that
+# only arrive in requests are normalized without being remembered, which keeps
+# the table bounded by the corpus.
+_NAME_KEYS: Dict[str, str] = {}
+
+
+def normalize_crop_key(name: str) -> str:
+    """Normalize crop names to a stable, singular, lowercase key.
+
+    This is used for:
+    - de-duplicating crops (Apple/Apples, Grape/Grapes, etc.)
+    - matching user-selected crop filters against raw JSON crop names
+    """
+
+    if type(name) is str:
+        key = _NAME_KEYS.get(name)
+        if key is not None:
+            return key
+    return _normalize_name(name)
+
+
+def _normalize_name(name: str) -> str:
+    s = str(name or "").strip()
+    if not s:
+        return ""
+
+    # Remove parenthetical content (e.g. "Onion (green)")
+    if "(" in s:
+        s = s.split("(")[0].strip()
+
+    # Normalize whitespace
+    s = " ".join(s.split())
+
+    low = s.lower()
+    if low in _PHRASE_SINGULARS:
+        return _PHRASE_SINGULARS[low]
+
+    # Normalize last token to singular (handles "Apples", "Strawberries", "Potatoes", etc.)
+    parts = low.split(" ")
+    last = parts[-1]
+
+    if last in _IRREGULAR_SINGULARS:
+        last = _IRREGULAR_SINGULARS[last]
+    elif last.endswith("ies") and len(last) > 3:
+        # berries -> berry
+        last = last[:-3] + "y"
+    elif last.endswith("oes") and len(last) > 3:
+        # potatoes -> potato, tomatoes -> tomato
+        last = last[:-2]
+    elif last.endswith("s") and len(last) > 3 and not last.endswith(("ss", "us", "is")):
+        # grapes -> grape, apples -> apple
+        last = last[:-1]
+
+    parts[-1] = last
+    return " ".join(parts).strip()
+
+
+def remember_name_key(name: str) -> None:
+    """Record the normalized key of a (sys.intern'ed) corpus name."""
+
+    if name not in _NAME_KEYS:
+        key = sys.intern(_normalize_name(name))
+        # Callers normalize `str(name).strip()`; remember both spellings.
+        _NAME_KEYS[name] = key
+        _NAME_KEYS.setdefault(sys.intern(name.strip()), key)
+
+
+def unit_key(unit: Any) -> str:
+    """Lookup key for units_unified.csv units (case and whitespace-insensitive)."""
+
+    return " ".join(str(unit or "").lower().split())
@@ -0,0 +1,319 @@
+from __future__ import annotations
+
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Dict, Iterable, List, Mapping, NamedTuple, Optional, Tuple
+
+from . import mapping_cache
+from .mapping_cache import CropNameRow, CropNames, TargetNameRow
+
+# Compiled crop/target mappings in one binary file, shared by the web app, the
+# pipeline (nys_altered_json.py) and the Supabase index builder.
+#
+# The mappings are compiled by mapping_cache (one normalization for every
+# consumer) and stored with interned string ids. Layout (native byte order,
+# recorded in the header):
+#   header
+#   str_off      u64[n_strings + 1]  offsets into strings
+#   strings      utf-8 blob          every distinct string, by id
+#   crop_rows    u32[3 * n]          original, edited, deployed (editor rows)
+#   crop_map     u32[3 * n]          original_norm, unified_norm, deployed
+#   tgt_unified  u32[6 * n]          target_norm, crop_norm, unified_target,
+#                                    unified_target_type, original_target_type, flags
+#   tgt_mapping  u32[7 * n]          crop_norm, target_norm, refined_target_name,
+#                                    refined_target_l, display_target_type,
+#                                    display_target_type_l, flags
+#   tgt_rows     u32[7 * n]          original_target_name, original_crop,
+#                                    original_target_type, source_target_type,
+#                                    new_target_name, new_target_species, flags
+#                                    (editor rows)
+# flags: bit 0 deployed, bit 1 main_target_list. Sections start on 8-byte
+# boundaries. The header carries `mapping_cache.mapping_version()` of the
+# CSVs it was compiled from and their `mapping_cache.file_stamp()`. A load
+# whose stamp matches trusts the file without hashing the CSVs; otherwise the
+# digest decides, and a stale file is recompiled.
+
+MAPPING_ARTIFACT_VERSION = 2
+_MAGIC = b"NYSMAP\0\0"
+# magic, version, byteorder (0 little / 1 big), source mapping version,
+# source file stamp, n_strings, n_crop_rows, n_crop_map, n_unified, n_mapping,
+# n_target_rows, 7 section offsets
+_STAMP_LEN = 10
+_HEADER = struct.Struct(f"=8sHH16s{_STAMP_LEN}q6I7Q")
+
+_DEPLOYED = 1
+_MAIN_TARGET_LIST = 2
+
+
+def get_mapping_artifact_path() -> Path:
+    """Defaults to `web_application_nys/.cache/mappings.bin`; override with `NYS_MAPPING_ARTIFACT`."""
+
+    override = os.environ.get("NYS_MAPPING_ARTIFACT")
+    if override:
+        return Path(override).expanduser().resolve()
+    return Path(__file__).resolve().parents[1] / ".cache" / "mappings.bin"
+
+
+class MappingArtifact(NamedTuple):
+    # mapping_cache.mapping_version() of the CSVs the mappings came from
+    version: str
+    # mapping_cache.file_stamp() of those CSVs and their journals
+    stamp: Tuple[int, ...]
+    crops: CropNames
+    # (normalized_target, normalized_crop) -> unified target info (see mapping_cache.TargetNames)
+    target_unified: Mapping[Tuple[str, str], Mapping[str, Any]]
+    # (normalized_original_crop, normalized_target) -> refined target info
+    target_mapping: Mapping[Tuple[str, str], Mapping[str, Any]]
+    # target_names_unified.csv rows as the editor lists them
+    target_rows: Tuple[TargetNameRow, ...]
+
+
+def _flags(info: Mapping[str, Any]) -> int:
+    return (_DEPLOYED if info["deployed"] else 0) | (_MAIN_TARGET_LIST if info["main_target_list"] else 0)
+
+
+def compile_mappings() -> MappingArtifact:
+    """The current mappings as mapping_cache compiled them (CSV plus edit journal)."""
+
+    # Stamp first: files changed while compiling then fail the stamp check and get hashed
+    stamp = mapping_cache.file_stamp()
+    targets = mapping_cache.target_names()
+    return MappingArtifact(
+        version=mapping_cache.mapping_version(),
+        stamp=stamp,
+        crops=mapping_cache.crop_names(),
+        target_unified=targets.unified,
+        target_mapping=targets.mapping,
+        target_rows=targets.rows,
+    )
+
+
+def _pad(f, align: int = 8) -> int:
+    pos = f.tell()
+    if pos % align:
+        f.write(b"\0" * (align - pos % align))
+    return f.tell()
+
+
+def _cumulative(sizes: Iterable[int]) -> array:
+    out = array("Q", [0])
+    total = 0
+    for n in sizes:
+        total += n
+        out.append(total)
+    return out
+
+
+def write_mapping_artifact(mappings: MappingArtifact, out_path: Path) -> Dict[str, int]:
+    """Write `mappings` to `out_path` (atomically)."""
+
+    ids: Dict[str, int] = {}
+
+    def sid(s: str) -> int:
+        i = ids.get(s)
+        if i is None:
+            i = ids[s] = len(ids)
+        return i
+
+    crops = mappings.crops
+    crop_rows = array("I")
+    for row in crops.rows:
+        crop_rows.extend((sid(row.original_crop_name), sid(row.edited_crop_name), int(row.deployed)))
+    crop_map = array("I")
+    for original, unified in crops.unified.items():
+        crop_map.extend((sid(original), sid(unified), int(crops.deployed.get(original, True))))
+    tgt_unified = array("I")
+    for (target, crop), info in mappings.target_unified.items():
+        tgt_unified.extend(
+            (
+                sid(target),
+                sid(crop),
+                sid(info["unified_target"]),
+                sid(info["unified_target_type"]),
+                sid(info["original_target_type"]),
+                _flags(info),
+            )
+        )
+    tgt_mapping = array("I")
+    for (crop, target), info in mappings.target_mapping.items():
+        tgt_mapping.extend(
+            (
+                sid(crop),
+                sid(target),
+                sid(info["refined_target_name"]),
+                sid(info["refined_target_l"]),
+                sid(info["display_target_type"]),
+                sid(info["display_target_type_l"]),
+                _flags(info),
+            )
+        )
+    tgt_rows = array("I")
+    for row in mappings.target_rows:
+        tgt_rows.extend(
+            (
+                sid(row.original_target_name),
+                sid(row.original_crop),
+                sid(row.original_target_type),
+                sid(row.source_target_type),
+                sid(row.new_target_name),
+                sid(row.new_target_species),
+                _flags(row._asdict()),
+            )
+        )
+
+    out_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        f.write(b"\0" * _HEADER.size)
+        offsets: List[int] = []
+
+        encoded = [s.encode("utf-8") for s in ids]  # dicts keep insertion (= id) order
+        offsets.append(_pad(f))
+        _cumulative(len(b) for b in encoded).tofile(f)
+        offsets.append(f.tell())
+        f.write(b"".join(encoded))
+        for section in (crop_rows, crop_map, tgt_unified, tgt_mapping, tgt_rows):
+            offsets.append(_pad(f))
+            section.tofile(f)
+
+        f.seek(0)
+        byteorder = 0 if sys.byteorder == "little" else 1
+        f.write(
+            _HEADER.pack(
+                _MAGIC,
+                MAPPING_ARTIFACT_VERSION,
+                byteorder,
+                mappings.version.encode("ascii"),
+                *mappings.stamp,
+                len(ids),
+                len(crop_rows) // 3,
+                len(crop_map) // 3,
+                len(tgt_unified) // 6,
+                len(tgt_mapping) // 7,
+                len(tgt_rows) // 7,
+                *offsets,
+            )
+        )
+    os.replace(tmp, out_path)
+    return {"strings": len(ids), "targets": len(tgt_mapping) // 7, "bytes": out_path.stat().st_size}
+
+
+def _unpack_header(buf, path: Path) -> Tuple[Any, ...]:
+    magic, version, byteorder, *fields = _HEADER.unpack_from(buf)
+    if magic != _MAGIC or version != MAPPING_ARTIFACT_VERSION:
+        raise ValueError(f"Not a v{MAPPING_ARTIFACT_VERSION} mapping artifact: {path}")
+    if byteorder != (0 if sys.byteorder == "little" else 1):
+        raise ValueError(f"Mapping artifact was built on a different byte order: {path}")
+    return tuple(fields)
+
+
+def read_mapping_source(path: Path) -> Tuple[str, Tuple[int, ...]]:
+    """(mapping version, file stamp) a mapping artifact was compiled from; reads only the header."""
+
+    with path.open("rb") as f:
+        source, *fields = _unpack_header(f.read(_HEADER.size), path)
+    return source.decode("ascii"), tuple(fields[:_STAMP_LEN])
+
+
+def read_mapping_artifact(path: Path) -> MappingArtifact:
+    """Decode a file written by `write_mapping_artifact` (one read; every string is interned once)."""
+
+    buf = memoryview(path.read_bytes())
+    source, *fields = _unpack_header(buf, path)
+    stamp = tuple(fields[:_STAMP_LEN])
+    n_strings, n_rows, n_crops, n_unified, n_mapping, n_target_rows, *offsets = fields[_STAMP_LEN:]
+
+    o_str_off, o_strings, o_rows, o_crops, o_unified, o_mapping, o_target_rows = offsets
+    str_off = buf[o_str_off : o_str_off + 8 * (n_strings + 1)].cast("Q")
+    blob = bytes(buf[o_strings : o_strings + str_off[n_strings]])
+    strings = [sys.intern(blob[str_off[i] : str_off[i + 1]].decode("utf-8")) for i in range(n_strings)]
+
+    def section(offset: int, n: int, width: int) -> Iterable[Tuple[int, ...]]:
+        ints = buf[offset : offset + 4 * width * n].cast("I")
+        return (tuple(ints[i : i + width]) for i in range(0, width * n, width))
+
+    rows = tuple(CropNameRow(strings[o], strings[e], bool(d)) for o, e, d in section(o_rows, n_rows, 3))
+    unified: Dict[str, str] = {}
+    deployed: Dict[str, bool] = {}
+    for o, u, d in section(o_crops, n_crops, 3):
+        unified[strings[o]] = strings[u]
+        deployed[strings[o]] = bool(d)
+
+    target_unified: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+    for t, c, ut, utt, ott, flags in section(o_unified, n_unified, 6):
+        target_unified[(strings[t], strings[c])] = MappingProxyType(
+            {
+                "unified_target": strings[ut],
+                "unified_target_type": strings[utt],
+                "original_target_type": strings[ott],
+                "deployed": bool(flags & _DEPLOYED),
+                "main_target_list": bool(flags & _MAIN_TARGET_LIST),
+            }
+        )
+    target_mapping: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+    for c, t, name, name_l, dtype, dtype_l, flags in section(o_mapping, n_mapping, 7):
+        target_mapping[(strings[c], strings[t])] = MappingProxyType(
+            {
+                "refined_target_name": strings[name],
+                "refined_target_l": strings[name_l],
+                "display_target_type": strings[dtype],
+                "display_target_type_l": strings[dtype_l],
+                "deployed": bool(flags & _DEPLOYED),
+                "main_target_list": bool(flags & _MAIN_TARGET_LIST),
+            }
+        )
+
+    target_rows = tuple(
+        TargetNameRow(
+            strings[t], strings[c], strings[ott], strings[stt], strings[nt], strings[ns],
+            bool(flags & _DEPLOYED), bool(flags & _MAIN_TARGET_LIST),
+        )
+        for t, c, ott, stt, nt, ns, flags in section(o_target_rows, n_target_rows, 7)
+    )
+
+    return MappingArtifact(
+        version=source.decode("ascii"),
+        stamp=stamp,
+        crops=CropNames(MappingProxyType(unified), MappingProxyType(deployed), rows),
+        target_unified=MappingProxyType(target_unified),
+        target_mapping=MappingProxyType(target_mapping),
+        target_rows=target_rows,
+    )
+
+
+def load_mappings(path: Optional[Path] = None, write: bool = True) -> MappingArtifact:
+    """The compiled mappings, read from the artifact when it matches the CSVs.
+
+    The artifact matches when its file stamp equals the current one, or, after
+    a stamp change (an edit, a checkout touching the files), when its content
+    digest does; only then are the CSVs hashed. A missing, unreadable or stale
+    artifact is recompiled from the CSVs and, with `write`, rewritten (best
+    effort: a read-only checkout still gets the mappings). A matching
+    artifact with an old stamp is rewritten too, so the next load skips the
+    hash again.
+    """
+
+    path = path or get_mapping_artifact_path()
+    stamp = mapping_cache.file_stamp()
+    mappings = None
+    try:
+        version, source_stamp = read_mapping_source(path)
+        if source_stamp == stamp or version == mapping_cache.mapping_version():
+            mappings = read_mapping_artifact(path)
+            if mappings.stamp == stamp:
+                return mappings
+            mappings = mappings._replace(stamp=stamp)
+    except (OSError, ValueError, struct.error):
+        pass
+    if mappings is None:
+        mappings = compile_mappings()
+    if write:
+        try:
+            write_mapping_artifact(mappings, path)
+        except OSError:
+            pass
+    return mappings
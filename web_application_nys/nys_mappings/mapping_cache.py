@@ -0,0 +1,613 @@
+from __future__ import annotations
+
+import csv
+import hashlib
+import threading
+from pathlib import Path
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Mapping, NamedTuple, Optional, Tuple
+
+from . import mapping_journal
+from .keys import normalize_crop_key, unit_key
+
+# Compiled, read-only views of the mapping CSVs in the repo root
+# (crop_names_unified.csv, target_names_unified.csv, units_unified.csv).
+#
+# Each CSV is parsed once with the csv module into frozen lookup structures
+# and revalidated on every access by a stat() of the file (size + mtime_ns),
+# so request handlers never touch pandas. Editors that rewrite a CSV call
+# `invalidate()` as well, which also covers filesystems with coarse mtimes.
+#
+# The editor's saves go to an edit journal next to the crop/target CSVs (see
+# mapping_journal) instead of rewriting them. Readers apply the journal on top
+# of the CSV; when it grows, only the new records are read and the compiled
+# target mapping is patched row by row instead of recompiled.
+#
+# Cell semantics follow `pd.read_csv` defaults so results are unchanged: the
+# pandas NA tokens below read as missing, and flag columns accept booleans,
+# numbers and "true/1/yes/y" strings the way the old `iterrows()` code did.
+
+_ROOT = Path(__file__).resolve().parents[2]
+
+CROP_NAMES_CSV = "crop_names_unified.csv"
+TARGET_NAMES_CSV = "target_names_unified.csv"
+UNITS_CSV = "units_unified.csv"
+
+# Columns identifying a row in edit journal records, per journaled CSV
+JOURNAL_KEYS = {
+    CROP_NAMES_CSV: ("original_crop_name",),
+    TARGET_NAMES_CSV: ("original_crop", "original_target_name", "original_target_type"),
+}
+
+# pandas' default `na_values`
+_NA_TOKENS = frozenset(
+    {
+        "", "#N/A", "#N/A N/A", "#NA", "-1.#IND", "-1.#QNAN", "-NaN", "-nan", "1.#IND",
+        "1.#QNAN", "<NA>", "N/A", "NA", "NULL", "NaN", "None", "n/a", "nan", "null",
+    }
+)
+
+
+class _Row:
+    """One CSV row with pandas-style accessors."""
+
+    __slots__ = ("_cells",)
+
+    def __init__(self, cells: Dict[str, str]):
+        self._cells = cells
+
+    def value(self, col: str) -> Optional[str]:
+        """Cell text, or None when the column is absent or the cell is NA."""
+
+        raw = self._cells.get(col)
+        if raw is None or raw in _NA_TOKENS:
+            return None
+        return raw
+
+    def text(self, col: str, absent: str = "") -> str:
+        """`str(row.get(col, absent))`: NA cells read as "nan", like pandas NaN."""
+
+        if col not in self._cells:
+            return absent
+        v = self.value(col)
+        return "nan" if v is None else v
+
+    def clean(self, col: str) -> str:
+        """Stripped cell text, "" for NA (and for a literal "nan", as the old loaders did)."""
+
+        v = (self.value(col) or "").strip()
+        return "" if v.lower() == "nan" else v
+
+
+_TRUE_TOKENS = ("true", "1", "yes", "y")
+_BOOL_TOKENS = frozenset({"True", "TRUE", "true", "False", "FALSE", "false"})
+
+
+def _flag_mode(values: List[Optional[str]]) -> str:
+    """The dtype pandas would infer for a flag column: "bool", "number" or "text"."""
+
+    present = [v for v in values if v is not None]
+    if all(v in _BOOL_TOKENS for v in present):
+        return "bool"
+    try:
+        for v in present:
+            float(v)
+    except ValueError:
+        return "text"
+    return "number"
+
+
+_FLAG_PARSERS: Dict[str, Callable[[str], bool]] = {
+    "bool": lambda v: v.lower() == "true",
+    "number": lambda v: bool(float(v)),
+    "text": lambda v: v.lower() in _TRUE_TOKENS,
+}
+
+
+def _flags(rows: List[_Row], col: str, default: bool) -> List[bool]:
+    """Per-row values of a flag column, parsed by the dtype pandas would infer for it."""
+
+    values = [row.value(col) for row in rows]
+    parse = _FLAG_PARSERS[_flag_mode(values)]
+    return [default if v is None else parse(v) for v in values]
+
+
+def _read_cells(path: Path) -> Tuple[List[str], List[Dict[str, str]]]:
+    with path.open(newline="", encoding="utf-8-sig") as f:
+        reader = csv.reader(f)
+        header = next(reader, [])
+        pad = [""] * len(header)
+        # Short rows read as NA in the missing columns, like pd.read_csv.
+        cells = [dict(zip(header, row + pad)) for row in reader if row]
+    return header, cells
+
+
+def _read_rows(path: Path) -> Tuple[List[str], List[_Row]]:
+    header, cells = _read_cells(path)
+    return header, [_Row(c) for c in cells]
+
+
+def _row_key(cells: Dict[str, str], key_columns: Tuple[str, ...]) -> Tuple[str, ...]:
+    row = _Row(cells)
+    return tuple(row.clean(c) for c in key_columns)
+
+
+def _freeze(d: Dict[Any, Any]) -> Mapping[Any, Any]:
+    return MappingProxyType(d)
+
+
+class CropNameRow(NamedTuple):
+    original_crop_name: str
+    edited_crop_name: str
+    deployed: bool
+
+
+class CropNames(NamedTuple):
+    # normalized original crop -> unified crop (normalized)
+    unified: Mapping[str, str]
+    # normalized original crop -> deployed
+    deployed: Mapping[str, bool]
+    # rows as the editor lists them (NA-free originals, "" for no edit)
+    rows: Tuple[CropNameRow, ...]
+
+
+class TargetNameRow(NamedTuple):
+    """Raw strings as the editor reads them (`str(cell).strip()`; NA -> "nan")."""
+
+    original_target_name: str
+    original_crop: str
+    original_target_type: str
+    source_target_type: str
+    new_target_name: str
+    new_target_species: str
+    deployed: bool
+    main_target_list: bool
+
+
+class TargetNames(NamedTuple):
+    # (normalized_target, normalized_crop) -> unified target info
+    unified: Mapping[Tuple[str, str], Mapping[str, Any]]
+    # (normalized_original_crop, normalized_target) -> refined target info
+    mapping: Mapping[Tuple[str, str], Mapping[str, Any]]
+    rows: Tuple[TargetNameRow, ...]
+
+
+def _compile_crop_names(header: List[str], rows: List[_Row]) -> Tuple[CropNames, None]:
+    unified: Dict[str, str] = {}
+    deployed_map: Dict[str, bool] = {}
+    editor_rows: List[CropNameRow] = []
+    if "original_crop_name" not in header:
+        return CropNames(_freeze(unified), _freeze(deployed_map), ()), None
+
+    for row, deployed in zip(rows, _flags(rows, "deployed", True)):
+        original = row.clean("original_crop_name")
+        edited = row.clean("edited_crop_name")
+        if not original:
+            continue
+        editor_rows.append(CropNameRow(original, edited, deployed))
+
+        normalized_original = normalize_crop_key(original)
+        if not normalized_original:
+            continue
+        # Unified name: the edited name if given, otherwise the normalized original
+        unified[normalized_original] = (normalize_crop_key(edited) if edited else "") or normalized_original
+        deployed_map[normalized_original] = deployed
+
+    return CropNames(_freeze(unified), _freeze(deployed_map), tuple(editor_rows)), None
+
+
+class _TargetAux(NamedTuple):
+    """What `_patch_target_names` needs to update a compiled TargetNames in place of a recompile."""
+
+    with_unified: bool
+    # flag column dtypes the values were parsed with
+    modes: Tuple[str, str]
+    # key -> index of the raw row that provides its entry (the last one wins)
+    unified_row: Dict[Tuple[str, str], int]
+    mapping_row: Dict[Tuple[str, str], int]
+    # raw row index -> position in `rows`
+    editor_pos: Dict[int, int]
+
+
+_TargetEntry = Optional[Tuple[Tuple[str, str], Mapping[str, Any]]]
+
+
+def _target_entries(
+    row: _Row, deployed: bool, main_target_list: bool, with_unified: bool
+) -> Tuple[_TargetEntry, Optional[TargetNameRow], _TargetEntry]:
+    """(unified entry, editor row, refined mapping entry) for one CSV row; keys only use key columns."""
+
+    unified_entry: _TargetEntry = None
+    # Unified targets (original target/crop are required; NA type -> Other)
+    original_target = row.clean("original_target_name")
+    original_crop = row.clean("original_crop")
+    if with_unified and original_target and original_crop:
+        original_target_type = row.clean("original_target_type") or "Other"
+        new_target = row.clean("new_target_name")
+        new_target_type = row.clean("new_target_type")
+        normalized_target = original_target.lower().strip()
+        unified_entry = (
+            (normalized_target, normalize_crop_key(original_crop)),
+            _freeze(
+                {
+                    "unified_target": new_target.lower().strip() if new_target else normalized_target,
+                    "unified_target_type": (new_target_type or original_target_type).lower().strip(),
+                    "original_target_type": original_target_type.lower().strip(),
+                    "deployed": deployed,
+                    "main_target_list": main_target_list,
+                }
+            ),
+        )
+
+    # Refined mapping used by the guided filter and editor counts.
+    # Mirrors `str(row.get(...)).strip()`, so NA cells read as "nan" here.
+    r_target = row.text("original_target_name").strip()
+    r_crop = row.text("original_crop").strip()
+    r_type = row.text("original_target_type").strip()
+    r_source = row.text("source_target_type").strip()
+    r_new = row.text("new_target_name").strip()
+    r_species = row.text("new_target_species").strip()
+    if not r_target or not r_crop:
+        return unified_entry, None, None
+    editor_row = TargetNameRow(r_target, r_crop, r_type, r_source, r_new, r_species, deployed, main_target_list)
+
+    new = "" if r_new.lower() == "nan" else r_new
+    source = "" if r_source.lower() == "nan" else r_source
+    refined_target_name = (new if new else r_target).strip()
+    display_target_type = (source if source else (r_type or "Other")).strip() or "Other"
+    mapping_entry = (
+        (normalize_crop_key(r_crop), normalize_crop_key(r_target)),
+        _freeze(
+            {
+                "refined_target_name": refined_target_name,
+                "refined_target_l": refined_target_name.lower().strip(),
+                "display_target_type": display_target_type,
+                "display_target_type_l": display_target_type.lower().strip(),
+                "deployed": deployed,
+                "main_target_list": main_target_list,
+            }
+        ),
+    )
+    return unified_entry, editor_row, mapping_entry
+
+
+def _compile_target_names(header: List[str], rows: List[_Row]) -> Tuple[TargetNames, _TargetAux]:
+    unified: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+    mapping: Dict[Tuple[str, str], Mapping[str, Any]] = {}
+    editor_rows: List[TargetNameRow] = []
+    with_unified = all(c in header for c in ("original_target_name", "original_crop", "original_target_type"))
+    aux = _TargetAux(
+        with_unified=with_unified,
+        modes=(
+            _flag_mode([row.value("deployed") for row in rows]),
+            _flag_mode([row.value("main_target_list") for row in rows]),
+        ),
+        unified_row={},
+        mapping_row={},
+        editor_pos={},
+    )
+
+    deployed_flags = _flags(rows, "deployed", True)
+    main_flags = _flags(rows, "main_target_list", False)
+
+    for i, (row, deployed, main_target_list) in enumerate(zip(rows, deployed_flags, main_flags)):
+        unified_entry, editor_row, mapping_entry = _target_entries(row, deployed, main_target_list, with_unified)
+        if unified_entry is not None:
+            unified[unified_entry[0]] = unified_entry[1]
+            aux.unified_row[unified_entry[0]] = i
+        if editor_row is not None:
+            aux.editor_pos[i] = len(editor_rows)
+            editor_rows.append(editor_row)
+        if mapping_entry is not None:
+            mapping[mapping_entry[0]] = mapping_entry[1]
+            aux.mapping_row[mapping_entry[0]] = i
+
+    names = TargetNames(
+        unified=_freeze(unified),
+        mapping=_freeze(mapping),
+        rows=tuple(editor_rows),
+    )
+    return names, aux
+
+
+def _patch_target_names(
+    names: TargetNames, aux: _TargetAux, cells: List[Dict[str, str]], changed: List[int]
+) -> Optional[TargetNames]:
+    """`names` with the given raw rows recompiled, or None when a full compile is needed.
+
+    Journal records never change key columns, so every entry keeps its key
+    and only the entries those rows provide are replaced (copy-on-write).
+    """
+
+    rows = [_Row(c) for c in cells]
+    modes = (
+        _flag_mode([row.value("deployed") for row in rows]),
+        _flag_mode([row.value("main_target_list") for row in rows]),
+    )
+    if modes != aux.modes:
+        return None  # the other rows' flags would parse differently now
+    parse_deployed, parse_main = _FLAG_PARSERS[modes[0]], _FLAG_PARSERS[modes[1]]
+
+    unified = dict(names.unified)
+    mapping = dict(names.mapping)
+    editor_rows = list(names.rows)
+    for i in sorted(set(changed)):
+        row = rows[i]
+        deployed_raw, main_raw = row.value("deployed"), row.value("main_target_list")
+        deployed = True if deployed_raw is None else parse_deployed(deployed_raw)
+        main_target_list = False if main_raw is None else parse_main(main_raw)
+        unified_entry, editor_row, mapping_entry = _target_entries(row, deployed, main_target_list, aux.with_unified)
+        if unified_entry is not None and aux.unified_row.get(unified_entry[0]) == i:
+            unified[unified_entry[0]] = unified_entry[1]
+        if editor_row is not None and i in aux.editor_pos:
+            editor_rows[aux.editor_pos[i]] = editor_row
+        if mapping_entry is not None and aux.mapping_row.get(mapping_entry[0]) == i:
+            mapping[mapping_entry[0]] = mapping_entry[1]
+    return TargetNames(unified=_freeze(unified), mapping=_freeze(mapping), rows=tuple(editor_rows))
+
+
+class UnitNames(NamedTuple):
+    # sorted distinct unified units
+    unified: Tuple[str, ...]
+    # raw unit (lowercased, whitespace collapsed) -> unified unit; unified units map to themselves
+    lookup: Mapping[str, str]
+
+
+def _compile_units(path: Path) -> UnitNames:
+    header, rows = _read_rows(path)
+    col = next((c for c in header if c.strip().lower() == "unified"), None)
+    if col is None:
+        raise KeyError("Unified column not found in units_unified.csv")
+    distinct = {v for v in (row.value(col) for row in rows) if v is not None}
+    unified = tuple(sorted(u.strip() for u in distinct if u.strip()))
+
+    lookup: Dict[str, str] = {unit_key(u): u for u in unified}
+    raw_col = next((c for c in header if c.strip().lower() == "unit"), None)
+    if raw_col is not None:
+        for row in rows:
+            raw, target = row.value(raw_col), (row.value(col) or "").strip()
+            if raw is not None and target:
+                lookup.setdefault(unit_key(raw), target)
+    return UnitNames(unified, _freeze(lookup))
+
+
+_EMPTY_CROPS = CropNames(_freeze({}), _freeze({}), ())
+_EMPTY_TARGETS = TargetNames(_freeze({}), _freeze({}), ())
+_EMPTY_UNIT_LOOKUP = _freeze({})
+
+_lock = threading.Lock()
+_compiled: Dict[str, Tuple[Any, Any]] = {}
+# Bumped by invalidate(); part of mapping_stamp() so derived caches rebuild too.
+_epoch = 0
+
+
+def _stat(name: str) -> Optional[Tuple[int, int]]:
+    try:
+        st = (_ROOT / name).stat()
+    except OSError:
+        return None
+    return st.st_size, st.st_mtime_ns
+
+
+def _stamp(name: str) -> Any:
+    """File stat, plus the journal's for journaled CSVs; None when the CSV is missing."""
+
+    st = _stat(name)
+    if st is None or name not in JOURNAL_KEYS:
+        return st
+    return st, _stat(mapping_journal.journal_path(_ROOT / name).name)
+
+
+def _get(name: str, compile_fn: Callable[[Path], Any], missing: Any, key: str = "") -> Any:
+    key = key or name
+    stamp = _stamp(name)
+    hit = _compiled.get(key)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    with _lock:
+        hit = _compiled.get(key)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        if stamp is None:
+            value = missing
+        else:
+            try:
+                value = compile_fn(_ROOT / name)
+            except Exception:
+                # Unreadable CSV: behave as if it were missing until it changes again.
+                value = missing
+        _compiled[key] = (stamp, value)
+        return value
+
+
+class _Source:
+    """Raw cells of a journaled CSV with its journal applied up to `offset`, and their compiled form."""
+
+    def __init__(self, name: str, compile_fn: Callable[[List[str], List[_Row]], Tuple[Any, Any]]):
+        self.path = _ROOT / name
+        self.stat = _stat(name)
+        self.key_columns = JOURNAL_KEYS[name]
+        self.compile_fn = compile_fn
+        self.header, self.cells = _read_cells(self.path)
+        self.index: Dict[Tuple[str, ...], int] = {}
+        for i, cells in enumerate(self.cells):
+            self.index.setdefault(_row_key(cells, self.key_columns), i)
+        records, self.offset = mapping_journal.read(self.path)
+        mapping_journal.apply(self.header, self.cells, self.index, self.key_columns, records)
+        self.compile()
+
+    def compile(self) -> None:
+        self.value, self.aux = self.compile_fn(self.header, [_Row(c) for c in self.cells])
+
+    def catch_up(self, patch_fn: Optional[Callable[..., Any]]) -> None:
+        """Apply journal records appended since the last call."""
+
+        records, self.offset = mapping_journal.read(self.path, self.offset)
+        if not records:
+            return
+        changed = mapping_journal.apply(self.header, self.cells, self.index, self.key_columns, records)
+        value = patch_fn(self.value, self.aux, self.cells, changed) if patch_fn and changed is not None else None
+        if value is None:
+            self.compile()
+        else:
+            self.value = value
+
+
+_sources: Dict[str, _Source] = {}
+
+
+def _get_journaled(
+    name: str,
+    compile_fn: Callable[[List[str], List[_Row]], Tuple[Any, Any]],
+    patch_fn: Optional[Callable[..., Any]],
+    missing: Any,
+) -> Any:
+    stamp = _stamp(name)
+    hit = _compiled.get(name)
+    if hit is not None and hit[0] == stamp:
+        return hit[1]
+    with _lock:
+        hit = _compiled.get(name)
+        if hit is not None and hit[0] == stamp:
+            return hit[1]
+        value = missing
+        if stamp is not None:
+            try:
+                src = _sources.get(name)
+                journal_size = stamp[1][0] if stamp[1] else 0
+                if src is None or src.stat != stamp[0] or journal_size < src.offset:
+                    # New CSV (or compacted journal): start over from the file
+                    src = _sources[name] = _Source(name, compile_fn)
+                else:
+                    src.catch_up(patch_fn)
+                value = src.value
+            except Exception:
+                # Unreadable CSV: behave as if it were missing until it changes again.
+                _sources.pop(name, None)
+        _compiled[name] = (stamp, value)
+        return value
+
+
+def crop_names() -> CropNames:
+    return _get_journaled(CROP_NAMES_CSV, _compile_crop_names, None, _EMPTY_CROPS)
+
+
+def target_names() -> TargetNames:
+    return _get_journaled(TARGET_NAMES_CSV, _compile_target_names, _patch_target_names, _EMPTY_TARGETS)
+
+
+def unit_names() -> Optional[UnitNames]:
+    """Compiled units_unified.csv, or None when it is missing or has no Unified column."""
+
+    return _get(UNITS_CSV, _compile_units, None)
+
+
+def units() -> Optional[Tuple[str, ...]]:
+    """Sorted unified units, or None when units_unified.csv is missing or has no Unified column."""
+
+    names = unit_names()
+    return names.unified if names is not None else None
+
+
+def unit_lookup() -> Mapping[str, str]:
+    """Raw unit key (see quantities.unit_key) -> unified unit."""
+
+    names = unit_names()
+    return names.lookup if names is not None else _EMPTY_UNIT_LOOKUP
+
+
+def csv_path(name: str) -> Path:
+    return _ROOT / name
+
+
+def invalidate() -> None:
+    """Drop every compiled mapping (call after rewriting one of the CSVs)."""
+
+    global _epoch
+    with _lock:
+        _compiled.clear()
+        _sources.clear()
+        _epoch += 1
+
+
+def mapping_stamp() -> tuple:
+    """Changes whenever the crop/target/unit mappings may have changed."""
+
+    return (_epoch, _stamp(CROP_NAMES_CSV), _stamp(TARGET_NAMES_CSV), _stat(UNITS_CSV))
+
+
+def file_stamp() -> Tuple[int, ...]:
+    """(size, mtime_ns) of the three mapping CSVs and the edit journals, flattened ((-1, -1) when missing).
+
+    A few stat() calls, so unlike `mapping_version()` it is cheap enough to
+    check on every load; mapping_artifact keeps it next to the digest and only
+    hashes the files when it differs.
+    """
+
+    out: List[int] = []
+    for name in (CROP_NAMES_CSV, TARGET_NAMES_CSV, UNITS_CSV):
+        out.extend(_stat(name) or (-1, -1))
+        if name in JOURNAL_KEYS:
+            out.extend(_stat(mapping_journal.journal_path(_ROOT / name).name) or (-1, -1))
+    return tuple(out)
+
+
+def _digest(path: Path) -> bytes:
+    h = hashlib.blake2b(path.read_bytes(), digest_size=8)
+    if path.name in JOURNAL_KEYS:
+        try:
+            h.update(mapping_journal.journal_path(path).read_bytes())
+        except OSError:
+            pass
+    return h.digest()
+
+
+def mapping_version() -> str:
+    """Content digest of the three mapping CSVs.
+
+    Unlike `mapping_stamp()` it is the same in every process and on every
+    host serving the same files, so it can go into HTTP validators.
+    """
+
+    h = hashlib.blake2b(digest_size=8)
+    for name in (CROP_NAMES_CSV, TARGET_NAMES_CSV, UNITS_CSV):
+        h.update(_get(name, _digest, b"", key=name + "#digest"))
+    return h.hexdigest()
+
+
+def record_edits(name: str, records: List[Dict[str, Any]]) -> None:
+    """Append editor changes to `name`'s journal; readers see them on their next access.
+
+    Each record is {"key": [key column values], "set": {column: text}} (see
+    JOURNAL_KEYS); rows are matched by key and created when missing.
+    """
+
+    mapping_journal.append(_ROOT / name, records)
+
+
+def compact(name: str) -> int:
+    """Fold `name`'s journal into the CSV (written to a temp file and renamed over it).
+
+    Returns the number of records folded. Holds the journal lock throughout,
+    so saves wait instead of appending records the truncation would drop.
+    """
+
+    path = _ROOT / name
+    key_columns = JOURNAL_KEYS[name]
+    with mapping_journal.locked(path):
+        records, _ = mapping_journal.read(path)
+        if not records:
+            return 0
+        header, cells = _read_cells(path) if path.exists() else ([], [])
+        header = header or list(key_columns)
+        index: Dict[Tuple[str, ...], int] = {}
+        for i, row in enumerate(cells):
+            index.setdefault(_row_key(row, key_columns), i)
+        mapping_journal.apply(header, cells, index, key_columns, records)
+        mapping_journal.rewrite_csv(path, header, cells)
+        mapping_journal.truncate(path)
+    return len(records)
+
+
+def compact_journals() -> int:
+    return sum(compact(name) for name in JOURNAL_KEYS)
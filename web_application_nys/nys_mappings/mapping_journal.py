@@ -0,0 +1,172 @@
+from __future__ import annotations
+
+import contextlib
+import csv
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover
+    fcntl = None  # type: ignore
+
+# Append-only edit journal for the mapping CSVs the editor writes.
+#
+# A save appends one JSON line per changed row to `<csv>.journal`:
+#   {"key": ["Apple", "Apple Scab", "Disease"], "set": {"deployed": "False"}}
+# where `key` holds the row's key-column values (stripped, NA as "") and
+# `set` the new cell text. Readers apply the journal on top of the CSV (see
+# mapping_cache), so a save never rewrites the CSV; `compact()` folds the
+# journal into the CSV later, off the request path. Records only assign cells,
+# so applying one twice is harmless (e.g. after a crash between the CSV
+# rename and the journal truncation).
+
+Record = Dict[str, Any]
+
+
+def journal_path(csv_path: Path) -> Path:
+    return csv_path.with_name(csv_path.name + ".journal")
+
+
+@contextlib.contextmanager
+def locked(csv_path: Path) -> Iterator[None]:
+    """Exclusive lock shared by every process appending to or compacting this CSV's journal."""
+
+    lock_path = csv_path.with_name(csv_path.name + ".lock")
+    with open(lock_path, "a") as f:
+        if fcntl is not None:
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
+def append(csv_path: Path, records: Sequence[Record]) -> None:
+    if not records:
+        return
+    data = "".join(json.dumps(r, ensure_ascii=False, sort_keys=True) + "\n" for r in records).encode("utf-8")
+    with locked(csv_path):
+        with open(journal_path(csv_path), "ab") as f:
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+
+
+def read(csv_path: Path, offset: int = 0) -> Tuple[List[Record], int]:
+    """Complete records from byte `offset` on, and the offset just past them."""
+
+    try:
+        with open(journal_path(csv_path), "rb") as f:
+            f.seek(offset)
+            data = f.read()
+    except OSError:
+        return [], offset
+    end = data.rfind(b"\n") + 1  # a line still being written is picked up next time
+    records = []
+    for line in data[:end].splitlines():
+        if line.strip():
+            try:
+                records.append(json.loads(line))
+            except ValueError:
+                continue  # torn line from a crashed writer
+    return records, offset + end
+
+
+def apply(
+    header: List[str],
+    rows: List[Dict[str, str]],
+    index: Dict[Tuple[str, ...], int],
+    key_columns: Sequence[str],
+    records: Sequence[Record],
+) -> Optional[List[int]]:
+    """Apply records to raw CSV rows in place.
+
+    `index` maps row keys to positions in `rows` and is kept up to date.
+    Returns the positions of updated rows, or None when the table changed
+    shape (rows appended, a column added, or a key column assigned).
+    """
+
+    changed: List[int] = []
+    reshaped = False
+    for rec in records:
+        key = tuple(rec.get("key") or ())
+        values = rec.get("set") or {}
+        if len(key) != len(key_columns) or not isinstance(values, dict):
+            continue
+        values = {c: str(v) for c, v in values.items() if c not in key_columns}
+        for col in values:
+            if col not in header:
+                # Same cells the compacted CSV will have
+                header.append(col)
+                for row in rows:
+                    row.setdefault(col, "")
+                reshaped = True
+        i = index.get(key)
+        if i is None:
+            row = {c: "" for c in header}
+            row.update(zip(key_columns, key))
+            row.update(values)
+            index[key] = len(rows)
+            rows.append(row)
+            reshaped = True
+        else:
+            rows[i] = {**rows[i], **values}
+            changed.append(i)
+    return None if reshaped else changed
+
+
+def rewrite_csv(csv_path: Path, header: Sequence[str], rows: Sequence[Dict[str, str]]) -> None:
+    """Write rows to a temp file next to `csv_path` and rename it over the CSV."""
+
+    tmp = csv_path.with_name(f".{csv_path.name}.{os.getpid()}.tmp")
+    with open(tmp, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f, lineterminator="\n")  # as pandas.to_csv wrote them
+        writer.writerow(header)
+        for row in rows:
+            writer.writerow([row.get(c, "") for c in header])
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(tmp, csv_path)
+
+
+def truncate(csv_path: Path) -> None:
+    with open(journal_path(csv_path), "wb") as f:
+        f.flush()
+        os.fsync(f.fileno())
+
+
+class Compactor:
+    """Runs `compact` on a daemon thread `delay` seconds after the last `schedule()`."""
+
+    def __init__(self, compact: Callable[[], Any], delay: float):
+        self.compact = compact
+        self.delay = delay
+        self._wake = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def schedule(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="nys-journal-compactor", daemon=True)
+                self._thread.start()
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait()
+            # Debounce: a burst of saves is folded into the CSVs once.
+            while True:
+                self._wake.clear()
+                if not self._wake.wait(self.delay):
+                    break
+            try:
+                self.compact()
+            except Exception:
+                # Leave the journal in place; the next save schedules another attempt.
+                continue
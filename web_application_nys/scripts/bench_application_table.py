@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""
+Benchmark the columnar Application_Info table against walking the record dicts.
+
+Loads the store, builds `ApplicationTable` and compares:
+  - memory: the table's arrays vs the Application_Info dicts/lists/strings
+    they replace for aggregation (shared objects counted once);
+  - latency: labels per crop and applications per crop, as NumPy
+    aggregations vs the nested-dict walk, checking both give the same result.
+
+Usage:
+  python scripts/bench_application_table.py --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.application_table import ApplicationTable, iter_application_ids  # noqa: E402
+from app.data import JsonPesticideStore, get_json_dir, normalize_crop_key  # noqa: E402
+from nys_mappings.mapping_cache import unit_lookup  # noqa: E402
+
+
+def deep_size(obj: Any, seen: Set[int]) -> int:
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(deep_size(k, seen) + deep_size(v, seen) for k, v in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(deep_size(v, seen) for v in obj)
+    return size
+
+
+def walk_crop_label_counts(records) -> Dict[str, int]:
+    labels: Dict[str, Set[int]] = {}
+    for _, rid, app in iter_application_ids(records):
+        for c in app.get("Target_Crop", []) or []:
+            if isinstance(c, dict):
+                norm = normalize_crop_key(str(c.get("name") or "").strip())
+                if norm:
+                    labels.setdefault(norm, set()).add(rid)
+    return {crop: len(rids) for crop, rids in labels.items()}
+
+
+def walk_crop_applications(records) -> Dict[str, List[int]]:
+    apps: Dict[str, List[int]] = {}
+    for aid, _, app in iter_application_ids(records):
+        seen: Set[str] = set()
+        for c in app.get("Target_Crop", []) or []:
+            if isinstance(c, dict):
+                norm = normalize_crop_key(str(c.get("name") or "").strip())
+                if norm and norm not in seen:
+                    seen.add(norm)
+                    apps.setdefault(norm, []).append(aid)
+    return apps
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare the columnar Application_Info table with the dict walk.")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    store = JsonPesticideStore(json_dir=get_json_dir(), use_snapshot=False)
+    store.load()
+    records = store.all_records()
+
+    t0 = time.perf_counter()
+    table = ApplicationTable(records, unit_lookup())
+    build = time.perf_counter() - t0
+
+    seen: Set[int] = set()
+    dict_bytes = sum(deep_size(p.get("Application_Info") or [], seen) for p in records)
+    print(
+        f"[bench] {len(records)} labels, {len(table.app_record)} applications, {len(table.crop_app)} (application, crop) rows"
+    )
+    print(f"[bench] table build (once per dataset generation): {build * 1000:.0f} ms")
+    print(f"[bench] memory: table arrays {table.nbytes / 1e6:.1f} MB, Application_Info objects {dict_bytes / 1e6:.1f} MB")
+
+    def timed(fn) -> float:
+        ms = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            fn()
+            ms.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(ms)
+
+    if table.crop_label_counts() != walk_crop_label_counts(records):
+        raise SystemExit("[bench] labels per crop differ from the dict walk")
+    columnar = {crop: ids.tolist() for crop, ids in table.crop_applications().items()}
+    if columnar != walk_crop_applications(records):
+        raise SystemExit("[bench] applications per crop differ from the dict walk")
+
+    for name, fast, slow in (
+        ("labels per crop", table.crop_label_counts, lambda: walk_crop_label_counts(records)),
+        ("applications per crop", table.crop_applications, lambda: walk_crop_applications(records)),
+    ):
+        print(f"[bench] {name:<22} table {timed(fast):7.1f} ms  dict walk {timed(slow):7.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
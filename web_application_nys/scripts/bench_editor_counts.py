@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the editor label counts.
+
+Compares `EditorLabelCounts` with the full-corpus scans the editor endpoints
+used to run on every page load (kept below as the reference), first under the
+current mappings and then after simulated edits: renaming a refined target,
+hiding one, and re-unifying a crop. After each edit the incremental counts
+must equal a fresh rescan under the edited mappings.
+
+Usage:
+  python scripts/bench_editor_counts.py
+"""
+
+from __future__ import annotations
+
+import random
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, Mapping, Set, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import routes  # noqa: E402
+from app.data import normalize_crop_key  # noqa: E402
+from app.editor_counts import EditorLabelCounts  # noqa: E402
+
+
+def scan_crops(records) -> Dict[str, int]:
+    crop_label_counts: Dict[str, Set[str]] = {}
+    for p in records:
+        epa = str(p.get("epa_reg_no") or "").strip()
+        if not epa:
+            continue
+        for app in p.get("Application_Info", []) or []:
+            if not isinstance(app, dict):
+                continue
+            for crop in app.get("Target_Crop", []) or []:
+                if isinstance(crop, dict):
+                    normalized = normalize_crop_key(str(crop.get("name") or "").strip())
+                    if normalized:
+                        crop_label_counts.setdefault(normalized, set()).add(epa)
+    return {crop: len(epas) for crop, epas in crop_label_counts.items()}
+
+
+def scan_targets(records, target_mapping, unified_crop_mapping) -> Dict[Tuple[str, str, str], int]:
+    counts: Dict[Tuple[str, str, str], Set[str]] = {}
+    for p in records:
+        source_file = str(p.get("_source_file") or "").strip() or str(p.get("epa_reg_no") or "").strip()
+        if not source_file:
+            continue
+        for app in p.get("Application_Info", []) or []:
+            if not isinstance(app, dict):
+                continue
+            crop_pairs = []
+            for crop in app.get("Target_Crop", []) or []:
+                if isinstance(crop, dict):
+                    norm_orig = normalize_crop_key(str(crop.get("name") or "").strip())
+                    if norm_orig:
+                        unified = normalize_crop_key(unified_crop_mapping.get(norm_orig, norm_orig))
+                        crop_pairs.append((norm_orig, unified))
+            for t in app.get("Target_Disease_Pest", []) or []:
+                if not isinstance(t, dict):
+                    continue
+                norm_target = normalize_crop_key(str(t.get("name") or "").strip())
+                if not norm_target:
+                    continue
+                for norm_orig, unified in crop_pairs:
+                    info = target_mapping.get((norm_orig, norm_target))
+                    if not info or not info.get("deployed", True):
+                        continue
+                    refined_l = str(info.get("refined_target_l") or "").strip().lower()
+                    type_l = str(info.get("display_target_type_l") or "other").strip().lower()
+                    if refined_l and unified:
+                        counts.setdefault((unified, type_l, refined_l), set()).add(source_file.lower())
+    return {k: len(v) for k, v in counts.items()}
+
+
+def edited(mapping: Mapping[Any, Mapping[str, Any]], match, **changes) -> Dict[Any, Dict[str, Any]]:
+    out = {k: dict(v) for k, v in mapping.items()}
+    for v in out.values():
+        if match(v):
+            v.update(changes)
+    return out
+
+
+def check(counts: EditorLabelCounts, stamp, records, target_mapping, unified, label: str) -> None:
+    t0 = time.perf_counter()
+    got = dict(counts.target_counts(stamp, target_mapping, unified))
+    inc = (time.perf_counter() - t0) * 1000
+    t0 = time.perf_counter()
+    expected = scan_targets(records, target_mapping, unified)
+    full = (time.perf_counter() - t0) * 1000
+    if got != expected:
+        raise SystemExit(f"[bench] target counts differ after {label} ({len(set(got.items()) ^ set(expected.items()))} keys)")
+    print(f"[bench] {label:28s} moved {counts.last_moved:6d} pairs in {inc:7.2f} ms  (rescan {full:7.1f} ms)")
+
+
+def main() -> None:
+    gen = routes._STORE.generation()
+    records = gen.records
+    target_mapping = routes._build_target_mapping_from_csv()
+    unified, _ = routes._load_unified_crop_names()
+
+    t0 = time.perf_counter()
+    counts = EditorLabelCounts(records)
+    build = (time.perf_counter() - t0) * 1000
+    if counts.crop_counts != scan_crops(records):
+        raise SystemExit("[bench] crop counts differ from the scan")
+    print(f"[bench] {len(records)} labels; count tables built in {build:.0f} ms (once per dataset generation)")
+
+    check(counts, 0, records, target_mapping, unified, "initial mappings")
+
+    rng = random.Random(19)
+    bucket = rng.choice(sorted(counts.target_counts(0, target_mapping, unified)))
+    renamed = edited(target_mapping, lambda v: v["refined_target_l"] == bucket[2], refined_target_l="renamed target")
+    check(counts, 1, records, renamed, unified, f"rename {bucket[2]!r}")
+
+    hidden = edited(renamed, lambda v: v["refined_target_l"] == "renamed target", deployed=False)
+    check(counts, 2, records, hidden, unified, "hide the renamed target")
+
+    mapped_crops = {c for c, _ in target_mapping} & set(counts.crop_counts)
+    crop = rng.choice(sorted(mapped_crops))
+    reunified = dict(unified)
+    reunified[crop] = "some other crop"
+    check(counts, 3, records, hidden, reunified, f"re-unify crop {crop!r}")
+
+    check(counts, 4, records, target_mapping, unified, "back to the CSV mappings")
+
+    print("[bench] incremental counts match full rescans after every edit")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,209 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the editor's journaled mapping saves.
+
+Works on copies of the mapping CSVs in a temp directory (the repo's files are
+never touched), optionally enlarged by repeating every target row under
+renamed crops. Posts batches of target edits through the Flask test client
+and compares them with the pandas read-modify-write save the endpoint used to
+run (kept below as the reference) applied to a second copy:
+
+- the mappings readers see right after the journaled save (patched in place)
+  must equal a full compile of the reference CSV, and a fresh compile of the
+  CSV plus journal;
+- after compaction the CSV must compile to the same mappings and the journal
+  must be empty.
+
+Usage:
+  python scripts/bench_editor_save.py --scale 1 4 8 --saves 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+import pandas as pd
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import create_app, routes  # noqa: E402
+from app.data import normalize_crop_key  # noqa: E402
+from nys_mappings import mapping_cache, mapping_journal  # noqa: E402
+
+CSVS = (mapping_cache.CROP_NAMES_CSV, mapping_cache.TARGET_NAMES_CSV, mapping_cache.UNITS_CSV)
+
+
+def prepare(root: Path, scale: int) -> None:
+    for name in CSVS:
+        shutil.copy(mapping_cache._ROOT / name, root / name)
+    if scale > 1:
+        df = pd.read_csv(root / mapping_cache.TARGET_NAMES_CSV, dtype=str, keep_default_na=False)
+        copies = [df] + [df.assign(original_crop=df["original_crop"] + f" #{k}") for k in range(1, scale)]
+        pd.concat(copies).to_csv(root / mapping_cache.TARGET_NAMES_CSV, index=False)
+
+
+def pandas_save(csv_path: Path, unified_crop_mapping: Dict[str, str], targets: List[Dict[str, Any]]) -> None:
+    """The save endpoint before the journal: load, mask, rewrite the whole CSV.
+
+    It also re-sorted the rows, which changes which of several rows sharing a
+    normalized (crop, target) key wins; journaled saves keep the file order,
+    so the reference leaves the order alone too.
+    """
+
+    df = pd.read_csv(csv_path, low_memory=False)
+
+    def _row_unified_crop_norm(x: Any) -> str:
+        raw = str(x or "").strip()
+        if not raw or raw.lower() == "nan":
+            return ""
+        norm = normalize_crop_key(raw)
+        return normalize_crop_key(unified_crop_mapping.get(norm, norm))
+
+    df_unified_crop_norm = df["original_crop"].apply(_row_unified_crop_norm)
+    df_new = df["new_target_name"].fillna("").astype(str)
+    df_new = df_new.apply(lambda s: "" if str(s).strip().lower() == "nan" else str(s))
+    df_orig = df["original_target_name"].fillna("").astype(str)
+    df_refined = df_new.apply(lambda s: str(s).strip())
+    df_refined = df_refined.where(df_refined != "", df_orig.apply(lambda s: str(s).strip()))
+    df_refined_l = df_refined.str.lower()
+    df_source = df["source_target_type"].fillna("").astype(str)
+    df_source = df_source.apply(lambda s: "" if str(s).strip().lower() == "nan" else str(s))
+    df_orig_type = df["original_target_type"].fillna("").astype(str)
+    df_display_type = df_source.apply(lambda s: str(s).strip())
+    df_display_type = df_display_type.where(df_display_type != "", df_orig_type.apply(lambda s: str(s).strip() or "Other"))
+    df_display_type_l = df_display_type.str.lower()
+
+    for target in targets:
+        mask = (
+            (df_unified_crop_norm == normalize_crop_key(target["unified_crop"]))
+            & (df_refined_l == target["refined_target_name"].lower().strip())
+            & (df_display_type_l == target["source_target_type"].lower().strip())
+        )
+        if mask.any():
+            if target.get("new_target_name"):
+                df.loc[mask, "new_target_name"] = target["new_target_name"]
+            if target.get("new_target_type"):
+                df.loc[mask, "source_target_type"] = target["new_target_type"]
+            if target.get("new_target_species"):
+                df.loc[mask, "new_target_species"] = target["new_target_species"]
+            df.loc[mask, "deployed"] = bool(target["deployed"])
+            df.loc[mask, "main_target_list"] = bool(target["main_target_list"])
+
+    df.to_csv(csv_path, index=False)
+
+
+def edits(targets: List[Dict[str, Any]], rng: random.Random, n: int) -> List[Dict[str, Any]]:
+    out = []
+    for t in rng.sample(targets, n):
+        t = dict(t)
+        kind = rng.random()
+        if kind < 0.4:
+            t["new_target_name"] = f"{t['refined_target_name']} (edited {rng.randrange(1000)})"
+        elif kind < 0.7:
+            t["deployed"] = not t["deployed"]
+        elif kind < 0.85:
+            t["main_target_list"] = not t["main_target_list"]
+        else:
+            t["new_target_type"] = rng.choice(["Disease", "Insects", "Weeds"])
+        out.append(t)
+    return out
+
+
+def compiled(root: Path):
+    """Full compile of the CSV alone (no journal)."""
+
+    header, rows = mapping_cache._read_rows(root / mapping_cache.TARGET_NAMES_CSV)
+    names, _ = mapping_cache._compile_target_names(header, rows)
+    return names
+
+
+def same(a, b) -> bool:
+    return dict(a.mapping) == dict(b.mapping) and dict(a.unified) == dict(b.unified) and sorted(a.rows) == sorted(b.rows)
+
+
+def run(scale: int, saves: int, batch: int, rng: random.Random) -> None:
+    with tempfile.TemporaryDirectory() as a, tempfile.TemporaryDirectory() as b:
+        journaled, reference = Path(a), Path(b)
+        prepare(journaled, scale)
+        prepare(reference, scale)
+        mapping_cache._ROOT = journaled
+        mapping_cache.invalidate()
+
+        client = create_app().test_client()
+        targets = client.get("/api/editor/target-names").get_json()["targets"]
+        unified, _ = routes._load_unified_crop_names()
+        new_ms: List[float] = []
+        old_ms: List[float] = []
+        for _ in range(saves):
+            payload = edits(targets, rng, batch)
+
+            t0 = time.perf_counter()
+            resp = client.post("/api/editor/target-names", json={"targets": payload})
+            after = mapping_cache.target_names()
+            new_ms.append((time.perf_counter() - t0) * 1000)
+            if resp.status_code != 200:
+                raise SystemExit(f"[bench] save failed: {resp.get_json()}")
+
+            t0 = time.perf_counter()
+            pandas_save(reference / mapping_cache.TARGET_NAMES_CSV, unified, payload)
+            old_ms.append((time.perf_counter() - t0) * 1000)
+
+            if not same(after, compiled(reference)):
+                raise SystemExit(f"[bench] journaled mappings differ from the pandas save (scale {scale})")
+            mapping_cache.invalidate()
+            if not same(after, mapping_cache.target_names()):
+                raise SystemExit(f"[bench] patched mappings differ from a full compile (scale {scale})")
+            targets = client.get("/api/editor/target-names").get_json()["targets"]
+
+        t0 = time.perf_counter()
+        folded = mapping_cache.compact_journals()
+        compact_ms = (time.perf_counter() - t0) * 1000
+        if mapping_journal.journal_path(journaled / mapping_cache.TARGET_NAMES_CSV).stat().st_size:
+            raise SystemExit("[bench] journal not empty after compaction")
+        if not same(compiled(journaled), compiled(reference)):
+            raise SystemExit(f"[bench] compacted CSV differs from the pandas save (scale {scale})")
+
+        rows = len(mapping_cache.target_names().rows)
+        print(
+            f"[bench] {rows:7d} rows  save+read median {statistics.median(new_ms):7.2f} ms"
+            f"  (pandas rewrite {statistics.median(old_ms):7.1f} ms)  compaction of {folded} records {compact_ms:6.1f} ms"
+        )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark journaled editor saves against the pandas rewrite.")
+    parser.add_argument("--scale", type=int, nargs="+", default=[1, 4, 8], help="Target CSV size multipliers")
+    parser.add_argument("--saves", type=int, default=20)
+    parser.add_argument("--batch", type=int, default=5, help="Edited targets per save")
+    args = parser.parse_args()
+
+    # The editor endpoints only check the session
+    routes.is_authenticated = lambda: True
+    routes.is_editor = lambda: True
+    routes._JOURNAL_COMPACTOR.schedule = lambda: None  # compacted explicitly below
+
+    rng = random.Random(20)
+    repo_root = mapping_cache._ROOT
+    try:
+        for scale in args.scale:
+            mapping_cache._ROOT = repo_root
+            run(scale, args.saves, args.batch, rng)
+    finally:
+        mapping_cache._ROOT = repo_root
+        mapping_cache.invalidate()
+    print("[bench] journaled saves match the pandas rewrite, before and after compaction")
+
+
+if __name__ == "__main__":
+    main()
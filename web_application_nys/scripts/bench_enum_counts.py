@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""
+Check the in-memory guided-filter dropdown counts against Supabase and local /api/filter.
+
+Builds `CropTargetCounts` from the guided-filter index and checks that it
+lists exactly the rows of the Supabase `label_crop_target_counts` view, i.e.
+the rows scripts/build_supabase_label_index.py writes to label_crop_target
+grouped by (crop, target type, target) with COUNT(DISTINCT source_file) and
+BOOL_OR(main_target_list), and that every count equals the number of labels
+`GuidedFilterIndex.lookup` returns (the `total` of local /api/filter). Also
+reports the one-off build time and the per-request cost of
+/api/enums/targets and /api/enums/target-types.
+
+Usage:
+  python scripts/bench_enum_counts.py
+"""
+
+from __future__ import annotations
+
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Set, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import create_app, routes  # noqa: E402
+from app.filter_index import CropTargetCounts  # noqa: E402
+from build_supabase_label_index import build_crop_target_rows, load_crop_maps, load_target_mapping  # noqa: E402
+from nys_mappings.mapping_artifact import load_mappings  # noqa: E402
+
+
+def view_rows(records) -> Dict[Tuple[str, str, str], Tuple[int, bool]]:
+    """label_crop_target_counts as Supabase computes it from the builder's rows."""
+
+    mappings = load_mappings()
+    crop_maps, target_mapping = load_crop_maps(mappings), load_target_mapping(mappings)
+    labels: Dict[Tuple[str, str, str], Set[str]] = {}
+    main: Dict[Tuple[str, str, str], bool] = {}
+    for p in records:
+        for r in build_crop_target_rows(p["_source_file"], p, crop_maps, target_mapping):
+            key = (r["crop_norm"], r["target_type_norm"], r["target_norm"])
+            labels.setdefault(key, set()).add(r["source_file"].lower())
+            main[key] = main.get(key, False) or r["main_target_list"]
+    return {key: (len(files), main[key]) for key, files in labels.items()}
+
+
+def main() -> None:
+    gen = routes._STORE.generation()
+    index = routes._guided_filter_index()  # built once per dataset generation + mapping version
+    if index is None:
+        raise SystemExit("[bench] target_names_unified.csv is missing; no guided-filter index to count")
+
+    t0 = time.perf_counter()
+    counts = CropTargetCounts(index)
+    build = time.perf_counter() - t0
+
+    listed = {
+        (crop, type_l, t["name"].lower()): (t["count"], t["main_target_list"])
+        for crop, by_type in counts.targets.items()
+        for type_l, (main_targets, other_targets) in by_type.items()
+        for t in main_targets + other_targets
+    }
+    # The Supabase dropdown skips rows with an empty target
+    expected = {key: row for key, row in view_rows(gen.records).items() if key[2]}
+    for key in sorted(set(listed) | set(expected)):
+        if listed.get(key) != expected.get(key):
+            raise SystemExit(
+                f"[bench] {key!r}: dropdown (count, main) {listed.get(key)} != label_crop_target_counts {expected.get(key)}"
+            )
+    for (crop, type_l, target_l), (count, _) in listed.items():
+        total = len(index.lookup(crop.title(), type_l.title(), target_l.title()))
+        if count != total:
+            raise SystemExit(f"[bench] {crop!r}/{type_l!r}/{target_l!r}: dropdown count {count} != filter total {total}")
+        if type_l.title() not in counts.types(crop):
+            raise SystemExit(f"[bench] {crop!r}/{type_l!r} has targets but is not a listed type")
+
+    client = create_app().test_client()
+    pairs = sorted((crop, type_l) for crop, by_type in counts.targets.items() for type_l in by_type)
+    target_ms: List[float] = []
+    for crop, type_l in pairs[:: max(len(pairs) // 200, 1)]:
+        t0 = time.perf_counter()
+        client.get("/api/enums/targets", query_string={"crop": crop.title(), "target_type": type_l.title()})
+        target_ms.append((time.perf_counter() - t0) * 1000)
+    types_ms: List[float] = []
+    for crop in sorted(counts.target_types)[:200]:
+        t0 = time.perf_counter()
+        client.get("/api/enums/target-types", query_string={"crop": crop.title()})
+        types_ms.append((time.perf_counter() - t0) * 1000)
+
+    print(f"[bench] {len(gen.records)} labels, {len(listed)} (crop, type, target) counts, "
+          f"{len(counts.target_types)} crops")
+    print(f"[bench] count tree build (once per guided-filter index): {build * 1000:.1f} ms")
+    print(f"[bench] /api/enums/targets       median {statistics.median(target_ms):7.3f} ms  max {max(target_ms):7.3f} ms")
+    print(f"[bench] /api/enums/target-types  median {statistics.median(types_ms):7.3f} ms  max {max(types_ms):7.3f} ms")
+    print("[bench] every dropdown count matches label_crop_target_counts and the local /api/filter total")
+
+
+if __name__ == "__main__":
+    main()
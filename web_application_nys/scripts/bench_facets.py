@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the bitmap facet engine behind /api/facets.
+
+Random multi-select queries (OR within a facet, AND across facets, NOT
+exclusions) are answered both by `FacetIndex` and by a per-label set
+evaluation kept below as the reference; totals, pages and facet counts must
+agree. Also runs the example query
+"apple AND (apple scab OR powdery mildew) AND NOT FRAC 3".
+
+Usage:
+  python scripts/bench_facets.py --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Set, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import routes  # noqa: E402
+from app.data import normalize_crop_key  # noqa: E402
+from app.facet_index import CROP_SCOPED, FACETS, FacetIndex, normalize_value  # noqa: E402
+
+
+def label_values(p: Dict[str, Any], target_mapping, unified_mapping) -> Tuple[Dict[str, Set[str]], Set[Tuple[str, str, str]]]:
+    """Facet keys of one label, plus (facet, crop, key) for the crop-scoped facets."""
+
+    values: Dict[str, Set[str]] = {f: set() for f in FACETS}
+    scoped: Set[Tuple[str, str, str]] = set()
+    for facet in ("product_type", "signal_word", "long_island_use_restriction"):
+        values[facet].update(normalize_value(facet, p.get(facet)))
+    for ai in p.get("Active_Ingredients", []) or []:
+        if isinstance(ai, dict):
+            values["moa"].update(normalize_value("moa", ai.get("mode_Of_Action")))
+    for app in p.get("Application_Info", []) or []:
+        if not isinstance(app, dict):
+            continue
+        targets = [
+            normalize_crop_key(str(t.get("name") or "").strip())
+            for t in app.get("Target_Disease_Pest", []) or []
+            if isinstance(t, dict)
+        ]
+        for c in app.get("Target_Crop", []) or []:
+            if not isinstance(c, dict):
+                continue
+            crop = normalize_crop_key(str(c.get("name") or "").strip())
+            if not crop:
+                continue
+            unified = unified_mapping.get(crop, crop)
+            values["crop"].add(unified)
+            for target in targets:
+                info = target_mapping.get((crop, target)) if target else None
+                if not info or not info.get("deployed", True):
+                    continue
+                for facet, key in (
+                    ("target_type", info["display_target_type_l"].lower().strip()),
+                    ("target", info["refined_target_l"].lower().strip()),
+                ):
+                    if key:
+                        values[facet].add(key)
+                        scoped.add((facet, unified, key))
+    return values, scoped
+
+
+def reference(labels, include: Dict[str, List[str]], exclude: Dict[str, List[str]], skip: str = "") -> List[int]:
+    crops = include.get("crop") if skip != "crop" else None
+
+    def hits(values, scoped, facet, keys) -> bool:
+        if facet in CROP_SCOPED and crops:
+            return any((facet, c, k) in scoped for c in crops for k in keys)
+        return any(k in values[facet] for k in keys)
+
+    out = []
+    for rid, (values, scoped) in enumerate(labels):
+        if all(hits(values, scoped, f, keys) for f, keys in include.items() if f != skip) and not any(
+            hits(values, scoped, f, keys) for f, keys in exclude.items()
+        ):
+            out.append(rid)
+    return out
+
+
+def reference_counts(labels, include, exclude, facet) -> Dict[str, int]:
+    ids = reference(labels, include, exclude, skip=facet)
+    crops = include.get("crop") if facet in CROP_SCOPED else None
+    counts: Dict[str, int] = {}
+    for rid in ids:
+        values, scoped = labels[rid]
+        keys = {k for f, c, k in scoped if f == facet and c in crops} if crops else values[facet]
+        for k in keys:
+            counts[k] = counts.get(k, 0) + 1
+    return counts
+
+
+def random_query(rng: random.Random, index: FacetIndex) -> Tuple[Dict[str, List[str]], Dict[str, List[str]]]:
+    include: Dict[str, List[str]] = {}
+    exclude: Dict[str, List[str]] = {}
+    crop = rng.choice(sorted(index.bitmaps["crop"]))
+    if rng.random() < 0.8:
+        include["crop"] = [crop]
+        if rng.random() < 0.3:
+            include["crop"].append(rng.choice(sorted(index.bitmaps["crop"])))
+        scoped = sorted(k for c, k in index.scoped["target"] if c == crop)
+        if scoped and rng.random() < 0.7:
+            include["target"] = rng.sample(scoped, min(len(scoped), rng.randint(1, 3)))
+    for facet in ("product_type", "signal_word", "long_island_use_restriction", "target_type"):
+        if rng.random() < 0.2:
+            include[facet] = [rng.choice(sorted(index.bitmaps[facet]))]
+    if rng.random() < 0.5:
+        exclude["moa"] = rng.sample(sorted(index.bitmaps["moa"]), 2)
+    return include, exclude
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the bitmap facet engine vs a per-label evaluation.")
+    parser.add_argument("--queries", type=int, default=100, help="Random multi-select queries")
+    parser.add_argument("--per-page", type=int, default=50)
+    args = parser.parse_args()
+
+    gen = routes._STORE.generation()
+    target_mapping = routes._build_target_mapping_from_csv()
+    unified_mapping, _ = routes._load_unified_crop_names()
+
+    t0 = time.perf_counter()
+    index = FacetIndex(gen.records, target_mapping, unified_mapping)
+    build = time.perf_counter() - t0
+    labels = [label_values(p, target_mapping, unified_mapping) for p in gen.records]
+
+    rng = random.Random(5)
+    queries = [random_query(rng, index) for _ in range(args.queries)]
+    queries.append(({"crop": ["apple"], "target": ["apple scab", "powdery mildew"]}, {"moa": ["FRAC 3"]}))
+
+    ref_ms: List[float] = []
+    idx_ms: List[float] = []
+    count_ms: List[float] = []
+    for include, exclude in queries:
+        include, exclude = FacetIndex.normalize(include), FacetIndex.normalize(exclude)
+        t0 = time.perf_counter()
+        expected = reference(labels, include, exclude)
+        ref_ms.append((time.perf_counter() - t0) * 1000)
+
+        offset = rng.choice([0, 0, args.per_page, len(expected) // 2])
+        t0 = time.perf_counter()
+        total, ids = index.search(include, exclude, offset, args.per_page)
+        idx_ms.append((time.perf_counter() - t0) * 1000)
+        if total != len(expected) or ids != expected[offset : offset + args.per_page]:
+            raise SystemExit(f"[bench] facet results differ for {include!r} / {exclude!r}")
+
+        t0 = time.perf_counter()
+        got = {f: index.facet_counts(include, exclude, f) for f in ("target", "moa", "signal_word")}
+        count_ms.append((time.perf_counter() - t0) * 1000)
+        for facet, rows in got.items():
+            if {r["value"]: r["count"] for r in rows} != reference_counts(labels, include, exclude, facet):
+                raise SystemExit(f"[bench] {facet} counts differ for {include!r} / {exclude!r}")
+
+    include, exclude = queries[-1]
+    total, _ = index.search(include, exclude, 0, 0)
+    print(f"[bench] {len(gen.records)} labels, {sum(len(v) for v in index.bitmaps.values())} facet values, "
+          f"{sum(len(v) for v in index.scoped.values())} crop-scoped target values")
+    print(f"[bench] index build: {build * 1000:.0f} ms")
+    print(f"[bench] apple AND (apple scab OR powdery mildew) AND NOT FRAC 3 -> {total} labels")
+    print(f"[bench] per-label evaluation  median {statistics.median(ref_ms):8.3f} ms  max {max(ref_ms):8.3f} ms")
+    print(f"[bench] bitmap query + page   median {statistics.median(idx_ms):8.3f} ms  max {max(idx_ms):8.3f} ms")
+    print(f"[bench] 3 facet count lists   median {statistics.median(count_ms):8.3f} ms  max {max(count_ms):8.3f} ms")
+    print(f"[bench] {len(queries)} queries match the reference (results, pages and counts)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark the fuzzy (typo-tolerant) search mode against a latency budget.
+
+Times `FuzzyIndex.match_names` + record mapping for a set of misspelled and
+partial queries on the real vocabulary, then on synthetic vocabularies grown
+to --sizes names (new trade names made from mutated real tokens, so the token
+vocabulary grows too). Exits non-zero if the p95 latency at any size exceeds
+--budget-ms, so it can gate changes to the scorer or cutoffs.
+
+Usage:
+  python scripts/bench_fuzzy_search.py --sizes 10000,50000,100000 --budget-ms 15
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+from app.search_index import FuzzyIndex, fuzzy_available  # noqa: E402
+
+QUERIES = [
+    "chlorantraniprole",
+    "mancozep",
+    "glyfosate",
+    "imidaclopride",
+    "azoxystrobn",
+    "captn",
+    "roundup powrmax",
+    "copper hydroxyde",
+    "dithane",
+    "bifentrin",
+    "propiconazol",
+    "xyzzy",
+]
+
+
+def _mutate(token: str, rng: random.Random) -> str:
+    if len(token) < 4:
+        return token + rng.choice("aeiou")
+    i = rng.randrange(len(token))
+    return token[:i] + rng.choice("abcdefghijklmnopqrstuvwxyz") + token[i + 1 :]
+
+
+def synthetic_indexes(indexes: Dict[str, Dict[str, list]], size: int, seed: int = 5) -> Dict[str, Dict[str, list]]:
+    rng = random.Random(seed)
+    trade = dict(indexes["trade_Name"])
+    names = list(trade)
+    while len(trade) + len(indexes["active_ingredient"]) < size:
+        words = rng.choice(names).split()
+        words = [_mutate(w, rng) if rng.random() < 0.5 else w for w in words]
+        trade.setdefault(" ".join(words) + f" {rng.randrange(1000)}", [])
+    return {"trade_Name": trade, "active_ingredient": indexes["active_ingredient"]}
+
+
+def time_queries(index: FuzzyIndex, repeat: int) -> List[float]:
+    times = []
+    for q in QUERIES:
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            index.search(q, 200)
+            times.append((time.perf_counter() - t0) * 1000)
+    return times
+
+
+def report(label: str, index: FuzzyIndex, repeat: int, budget: float) -> bool:
+    times = sorted(time_queries(index, repeat))
+    p95 = times[min(len(times) - 1, int(len(times) * 0.95))]
+    ok = p95 <= budget
+    print(
+        f"[bench] {label:<10} names {len(index.names):>7}  tokens {len(index.vocab):>7}"
+        f"  median {statistics.median(times):7.2f} ms  p95 {p95:7.2f} ms  {'ok' if ok else 'OVER BUDGET'}"
+    )
+    return ok
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark fuzzy search latency as the vocabulary grows.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--sizes", default="10000,50000,100000", help="Comma-separated synthetic vocabulary sizes")
+    parser.add_argument("--budget-ms", type=float, default=15.0, help="p95 latency budget per query")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing repeats per query")
+    args = parser.parse_args()
+
+    if not fuzzy_available():
+        raise SystemExit("[bench] rapidfuzz is not installed; fuzzy search falls back to the plain search")
+
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+    store = JsonPesticideStore(json_dir=json_dir)
+    gen = store.generation()
+    fuzzy = gen.fuzzy_index()
+    assert fuzzy is not None
+
+    for q in QUERIES[:4]:
+        top: List[Any] = fuzzy.match_names(q)[:3]
+        print(f"[bench] {q!r:>22} -> " + ", ".join(f"{key} ({score:.0f})" for score, _, key in top))
+
+    ok = report("dataset", fuzzy, args.repeat, args.budget_ms)
+    for size in (int(s) for s in args.sizes.split(",") if s.strip()):
+        t0 = time.perf_counter()
+        index = FuzzyIndex(synthetic_indexes(fuzzy.indexes, size))
+        build = time.perf_counter() - t0
+        ok = report(f"{size // 1000}k", index, args.repeat, args.budget_ms) and ok
+        print(f"[bench]            (index build {build * 1000:.0f} ms)")
+
+    if not ok:
+        raise SystemExit(f"[bench] fuzzy search exceeded the {args.budget_ms:.1f} ms p95 budget")
+
+
+if __name__ == "__main__":
+    main()
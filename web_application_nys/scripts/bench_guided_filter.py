@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the guided-filter index behind local /api/filter.
+
+For a sample of (crop, target_type, target) selections taken from the index
+itself, compares `GuidedFilterIndex.lookup` with a per-request scan over the
+rows scripts/build_supabase_label_index.py writes to label_crop_target (what
+the Supabase filter returns), and reports the per-request cost of each, plus
+the one-off index build time.
+
+Usage:
+  python scripts/bench_guided_filter.py --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import routes  # noqa: E402
+from app.data import normalize_crop_key  # noqa: E402
+from app.filter_index import GuidedFilterIndex  # noqa: E402
+from build_supabase_label_index import build_crop_target_rows, load_crop_maps, load_target_mapping  # noqa: E402
+from nys_mappings.mapping_artifact import load_mappings  # noqa: E402
+
+
+def scan_filter(
+    records: Sequence[Dict[str, Any]],
+    crop_maps,
+    target_mapping,
+    crop: str,
+    target_type: str,
+    target: str,
+) -> List[Dict[str, Any]]:
+    """Labels with a label_crop_target row for the selection, as the reference."""
+
+    key = (normalize_crop_key(crop), target_type.lower().strip(), target.lower().strip())
+    matched: List[Dict[str, Any]] = []
+    seen_source_files: set = set()
+    for p in records:
+        source_file = p["_source_file"]
+        if source_file.lower() in seen_source_files:
+            continue
+        rows = build_crop_target_rows(source_file, p, crop_maps, target_mapping)
+        if any((r["crop_norm"], r["target_type_norm"], r["target_norm"]) == key for r in rows):
+            seen_source_files.add(source_file.lower())
+            matched.append(p)
+    return matched
+
+
+def pick_selections(index: GuidedFilterIndex, count: int, seed: int = 3) -> List[Tuple[str, str, str]]:
+    rng = random.Random(seed)
+    keys = sorted(index.postings)
+    picked = rng.sample(keys, min(count, len(keys)))
+    selections = []
+    for crop, type_l, target_l in picked:
+        # The UI sends title-cased crops and display-cased type/target.
+        selections.append((crop.title(), type_l.title(), target_l.title()))
+        selections.append((crop, type_l, target_l))
+    selections.append(("Apple", "Disease", "No Such Target"))
+    return selections
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the guided-filter index vs a label_crop_target scan.")
+    parser.add_argument("--queries", type=int, default=100, help="Sampled (crop, type, target) selections")
+    args = parser.parse_args()
+
+    gen = routes._STORE.generation()
+    target_mapping = routes._build_target_mapping_from_csv()
+    if not target_mapping:
+        raise SystemExit("[bench] target_names_unified.csv not found; the filter uses the legacy scan")
+    unified_mapping, deployed_map = routes._load_unified_crop_names()
+    mappings = load_mappings()
+    crop_maps, row_mapping = load_crop_maps(mappings), load_target_mapping(mappings)
+
+    t0 = time.perf_counter()
+    index = GuidedFilterIndex(gen.records, target_mapping, unified_mapping, deployed_map)
+    build = time.perf_counter() - t0
+
+    selections = pick_selections(index, args.queries)
+    scan_ms: List[float] = []
+    cold_ms: List[float] = []
+    warm_ms: List[float] = []
+    for sel in selections:
+        t0 = time.perf_counter()
+        expected = scan_filter(gen.records, crop_maps, row_mapping, *sel)
+        scan_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        got = index.lookup(*sel)
+        cold_ms.append((time.perf_counter() - t0) * 1000)
+        t0 = time.perf_counter()
+        index.lookup(*sel)
+        warm_ms.append((time.perf_counter() - t0) * 1000)
+
+        if [p["_source_file"] for p in got] != [p["_source_file"] for p in expected]:
+            raise SystemExit(f"[bench] index differs from the label_crop_target rows for {sel!r}")
+
+    hits = sum(1 for sel in selections if index.lookup(*sel))
+    print(f"[bench] {len(gen.records)} records, {len(selections)} selections ({hits} non-empty)")
+    print(f"[bench] index build (once per dataset + mapping version): {build * 1000:.0f} ms")
+    print(f"[bench] scan per request        median {statistics.median(scan_ms):8.2f} ms  max {max(scan_ms):8.2f} ms")
+    print(f"[bench] index lookup (first)    median {statistics.median(cold_ms):8.3f} ms  max {max(cold_ms):8.3f} ms")
+    print(f"[bench] index lookup (memoized) median {statistics.median(warm_ms):8.4f} ms  max {max(warm_ms):8.4f} ms")
+    print("[bench] index results match the label_crop_target rows for every selection")
+
+
+if __name__ == "__main__":
+    main()
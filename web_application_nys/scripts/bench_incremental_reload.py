@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) JsonPesticideStore incremental reloads.
+
+Copies the JSON directory to a temp dir, loads it, then rewrites / deletes /
+adds / merely touches a handful of files and reloads. The incrementally
+patched store is compared against a fresh full load of the same directory,
+and both reload costs are reported.
+
+Usage:
+  python scripts/bench_incremental_reload.py --changes 20
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+
+
+def _fingerprint(store: JsonPesticideStore) -> dict:
+    """Identity-free view of the store; index key order is not significant."""
+
+    gen = store.generation()
+
+    def files(items: list) -> list[str]:
+        return [r["_source_file"] for r in items]
+
+    return {
+        "records": gen.records,
+        "order": files(gen.records),
+        "epa": {k: v["_source_file"] for k, v in gen.epa_index.items()},
+        "file": sorted(gen.file_index),
+        "trade": {k: files(v) for k, v in gen.trade_index.items()},
+        "company": {k: files(v) for k, v in gen.company_index.items()},
+        "ingredient": {k: files(v) for k, v in gen.ingredient_index.items()},
+        "crops": store.list_crops(),
+    }
+
+
+def _mutate(json_dir: Path, changes: int) -> dict[str, int]:
+    names = sorted(p.name for p in json_dir.glob("*.json"))
+    step = max(len(names) // max(changes * 4, 1), 1)
+    picked = names[::step][: changes * 4]
+    rewrite, delete, add, touch = (picked[i::4] for i in range(4))
+
+    for name in rewrite:
+        p = json_dir / name
+        data = json.loads(p.read_text(encoding="utf-8"))
+        data["pesticide"]["trade_Name"] = "AAA " + str(data["pesticide"].get("trade_Name") or "")
+        p.write_text(json.dumps(data), encoding="utf-8")
+    for name in delete:
+        (json_dir / name).unlink()
+    for name in add:
+        # Same EPA number under a new filename exercises last-wins collisions.
+        shutil.copyfile(json_dir / name, json_dir / f"ZZZ_COPY_{name}")
+    for name in touch:
+        os.utime(json_dir / name, None)
+    return {"rewritten": len(rewrite), "deleted": len(delete), "added": len(add), "touched": len(touch)}
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark incremental vs full JsonPesticideStore reloads.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--changes", type=int, default=20, help="Files per change kind (rewrite/delete/add/touch)")
+    args = parser.parse_args()
+
+    src = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        json_dir = Path(tmp) / "altered_json"
+        shutil.copytree(src, json_dir)
+
+        store = JsonPesticideStore(json_dir=json_dir, use_snapshot=False, cache_seconds=1)
+        store.load()
+        store.list_crops()  # make the crop cache live so it gets patched too
+        before = store.generation()
+        before_view = _fingerprint(store)
+
+        # Make sure rewritten files get a distinct mtime even on coarse filesystems.
+        time.sleep(0.01)
+        counts = _mutate(json_dir, args.changes)
+
+        store._loaded_at = 0  # expire the cache the same way cache_seconds would
+        t0 = time.perf_counter()
+        store.load()
+        incremental = time.perf_counter() - t0
+
+        fresh = JsonPesticideStore(json_dir=json_dir, use_snapshot=False)
+        t0 = time.perf_counter()
+        fresh.load()
+        full = time.perf_counter() - t0
+
+        a, b = _fingerprint(store), _fingerprint(fresh)
+        for key in a:
+            if a[key] != b[key]:
+                raise SystemExit(f"[bench] incremental reload differs from full reload in {key!r}")
+        if store.generation() is before:
+            raise SystemExit("[bench] reload did not publish a new generation")
+        # Readers still holding the old generation must see it unchanged.
+        store._gen, now = before, store._gen
+        if _fingerprint(store) != before_view:
+            raise SystemExit("[bench] reload mutated the previous generation")
+        store._gen = now
+
+    print(f"[bench] JSON dir: {src} ({len(fresh.all_records())} records after changes)")
+    print("[bench] changes: " + ", ".join(f"{k}={v}" for k, v in counts.items()))
+    print("[bench] incremental reload matches a full reload exactly; previous generation untouched")
+    print(f"[bench] incremental reload {incremental * 1000:8.1f} ms")
+    print(f"[bench] full reload        {full * 1000:8.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
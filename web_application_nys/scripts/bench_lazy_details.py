@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Benchmark resident memory and detail latency of the lazy (packed corpus) store.
+
+Each mode runs in a fresh interpreter that starts from its own snapshot, as a
+restarted worker would: the eager store unpickles full records, the lazy
+store (NYS_LAZY_DETAILS=1) unpickles `LabelRecord`s whose Application_Info,
+Safety_Information and PPE stay in the memory-mapped corpus file. Reports
+per-process RSS after load, /api/pesticide-file body time with the detail
+cache disabled (every request serializes or reads its record), and the time
+of one full Application_Info scan, which each derived index build pays.
+
+Usage:
+  python scripts/bench_lazy_details.py --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import random
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+
+
+def rss_mb() -> float:
+    """Current resident set size of this process (Linux), else peak RSS."""
+
+    try:
+        with open("/proc/self/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    import resource
+
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def _store(json_dir: Path, tmp: Path, lazy: bool) -> JsonPesticideStore:
+    return JsonPesticideStore(
+        json_dir=json_dir,
+        snapshot_path=tmp / ("lazy.pkl" if lazy else "eager.pkl"),
+        lazy_details=lazy,
+        corpus_dir=tmp / "corpus",
+        detail_cache_bytes=0,
+    )
+
+
+def _child(json_dir: Path, tmp: Path, lazy: bool, requests: int) -> None:
+    base = rss_mb()
+    store = _store(json_dir, tmp, lazy)
+    t0 = time.perf_counter()
+    store.load()
+    load_s = time.perf_counter() - t0
+    gc.collect()
+    rss = rss_mb() - base
+
+    names = [r["_source_file"] for r in store.all_records()]
+    rng = random.Random(0)
+    ms = []
+    for name in (rng.choice(names) for _ in range(requests)):
+        t0 = time.perf_counter()
+        store.detail_body(source_file=name)
+        ms.append((time.perf_counter() - t0) * 1000)
+
+    t0 = time.perf_counter()
+    applications = sum(1 for _ in store.iter_applications())
+    scan_s = time.perf_counter() - t0
+    print(f"{rss:.1f} {load_s:.6f} {statistics.median(ms):.6f} {max(ms):.6f} {scan_s:.6f} {len(names)} {applications}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compare eager and lazy (packed corpus) store memory and detail latency.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--requests", type=int, default=2000, help="Detail bodies to time per mode")
+    parser.add_argument("--tmp", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--lazy", action="store_true", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+    if args.child:
+        _child(json_dir, Path(args.tmp), args.lazy, args.requests)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        results = {}
+        for mode, lazy in (("eager", False), ("lazy", True)):
+            # Prime the snapshot (and corpus) once; that build is not measured.
+            _store(json_dir, Path(tmp), lazy).load()
+            cmd = [sys.executable, __file__, "--child", "--json-dir", str(json_dir), "--tmp", tmp,
+                   "--requests", str(args.requests)] + (["--lazy"] if lazy else [])
+            results[mode] = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.split()
+        corpus_mb = sum(f.stat().st_size for f in (Path(tmp) / "corpus").glob("*.bin")) / 1e6
+
+    labels, applications = results["eager"][5], results["eager"][6]
+    print(f"[bench] {labels} labels, {applications} applications; packed corpus {corpus_mb:.1f} MB on disk")
+    for mode, (rss, load_s, median, worst, scan_s, _, _) in results.items():
+        print(
+            f"[bench] {mode:<5}  RSS after load {float(rss):7.1f} MB  load {float(load_s) * 1000:6.0f} ms  "
+            f"detail median {float(median):6.3f} ms  max {float(worst):6.3f} ms  "
+            f"Application_Info scan {float(scan_s) * 1000:6.0f} ms"
+        )
+    print(f"[bench] lazy RSS / eager RSS: {float(results['lazy'][0]) / max(float(results['eager'][0]), 1e-9):.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) MOA exclusion on /api/filter.
+
+For sampled guided-filter selections and random sets of excluded MOA codes,
+compares `MoaMasks.exclude` with a per-label check that re-parses every
+active ingredient's mode of action (kept below as the reference).
+
+Usage:
+  python scripts/bench_moa_filter.py --queries 300
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import routes  # noqa: E402
+from app.filter_index import GuidedFilterIndex  # noqa: E402
+from app.moa import MoaMasks, parse_moa_codes  # noqa: E402
+
+
+def reference(matched: List[Dict[str, Any]], excluded: List[str]) -> List[Dict[str, Any]]:
+    drop = set(excluded)
+    out = []
+    for p in matched:
+        codes = set()
+        for ai in p.get("Active_Ingredients", []) or []:
+            if isinstance(ai, dict):
+                codes.update(parse_moa_codes(ai.get("mode_Of_Action") or ai.get("mode_of_action") or ""))
+        if not codes & drop:
+            out.append(p)
+    return out
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark MOA bitmask exclusion vs re-parsing labels.")
+    parser.add_argument("--queries", type=int, default=200, help="Sampled selections with random exclusions")
+    args = parser.parse_args()
+
+    gen = routes._STORE.generation()
+    t0 = time.perf_counter()
+    masks = MoaMasks(gen.records)
+    build = time.perf_counter() - t0
+
+    guided = GuidedFilterIndex(
+        gen.records,
+        routes._build_target_mapping_from_csv(),
+        *routes._load_unified_crop_names(),
+    )
+    rng = random.Random(16)
+    keys = sorted(guided.postings)
+    ref_ms: List[float] = []
+    idx_ms: List[float] = []
+    dropped = 0
+    for _ in range(args.queries):
+        crop, type_l, target_l = rng.choice(keys)
+        matched = guided.lookup(crop, type_l, target_l)
+        excluded = rng.sample(masks.codes, rng.choice([1, 2, 3, 5]))
+
+        t0 = time.perf_counter()
+        expected = reference(matched, excluded)
+        ref_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        got = masks.exclude(matched, excluded)
+        idx_ms.append((time.perf_counter() - t0) * 1000)
+
+        if got != expected:
+            raise SystemExit(f"[bench] MOA exclusion differs for {(crop, type_l, target_l)!r} {excluded!r}")
+        dropped += len(matched) - len(got)
+
+    print(f"[bench] {len(gen.records)} labels, {len(masks.codes)} MOA codes")
+    print(f"[bench] mask build (once per dataset generation): {build * 1000:.0f} ms")
+    print(f"[bench] re-parse per label  median {statistics.median(ref_ms):8.3f} ms  max {max(ref_ms):8.3f} ms")
+    print(f"[bench] bitmask exclude     median {statistics.median(idx_ms):8.3f} ms  max {max(idx_ms):8.3f} ms")
+    print(f"[bench] {args.queries} queries match the reference ({dropped} labels dropped in total)")
+
+
+if __name__ == "__main__":
+    main()
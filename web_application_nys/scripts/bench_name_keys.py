@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""
+Benchmark crop/target name normalization over the loaded corpus.
+
+Loads the store (which interns record strings and records every crop/target
+name's normalized key), then normalizes every Target_Crop / Target_Disease_Pest
+name the way the request handlers do, through the symbol table and through
+the uncached normalizer, and checks both give the same keys. Also reports how
+many distinct string objects the names use.
+
+Usage:
+  python scripts/bench_name_keys.py --rounds 5
+"""
+
+from __future__ import annotations
+
+import argparse
+import statistics
+import sys
+import time
+from pathlib import Path
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+from nys_mappings import keys  # noqa: E402
+from nys_mappings.keys import normalize_crop_key  # noqa: E402
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Time crop/target name normalization with and without the symbol table.")
+    parser.add_argument("--rounds", type=int, default=5)
+    args = parser.parse_args()
+
+    store = JsonPesticideStore(json_dir=get_json_dir(), use_snapshot=False)
+    t0 = time.perf_counter()
+    store.load()
+    print(f"[bench] Loaded {len(store.all_records())} labels in {time.perf_counter() - t0:.2f}s")
+
+    names = [
+        str(item.get("name") or "").strip()
+        for _, app in store.iter_applications()
+        for field in ("Target_Crop", "Target_Disease_Pest")
+        for item in app.get(field, []) or []
+        if isinstance(item, dict)
+    ]
+    print(
+        f"[bench] {len(names)} crop/target names, {len({id(n) for n in names})} string objects, "
+        f"{len(set(names))} distinct values"
+    )
+
+    def timed(fn) -> float:
+        ms = []
+        for _ in range(args.rounds):
+            t0 = time.perf_counter()
+            for n in names:
+                fn(n)
+            ms.append((time.perf_counter() - t0) * 1000)
+        return statistics.median(ms)
+
+    if [normalize_crop_key(n) for n in names] != [keys._normalize_name(n) for n in names]:
+        raise SystemExit("[bench] symbol table keys differ from the normalizer")
+    cached = timed(normalize_crop_key)
+    uncached = timed(keys._normalize_name)
+    print(f"[bench] normalize every name: symbol table {cached:.1f} ms, uncached {uncached:.1f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) REI/PHI/rate range filtering on /api/filter.
+
+For sampled guided-filter selections combined with random REI/PHI/rate
+bounds, compares `ApplicationRangeIndex` + `GuidedFilterIndex.lookup` with a
+per-application scan that parses every quantity on the fly and applies the
+label_crop_target row rules of scripts/build_supabase_label_index.py (kept
+below as the reference), and reports how many applications have each quantity parsed.
+
+Usage:
+  python scripts/bench_range_filter.py --queries 200
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Mapping, Optional, Set, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import routes  # noqa: E402
+from app.filter_index import GuidedFilterIndex  # noqa: E402
+from app.quantities import parse_application  # noqa: E402
+from app.application_table import ApplicationTable  # noqa: E402
+from app.range_index import RANGE_COLUMNS, UNIT_COLUMNS, ApplicationRangeIndex, iter_application_ids  # noqa: E402
+from build_supabase_label_index import build_crop_target_rows, load_crop_maps, load_target_mapping  # noqa: E402
+from nys_mappings import mapping_cache  # noqa: E402
+from nys_mappings.mapping_artifact import load_mappings  # noqa: E402
+
+Bounds = Dict[str, Tuple[Optional[float], Optional[float]]]
+
+
+def app_hits(app: Dict[str, Any], key: Tuple[str, str, str], crop_maps, target_mapping) -> bool:
+    """Whether one application yields a label_crop_target row for `key` (the builder's row rules)."""
+
+    rows = build_crop_target_rows("", {"Application_Info": [app]}, crop_maps, target_mapping)
+    return any((r["crop_norm"], r["target_type_norm"], r["target_norm"]) == key for r in rows)
+
+
+def within(q, bounds: Bounds, unit: str) -> bool:
+    for column, (lo, hi) in bounds.items():
+        v = getattr(q, column)
+        if v is None or (column in UNIT_COLUMNS and getattr(q, UNIT_COLUMNS[column]) != unit):
+            return False
+        if (lo is not None and v < lo) or (hi is not None and v > hi):
+            return False
+    return True
+
+
+def reference(records, unit_lookup: Mapping[str, str], crop_maps, target_mapping, key, bounds, unit) -> List[str]:
+    rids: Set[int] = set()
+    for _, rid, app in iter_application_ids(records):
+        if app_hits(app, key, crop_maps, target_mapping) and within(
+            parse_application(app, unit_lookup), bounds, unit
+        ):
+            rids.add(rid)
+    out, seen = [], set()
+    for rid in sorted(rids):
+        key = records[rid]["_source_file"].lower()
+        if key not in seen:
+            seen.add(key)
+            out.append(records[rid]["_source_file"])
+    return out
+
+
+def random_bounds(rng: random.Random, units: List[str]) -> Tuple[Bounds, str]:
+    bounds: Bounds = {}
+    if rng.random() < 0.7:
+        bounds["rei_hours"] = (None, rng.choice([4, 12, 24, 48]))
+    if rng.random() < 0.6:
+        bounds["phi_days"] = (rng.choice([None, 0, 1]), rng.choice([0, 1, 7, 14, 30]))
+    unit = ""
+    if rng.random() < 0.4 or not bounds:
+        unit = rng.choice(units)
+        bounds["rate"] = (rng.choice([None, 0.5, 1.0]), rng.choice([2.0, 8.0, 32.0]))
+    return bounds, unit
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark range filters vs a per-application scan.")
+    parser.add_argument("--queries", type=int, default=100, help="Sampled selections with random bounds")
+    args = parser.parse_args()
+
+    gen = routes._STORE.generation()
+    unit_lookup = mapping_cache.unit_lookup()
+    target_mapping = routes._build_target_mapping_from_csv()
+    unified_mapping, deployed_map = routes._load_unified_crop_names()
+    mappings = load_mappings()
+    crop_maps, row_mapping = load_crop_maps(mappings), load_target_mapping(mappings)
+
+    t0 = time.perf_counter()
+    ranges = ApplicationRangeIndex(ApplicationTable(gen.records, unit_lookup))
+    build = time.perf_counter() - t0
+    guided = GuidedFilterIndex(gen.records, target_mapping, unified_mapping, deployed_map)
+
+    n_apps = len(ranges.app_record)
+    known = {c: int((ranges.columns[c] == ranges.columns[c]).sum()) for c in RANGE_COLUMNS}
+    units = ["FL OZ/A", "PT/A", "OZ/A", "LB/A", "QT/A"]
+
+    rng = random.Random(11)
+    keys = sorted(guided.postings)
+    selections = [rng.choice(keys) for _ in range(args.queries)]
+    selections.append(("grape", "disease", "botrytis bunch rot"))
+
+    ref_ms: List[float] = []
+    idx_ms: List[float] = []
+    non_empty = 0
+    for crop, type_l, target_l in selections:
+        bounds, unit = random_bounds(rng, units)
+        if (crop, type_l, target_l) == ("grape", "disease", "botrytis bunch rot"):
+            bounds, unit = {"rei_hours": (None, 12), "phi_days": (None, 7)}, ""
+        crops = guided.matching_crops(crop)
+
+        t0 = time.perf_counter()
+        expected = reference(gen.records, unit_lookup, crop_maps, row_mapping, (crop, type_l, target_l), bounds, unit)
+        ref_ms.append((time.perf_counter() - t0) * 1000)
+
+        t0 = time.perf_counter()
+        allowed = set(ranges.applications(crops, bounds, unit).tolist())
+        got = guided.lookup(crop, type_l, target_l, allowed)
+        idx_ms.append((time.perf_counter() - t0) * 1000)
+
+        if [p["_source_file"] for p in got] != expected:
+            raise SystemExit(f"[bench] range filter differs for {(crop, type_l, target_l)!r} {bounds!r} {unit!r}")
+        non_empty += bool(expected)
+
+    print(f"[bench] {len(gen.records)} labels, {n_apps} applications; parsed: "
+          + ", ".join(f"{c} {known[c] * 100 // max(n_apps, 1)}%" for c in RANGE_COLUMNS))
+    print(f"[bench] range index build (once per dataset + units version): {build * 1000:.0f} ms")
+    print(f"[bench] grape/botrytis bunch rot, REI <= 12 h, PHI <= 7 days -> {len(expected)} labels")
+    print(f"[bench] per-application scan  median {statistics.median(ref_ms):8.2f} ms  max {max(ref_ms):8.2f} ms")
+    print(f"[bench] range index + lookup  median {statistics.median(idx_ms):8.3f} ms  max {max(idx_ms):8.3f} ms")
+    print(f"[bench] {len(selections)} queries ({non_empty} non-empty) match the scan")
+
+
+if __name__ == "__main__":
+    main()
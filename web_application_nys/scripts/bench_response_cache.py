@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the response cache for hot guided-filter queries.
+
+Replays a skewed mix of /api/filter, /api/enums/targets and
+/api/enums/target-types requests (a few combinations dominate, like real
+traffic) through the Flask test client with the cache off and on, checks the
+bodies are identical, and prints per-endpoint hit/miss counters. With
+--shared, a second cache instance (standing in for another worker process)
+must answer from the shared directory alone.
+
+Usage:
+  python scripts/bench_response_cache.py --requests 2000 --shared
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app import create_app, routes  # noqa: E402
+from app.response_cache import ResponseCache  # noqa: E402
+
+Request = Tuple[str, Dict[str, str]]
+
+
+def workload(n: int, rng: random.Random) -> List[Request]:
+    counts = routes._crop_target_counts()
+    keys = sorted(counts.counts)
+    # A small hot set takes most of the traffic, the rest is spread thin.
+    hot = rng.sample(keys, 8)
+    out: List[Request] = []
+    for _ in range(n):
+        crop, type_l, target_l = rng.choice(hot) if rng.random() < 0.8 else rng.choice(keys)
+        kind = rng.random()
+        if kind < 0.6:
+            out.append(("/api/filter", {"crop": crop, "target_type": type_l, "target": target_l}))
+        elif kind < 0.9:
+            out.append(("/api/enums/targets", {"crop": crop, "target_type": type_l}))
+        else:
+            out.append(("/api/enums/target-types", {"crop": crop}))
+    return out
+
+
+def replay(client, requests: List[Request]) -> Tuple[List[float], List[bytes]]:
+    ms: List[float] = []
+    bodies: List[bytes] = []
+    for url, args in requests:
+        t0 = time.perf_counter()
+        resp = client.get(url, query_string=args)
+        ms.append((time.perf_counter() - t0) * 1000)
+        bodies.append(resp.get_data())
+    return ms, bodies
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark the generation-scoped response cache.")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--shared", action="store_true", help="Also check a shared cache directory")
+    args = parser.parse_args()
+
+    client = create_app().test_client()
+    requests = workload(args.requests, random.Random(18))
+    client.get("/api/filter", query_string=requests[0][1])  # warm the indexes
+
+    routes._RESPONSE_CACHE = ResponseCache(0)
+    off_ms, expected = replay(client, requests)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        shared = Path(tmp) if args.shared else None
+        routes._RESPONSE_CACHE = ResponseCache(32 << 20, shared)
+        on_ms, got = replay(client, requests)
+        if got != expected:
+            raise SystemExit("[bench] cached bodies differ from uncached ones")
+        stats = routes._RESPONSE_CACHE.stats()
+
+        if shared is not None:
+            routes._RESPONSE_CACHE = ResponseCache(0, shared)  # another worker, no memory tier
+            _, again = replay(client, requests)
+            if again != expected:
+                raise SystemExit("[bench] shared-directory bodies differ")
+            shared_hits = sum(e["shared_hits"] for e in routes._RESPONSE_CACHE.stats()["endpoints"].values())
+            print(f"[bench] second worker answered {shared_hits}/{len(requests)} requests from the shared directory")
+
+    print(f"[bench] {len(requests)} requests, cache holds {stats['entries']} bodies ({stats['bytes'] / 1024:.0f} KiB)")
+    for endpoint, c in stats["endpoints"].items():
+        print(f"[bench]   {endpoint:26s} hits {c['hits']:6d}  misses {c['misses']:6d}")
+    print(f"[bench] cache off  median {statistics.median(off_ms):7.3f} ms  mean {statistics.mean(off_ms):7.3f} ms")
+    print(f"[bench] cache on   median {statistics.median(on_ms):7.3f} ms  mean {statistics.mean(on_ms):7.3f} ms")
+    print("[bench] cached responses match uncached ones")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,175 @@
+#!/usr/bin/env python3
+"""
+Benchmark (and sanity-check) the trigram search index against the full scan.
+
+Runs a fixed set of queries (plus trade-name / ingredient fragments sampled
+from the data) through `TrigramIndex.search` / `epa_contains` and through the
+original linear scan, checks the results are identical, and reports median
+latency per query. Runs on the real dataset and on a synthetic corpus built by
+cloning the labels (with varied trade names) up to --synthetic records.
+
+Usage:
+  python scripts/bench_search.py --synthetic 100000
+"""
+
+from __future__ import annotations
+
+import argparse
+import random
+import statistics
+import sys
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+from app.search_index import TrigramIndex  # noqa: E402
+
+
+def scan_search(records: List[Dict[str, Any]], q: str, limit: int) -> List[Dict[str, Any]]:
+    """The pre-index `search_type="both"` loop, kept verbatim as the reference."""
+
+    scored = []
+    for r in records:
+        score = 0.0
+        trade = r.get("trade_Name")
+        epa = r.get("epa_reg_no")
+        company = r.get("company_name") or r.get("COMPANY_NAME")
+
+        tl = str(trade or "").lower()
+        if tl == q:
+            score += 10
+        elif tl.startswith(q):
+            score += 6
+        elif q in tl:
+            score += 4
+
+        el = str(epa or "").lower()
+        if el == q:
+            score += 8
+        elif q in el:
+            score += 3
+
+        if q in str(company or "").lower():
+            score += 1
+
+        if score == 0:
+            for ing in r.get("Active_Ingredients", []) or []:
+                if isinstance(ing, dict) and q in str(ing.get("name") or "").lower():
+                    score += 2
+                    break
+
+        if score > 0:
+            scored.append((score, r))
+
+    scored.sort(key=lambda t: t[0], reverse=True)
+    return [r for _, r in scored[:limit]]
+
+
+def scan_epa(records: List[Dict[str, Any]], q: str, limit: int) -> List[Dict[str, Any]]:
+    out = []
+    for r in records:
+        if q in str(r.get("epa_reg_no") or "").lower():
+            out.append(r)
+            if len(out) >= limit:
+                break
+    return out
+
+
+def synthesize(records: List[Dict[str, Any]], n: int, seed: int = 7) -> List[Dict[str, Any]]:
+    rng = random.Random(seed)
+    out = list(records)
+    i = 0
+    while len(out) < n:
+        base = records[i % len(records)]
+        i += 1
+        out.append({
+            **base,
+            "trade_Name": f"{base.get('trade_Name') or ''} {rng.choice('ABCDEFGHJK')}{i}",
+            "epa_reg_no": f"{base.get('epa_reg_no') or ''}-{i}",
+            "_source_file": f"SYN_{i}_{base['_source_file']}",
+        })
+    out.sort(key=lambda r: (str(r.get("trade_Name") or "").lower(), r["_source_file"]))
+    return out
+
+
+def pick_queries(records: List[Dict[str, Any]], count: int, seed: int = 11) -> List[str]:
+    rng = random.Random(seed)
+    queries = ["a", "ab", "copper", "glyphosate", "sulfur", "100-", "ultra", "zzzz-no-match", "bt"]
+    for r in rng.sample(records, min(count, len(records))):
+        trade = str(r.get("trade_Name") or "").lower()
+        if len(trade) >= 5:
+            start = rng.randrange(0, len(trade) - 4)
+            queries.append(trade[start : start + rng.randint(3, 6)])
+        for ing in r.get("Active_Ingredients", []) or []:
+            if isinstance(ing, dict) and ing.get("name"):
+                queries.append(str(ing["name"]).lower()[:8])
+                break
+    # store.search strips the query before matching; keep the comparisons like-for-like
+    return [q for q in dict.fromkeys(q.strip() for q in queries) if q]
+
+
+def _median_ms(fn: Callable[[], Any], repeat: int) -> float:
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - t0)
+    return statistics.median(times) * 1000
+
+
+def run(label: str, records: List[Dict[str, Any]], queries: List[str], limit: int, repeat: int) -> None:
+    t0 = time.perf_counter()
+    index = TrigramIndex(records)
+    build = time.perf_counter() - t0
+
+    scan_ms, index_ms, epa_scan_ms, epa_index_ms = [], [], [], []
+    for q in queries:
+        if index.search(q, limit) != scan_search(records, q, limit):
+            raise SystemExit(f"[bench] {label}: index search differs from scan for {q!r}")
+        if index.epa_contains(q, limit) != scan_epa(records, q, limit):
+            raise SystemExit(f"[bench] {label}: EPA fallback differs from scan for {q!r}")
+        scan_ms.append(_median_ms(lambda: scan_search(records, q, limit), repeat))
+        index_ms.append(_median_ms(lambda: index.search(q, limit), repeat))
+        epa_scan_ms.append(_median_ms(lambda: scan_epa(records, q, limit), repeat))
+        epa_index_ms.append(_median_ms(lambda: index.epa_contains(q, limit), repeat))
+
+    print(f"[bench] {label}: {len(records)} records, {len(queries)} queries, index build {build * 1000:.0f} ms")
+    print(f"[bench]   both  scan  median {statistics.median(scan_ms):8.2f} ms  max {max(scan_ms):8.2f} ms")
+    print(f"[bench]   both  index median {statistics.median(index_ms):8.2f} ms  max {max(index_ms):8.2f} ms")
+    print(f"[bench]   epa   scan  median {statistics.median(epa_scan_ms):8.2f} ms  max {max(epa_scan_ms):8.2f} ms")
+    print(f"[bench]   epa   index median {statistics.median(epa_index_ms):8.2f} ms  max {max(epa_index_ms):8.2f} ms")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark trigram search vs the linear scan.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--synthetic", type=int, default=100_000, help="Synthetic corpus size (0 to skip)")
+    parser.add_argument("--queries", type=int, default=40, help="Sampled queries in addition to the fixed set")
+    parser.add_argument("--limit", type=int, default=200, help="Result limit (the API default)")
+    parser.add_argument("--repeat", type=int, default=3, help="Timing repeats per query")
+    args = parser.parse_args()
+
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+    store = JsonPesticideStore(json_dir=json_dir)
+    records = store.all_records()
+    queries = pick_queries(records, args.queries)
+
+    # The store's own entry point must agree with the reference scan too.
+    for q in queries:
+        if store.search(q, "both", args.limit) != scan_search(records, q, args.limit):
+            raise SystemExit(f"[bench] store.search differs from scan for {q!r}")
+
+    run("dataset", records, queries, args.limit, args.repeat)
+    if args.synthetic > len(records):
+        run("synthetic", synthesize(records, args.synthetic), queries, args.limit, args.repeat)
+    print("[bench] index results match the linear scan for every query")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""
+Benchmark JsonPesticideStore cold start: per-file JSON parsing vs binary snapshot,
+and (with --workers) the parallel process-pool parser.
+
+Each trial runs in a fresh interpreter so nothing is shared between runs
+(the OS page cache is warm for all modes, which is the realistic deploy case).
+With --workers the parallel loader is first checked for exact equivalence
+(record order + every index) against the serial loader; --check-only stops
+after that check.
+
+Usage:
+  python scripts/bench_store_load.py --trials 5
+  python scripts/bench_store_load.py --trials 5 --workers 16
+  python scripts/bench_store_load.py --workers 16 --check-only
+"""
+
+from __future__ import annotations
+
+import argparse
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import JsonPesticideStore, get_json_dir  # noqa: E402
+
+
+def check_parallel_equivalence(json_dir: Path, workers: int) -> None:
+    # The loader compares its parallel parse with a serial one and raises on any difference.
+    JsonPesticideStore(json_dir=json_dir, use_snapshot=False, load_workers=workers, verify_parallel_load=True).load()
+    print(f"[bench] parallel loader ({workers} workers) matches serial loader exactly")
+
+
+def _child(json_dir: Path, snapshot: str, workers: int) -> None:
+    store = JsonPesticideStore(
+        json_dir=json_dir,
+        snapshot_path=Path(snapshot) if snapshot else None,
+        use_snapshot=bool(snapshot),
+        load_workers=workers,
+    )
+    t0 = time.perf_counter()
+    store.load()
+    elapsed = time.perf_counter() - t0
+    print(f"{elapsed:.6f} {len(store.all_records())}")
+
+
+def _run_trial(json_dir: Path, snapshot: str, workers: int) -> tuple[float, int]:
+    cmd = [
+        sys.executable, __file__, "--child",
+        "--json-dir", str(json_dir),
+        "--snapshot", snapshot,
+        "--workers", str(workers),
+    ]
+    out = subprocess.run(cmd, check=True, capture_output=True, text=True).stdout.split()
+    return float(out[0]), int(out[1])
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Benchmark store cold start with and without the snapshot.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--trials", type=int, default=5, help="Fresh-process trials per mode")
+    parser.add_argument("--workers", type=int, default=0, help="Also benchmark the parallel loader with N processes")
+    parser.add_argument(
+        "--check-only", action="store_true", help="Only check the parallel loader against the serial one (needs --workers)"
+    )
+    parser.add_argument("--snapshot", default="", help=argparse.SUPPRESS)
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+    if args.child:
+        _child(json_dir, args.snapshot, args.workers)
+        return
+
+    if args.check_only and args.workers <= 1:
+        raise SystemExit("[bench] --check-only needs --workers N (N > 1)")
+    modes = [("json", "", 0), ("snapshot", None, 0)]
+    if args.workers > 1:
+        check_parallel_equivalence(json_dir, args.workers)
+        if args.check_only:
+            return
+        modes.insert(1, (f"json x{args.workers}", "", args.workers))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = os.path.join(tmp, "store_snapshot.pkl")
+        # Prime the snapshot once; that write is not part of any measurement.
+        JsonPesticideStore(json_dir=json_dir, snapshot_path=Path(snapshot)).load()
+
+        results: dict[str, list[float]] = {mode: [] for mode, _, _ in modes}
+        records = 0
+        for _ in range(max(args.trials, 1)):
+            for mode, snap, workers in modes:
+                elapsed, records = _run_trial(json_dir, snapshot if snap is None else snap, workers)
+                results[mode].append(elapsed)
+
+    print(f"[bench] JSON dir: {json_dir} ({records} records, {args.trials} trials)")
+    for mode, times in results.items():
+        print(
+            f"[bench] {mode:<12} median {statistics.median(times) * 1000:8.1f} ms"
+            f"  min {min(times) * 1000:8.1f} ms  max {max(times) * 1000:8.1f} ms"
+        )
+    speedup = statistics.median(results["json"]) / max(statistics.median(results["snapshot"]), 1e-9)
+    print(f"[bench] snapshot speedup: {speedup:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
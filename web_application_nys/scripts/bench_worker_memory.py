@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Measure per-worker memory with and without a preloaded, shared dataset.
+
+Forks worker processes the way gunicorn does and reports, per worker, RSS,
+PSS (shared pages split between the processes mapping them) and private
+memory (pages only that worker holds) from /proc/self/smaps_rollup (Linux).
+Modes:
+  per-worker     each worker loads the store (from the snapshot) and builds
+                 its indexes itself, as without NYS_PRELOAD
+  preload        the parent loads and indexes once, freezes its heap
+                 (data.freeze_heap) and forks; workers share those pages
+  no-freeze      as preload without freezing, to show what the cyclic GC
+                 copies
+  preload+lazy   as preload, with NYS_LAZY_DETAILS=1 (label details in the
+                 memory-mapped packed corpus)
+Before measuring, each worker serves a mix of store reads (list pages,
+searches, detail bodies, guided-filter counts), which dirties shared pages
+through refcount updates, then runs one full garbage collection, as a
+long-running worker eventually does. Workers stay alive until all have
+reported, so PSS reflects sharing among them.
+
+Usage:
+  python scripts/bench_worker_memory.py --workers 4 --requests 2000
+"""
+
+from __future__ import annotations
+
+import argparse
+import gc
+import json
+import os
+import random
+import statistics
+import sys
+import tempfile
+from pathlib import Path
+from typing import Dict, List
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.application_table import ApplicationTable  # noqa: E402
+from app.data import JsonPesticideStore, freeze_heap, get_json_dir  # noqa: E402
+from app.filter_index import CropTargetCounts, GuidedFilterIndex  # noqa: E402
+from nys_mappings.mapping_cache import crop_names, target_names, unit_lookup  # noqa: E402
+
+
+def memory_kb() -> Dict[str, int]:
+    """Rss / Pss / private kB of this process."""
+
+    fields: Dict[str, int] = {}
+    with open("/proc/self/smaps_rollup") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 3 and parts[2] == "kB":
+                fields[parts[0].rstrip(":")] = int(parts[1])
+    return {
+        "rss": fields.get("Rss", 0),
+        "pss": fields.get("Pss", 0),
+        "private": fields.get("Private_Clean", 0) + fields.get("Private_Dirty", 0),
+    }
+
+
+def build(store: JsonPesticideStore) -> CropTargetCounts:
+    """Load the store and build the indexes a worker serves from."""
+
+    gen = store.generation()
+    gen.warm()
+    gen.moa_masks()
+    ApplicationTable(gen.records, unit_lookup())
+    names = crop_names()
+    return CropTargetCounts(GuidedFilterIndex(gen.records, target_names().mapping, names.unified, names.deployed))
+
+
+def serve(store: JsonPesticideStore, counts: CropTargetCounts, requests: int, seed: int) -> None:
+    rng = random.Random(seed)
+    records = store.all_records()
+    names = [r["_source_file"] for r in records]
+    words = [str(r.get("trade_Name") or "").split(" ")[0] for r in records[:: max(len(records) // 200, 1)]]
+    crops = store.generation().crops()
+    for i in range(requests):
+        kind = i % 4
+        if kind == 0:
+            items, _ = store.list_page(rng.randint(1, max(len(records) // 50, 1)), 50)
+            store.project(items)
+        elif kind == 1:
+            store.project(store.search(rng.choice(words), "both", 50))
+        elif kind == 2:
+            store.detail_body(source_file=rng.choice(names))
+        elif crops:
+            counts.types(rng.choice(crops))
+
+
+def run_mode(
+    json_dir: Path, tmp: Path, workers: int, requests: int, preload: bool, freeze: bool, lazy: bool
+) -> List[Dict[str, int]]:
+    def make_store() -> JsonPesticideStore:
+        return JsonPesticideStore(
+            json_dir=json_dir,
+            snapshot_path=tmp / ("lazy.pkl" if lazy else "eager.pkl"),
+            lazy_details=lazy,
+            corpus_dir=tmp / "corpus",
+        )
+
+    store = counts = None
+    if preload:
+        store = make_store()
+        counts = build(store)
+        if freeze:
+            freeze_heap()
+
+    reports: List[Dict[str, int]] = []
+    release_r, release_w = os.pipe()
+    pids = []
+    readers = []
+    for w in range(workers):
+        report_r, report_w = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(report_r)
+            os.close(release_w)
+            if store is None:
+                store = make_store()
+                counts = build(store)
+            serve(store, counts, requests, seed=w)
+            gc.collect()
+            os.write(report_w, json.dumps(memory_kb()).encode())
+            os.close(report_w)
+            os.read(release_r, 1)  # stay mapped until every worker has reported
+            os._exit(0)
+        os.close(report_w)
+        pids.append(pid)
+        readers.append(report_r)
+
+    for r in readers:
+        with os.fdopen(r, "rb") as f:
+            reports.append(json.loads(f.read()))
+    os.close(release_w)
+    os.close(release_r)
+    for pid in pids:
+        os.waitpid(pid, 0)
+    return reports
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Per-worker memory with and without a preloaded, shared dataset.")
+    parser.add_argument(
+        "--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)"
+    )
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--requests", type=int, default=2000, help="Reads each worker serves before it is measured")
+    args = parser.parse_args()
+
+    if not os.path.exists("/proc/self/smaps_rollup"):
+        raise SystemExit("[bench] needs Linux (/proc/self/smaps_rollup)")
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Prime both snapshots (and the corpus) in throwaway processes; not measured.
+        for lazy in (False, True):
+            pid = os.fork()
+            if pid == 0:
+                JsonPesticideStore(
+                    json_dir=json_dir,
+                    snapshot_path=Path(tmp) / ("lazy.pkl" if lazy else "eager.pkl"),
+                    lazy_details=lazy,
+                    corpus_dir=Path(tmp) / "corpus",
+                ).load()
+                os._exit(0)
+            os.waitpid(pid, 0)
+
+        print(f"[bench] {args.workers} workers, {args.requests} reads each (per-worker medians, MB)")
+        for mode, preload, freeze, lazy in (
+            ("per-worker", False, False, False),
+            ("no-freeze", True, False, False),
+            ("preload", True, True, False),
+            ("preload+lazy", True, True, True),
+        ):
+            # Each mode in a fresh process so the parents start equal.
+            r, w = os.pipe()
+            pid = os.fork()
+            if pid == 0:
+                os.close(r)
+                reports = run_mode(json_dir, Path(tmp), args.workers, args.requests, preload, freeze, lazy)
+                os.write(w, json.dumps(reports).encode())
+                os._exit(0)
+            os.close(w)
+            with os.fdopen(r, "rb") as f:
+                reports = json.loads(f.read())
+            os.waitpid(pid, 0)
+
+            def med(key: str) -> float:
+                return statistics.median(rep[key] for rep in reports) / 1024
+
+            print(
+                f"[bench] {mode:<13} RSS {med('rss'):7.1f}  PSS {med('pss'):7.1f}  private {med('private'):7.1f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
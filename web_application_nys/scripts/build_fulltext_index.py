@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+Build the on-disk BM25 full-text index served by `/api/fulltext`.
+
+For every label in `../altered_json/*.json` this reads the extracted label
+text the pipeline used for it: `PDFs/nyspad_label_txt_OCR/<name>_OCR.txt` when
+the products CSV says `final_determination == OCR`, otherwise
+`PDFs/nyspad_label_txt/<name>.txt` (falling back to whichever exists). Pages
+come from the `***PAGE N START***` markers written by the PDF-to-text scripts.
+
+Optional:
+  - NYS_OUTPUT_JSON_DIR         (override JSON dir)
+  - NYS_FULLTEXT_INDEX          (override output path; the web app reads the same)
+
+Usage:
+  python scripts/build_fulltext_index.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import csv
+import sys
+import time
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from app.data import get_json_dir  # noqa: E402
+from app.fulltext_index import get_fulltext_index_path, load_fulltext_index, write_fulltext_index  # noqa: E402
+
+NYSPAD_ROOT = Path(__file__).resolve().parents[2]
+
+
+def load_determinations(csv_path: Path) -> Dict[str, str]:
+    """pdf_filename -> final_determination (Original / OCR / ...) from the products CSV."""
+
+    out: Dict[str, str] = {}
+    if not csv_path.exists():
+        return out
+    with csv_path.open(newline="", encoding="utf-8", errors="ignore") as f:
+        for row in csv.DictReader(f):
+            pdf = (row.get("pdf_filename") or "").strip()
+            if pdf:
+                out[pdf] = (row.get("final_determination") or "").strip()
+    return out
+
+
+def pick_label_text(stem: str, determination: str, txt_dir: Path, ocr_dir: Path) -> Optional[Path]:
+    original = txt_dir / f"{stem}.txt"
+    ocr = ocr_dir / f"{stem}_OCR.txt"
+    preferred = (ocr, original) if determination == "OCR" else (original, ocr)
+    for p in preferred:
+        if p.exists():
+            return p
+    return None
+
+
+def iter_label_texts(
+    json_dir: Path, txt_dir: Path, ocr_dir: Path, determinations: Dict[str, str], counts: Dict[str, int]
+) -> Iterable[Tuple[str, str]]:
+    for p in sorted(json_dir.glob("*.json")):
+        stem = p.name[: -len(".json")]
+        txt = pick_label_text(stem, determinations.get(f"{stem}.pdf", ""), txt_dir, ocr_dir)
+        if txt is None:
+            counts["missing"] += 1
+            continue
+        counts["ocr" if txt.parent == ocr_dir else "original"] += 1
+        yield p.name, txt.read_text(encoding="utf-8", errors="ignore")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Build the BM25 full-text index over extracted label text.")
+    parser.add_argument("--json-dir", default="", help="Override JSON directory (defaults to NYS_OUTPUT_JSON_DIR or app default)")
+    parser.add_argument("--txt-dir", default=str(NYSPAD_ROOT / "PDFs" / "nyspad_label_txt"), help="Original text dir")
+    parser.add_argument("--ocr-dir", default=str(NYSPAD_ROOT / "PDFs" / "nyspad_label_txt_OCR"), help="OCR text dir")
+    parser.add_argument(
+        "--products-csv",
+        default=str(NYSPAD_ROOT / "current_products_edited_txt_OCR.csv"),
+        help="CSV with pdf_filename + final_determination (chooses OCR vs original text)",
+    )
+    parser.add_argument("--out", default="", help="Index path (defaults to NYS_FULLTEXT_INDEX or .cache/fulltext.idx)")
+    args = parser.parse_args()
+
+    json_dir = Path(args.json_dir).expanduser().resolve() if args.json_dir else get_json_dir()
+    if not json_dir.exists() or not json_dir.is_dir():
+        raise SystemExit(f"JSON directory not found: {json_dir}")
+    out = Path(args.out).expanduser().resolve() if args.out else get_fulltext_index_path()
+    txt_dir, ocr_dir = Path(args.txt_dir).resolve(), Path(args.ocr_dir).resolve()
+    determinations = load_determinations(Path(args.products_csv))
+
+    print(f"[build] JSON dir: {json_dir}")
+    print(f"[build] Text dirs: {txt_dir} / {ocr_dir}")
+    print(f"[build] Determinations: {len(determinations)} rows")
+
+    counts = {"original": 0, "ocr": 0, "missing": 0}
+    t0 = time.perf_counter()
+    stats = write_fulltext_index(iter_label_texts(json_dir, txt_dir, ocr_dir, determinations, counts), out)
+    elapsed = time.perf_counter() - t0
+
+    if load_fulltext_index(out) is None:
+        raise SystemExit(f"[build] wrote {out} but could not read it back")
+    print(
+        f"[build] Indexed {stats['docs']} labels ({counts['original']} original text, {counts['ocr']} OCR, "
+        f"{counts['missing']} without text): {stats['terms']} terms, {stats['bytes'] / 1e6:.1f} MB in {elapsed:.1f}s"
+    )
+    print(f"[build] Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
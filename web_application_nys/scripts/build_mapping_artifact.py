@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+"""
+Compile crop_names_unified.csv / target_names_unified.csv (plus any pending
+editor journal) into the binary mapping artifact read by the pipeline, the
+Supabase index builder and the web app.
+
+Consumers recompile a stale artifact on their own; run this to prebuild it
+(e.g. in a deploy step) or to time a cold compile against a load.
+
+Optional:
+  - NYS_MAPPING_ARTIFACT        (override output path; consumers read the same)
+
+Usage:
+  python scripts/build_mapping_artifact.py
+"""
+
+from __future__ import annotations
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Ensure we can import app helpers
+WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
+if str(WEB_APP_DIR) not in sys.path:
+    sys.path.insert(0, str(WEB_APP_DIR))
+
+from nys_mappings.mapping_artifact import (  # noqa: E402
+    compile_mappings,
+    get_mapping_artifact_path,
+    read_mapping_artifact,
+    write_mapping_artifact,
+)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Compile the mapping CSVs into the binary mapping artifact.")
+    parser.add_argument("--out", default="", help="Artifact path (defaults to NYS_MAPPING_ARTIFACT or .cache/mappings.bin)")
+    args = parser.parse_args()
+
+    out = Path(args.out).expanduser().resolve() if args.out else get_mapping_artifact_path()
+
+    t0 = time.perf_counter()
+    mappings = compile_mappings()
+    compile_s = time.perf_counter() - t0
+    stats = write_mapping_artifact(mappings, out)
+
+    t0 = time.perf_counter()
+    loaded = read_mapping_artifact(out)
+    load_s = time.perf_counter() - t0
+    if loaded.version != mappings.version or len(loaded.target_mapping) != len(mappings.target_mapping):
+        raise SystemExit(f"[build] wrote {out} but could not read it back")
+
+    print(
+        f"[build] Mapping version {mappings.version}: {len(mappings.crops.unified)} crops, "
+        f"{stats['targets']} targets, {stats['strings']} strings, {stats['bytes'] / 1e6:.2f} MB"
+    )
+    print(f"[build] Compile from CSV {compile_s * 1000:.0f} ms, load from artifact {load_s * 1000:.0f} ms")
+    print(f"[build] Wrote {out}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,6 +13,7 @@ Requires environment variables:
 
 Optional:
   - NYS_OUTPUT_JSON_DIR         (override JSON dir)
+  - NYS_MAPPING_ARTIFACT        (compiled crop/target mappings; rebuilt when stale)
 """
 
 from __future__ import annotations
@@ -31,12 +32,15 @@ except Exception as e:  # pragma: no cover
     create_client = None  # type: ignore
 
 
-# Ensure we can import app helpers (normalize_crop_key)
+# Ensure we can import app helpers (get_json_dir) and nys_mappings (normalize_crop_key, compiled mappings)
 WEB_APP_DIR = Path(__file__).resolve().parents[1]  # web_application_nys/
 if str(WEB_APP_DIR) not in sys.path:
     sys.path.insert(0, str(WEB_APP_DIR))
 
-from app.data import get_json_dir, normalize_crop_key  # noqa: E402
+from app.data import get_json_dir  # noqa: E402
+from app.moa import parse_moa_codes  # noqa: E402
+from nys_mappings.keys import normalize_crop_key  # noqa: E402
+from nys_mappings.mapping_artifact import MappingArtifact, load_mappings  # noqa: E402
 
 
 def _env(name: str) -> str:
@@ -58,36 +62,6 @@ def _chunks(seq: Sequence[dict], size: int) -> Iterable[List[dict]]:
         yield list(seq[i : i + size])
 
 
-def normalize_moa_code(code: str) -> str:
-    raw = str(code or "").strip()
-    if not raw or raw == "?":
-        return ""
-    s = raw.upper().replace("\t", " ")
-    s = " ".join(s.split())
-
-    import re
-
-    m = re.search(r"\b(FRAC|IRAC|HRAC)\s*([0-9]+[A-Z]?)\b", s)
-    if m:
-        return f"{m.group(1)} {m.group(2)}".strip()
-    return s
-
-
-def split_moa_tokens(raw_moa: str) -> List[str]:
-    s = str(raw_moa or "").strip()
-    if not s or s == "?" or s.upper() == "N/A":
-        return []
-    out: List[str] = []
-    seen: set[str] = set()
-    for part in s.replace("/", ",").replace(";", ",").split(","):
-        norm = normalize_moa_code(part)
-        if not norm or norm in seen:
-            continue
-        seen.add(norm)
-        out.append(norm)
-    return out
-
-
 @dataclass
 class CropMaps:
     unified_by_original_norm: dict[str, str]
@@ -102,102 +76,28 @@ class TargetMapEntry:
     main_target_list: bool
 
 
-def load_crop_maps(nyspad_root: Path) -> CropMaps:
-    import csv
-
-    path = nyspad_root / "crop_names_unified.csv"
-    unified: dict[str, str] = {}
-    deployed: dict[str, bool] = {}
-    if not path.exists():
-        return CropMaps(unified_by_original_norm=unified, deployed_by_original_norm=deployed)
-
-    with path.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            original = str(row.get("original_crop_name") or "").strip()
-            if not original or original.lower() == "nan":
-                continue
-            edited = str(row.get("edited_crop_name") or "").strip()
-            if edited.lower() == "nan":
-                edited = ""
-
-            deployed_raw = row.get("deployed", "true")
-            deployed_val = True
-            if isinstance(deployed_raw, str):
-                deployed_val = deployed_raw.strip().lower() in ("true", "1", "yes", "y")
-            elif deployed_raw is not None:
-                deployed_val = bool(deployed_raw)
-
-            orig_norm = normalize_crop_key(original)
-            if not orig_norm:
-                continue
-            unified_norm = normalize_crop_key(edited) if edited else orig_norm
-            unified[orig_norm] = unified_norm or orig_norm
-            deployed[orig_norm] = deployed_val
-
-    return CropMaps(unified_by_original_norm=unified, deployed_by_original_norm=deployed)
+def load_crop_maps(mappings: MappingArtifact) -> CropMaps:
+    crops = mappings.crops
+    return CropMaps(
+        unified_by_original_norm={k: v for k, v in crops.unified.items() if k},
+        deployed_by_original_norm={k: v for k, v in crops.deployed.items() if k},
+    )
 
 
-def load_target_mapping(nyspad_root: Path) -> dict[tuple[str, str], TargetMapEntry]:
+def load_target_mapping(mappings: MappingArtifact) -> dict[tuple[str, str], TargetMapEntry]:
     """
-    Build mapping keyed by (orig_crop_norm, orig_target_norm) matching current Flask guided-filter logic.
+    Mapping keyed by (orig_crop_norm, orig_target_norm), the same one the Flask guided filter uses.
     """
-    import csv
-
-    path = nyspad_root / "target_names_unified.csv"
     mapping: dict[tuple[str, str], TargetMapEntry] = {}
-    if not path.exists():
-        return mapping
-
-    with path.open("r", encoding="utf-8", newline="") as f:
-        reader = csv.DictReader(f)
-        for row in reader:
-            original_target = str(row.get("original_target_name") or "").strip()
-            original_crop = str(row.get("original_crop") or "").strip()
-            original_target_type = str(row.get("original_target_type") or "").strip() or "Other"
-            source_target_type = str(row.get("source_target_type") or "").strip()
-            new_target = str(row.get("new_target_name") or "").strip()
-
-            if not original_target or not original_crop:
-                continue
-            if new_target.lower() == "nan":
-                new_target = ""
-            if source_target_type.lower() == "nan":
-                source_target_type = ""
-
-            # deployed defaults True
-            deployed_raw = row.get("deployed", "true")
-            deployed_val = True
-            if isinstance(deployed_raw, str):
-                deployed_val = deployed_raw.strip().lower() in ("true", "1", "yes", "y")
-            elif deployed_raw is not None:
-                deployed_val = bool(deployed_raw)
-
-            # main_target_list defaults False
-            main_raw = row.get("main_target_list", "false")
-            main_val = False
-            if isinstance(main_raw, str):
-                main_val = main_raw.strip().lower() in ("true", "1", "yes", "y")
-            elif main_raw is not None:
-                main_val = bool(main_raw)
-
-            orig_crop_norm = normalize_crop_key(original_crop)
-            orig_target_norm = normalize_crop_key(original_target)
-            if not orig_crop_norm or not orig_target_norm:
-                continue
-
-            refined_target = (new_target if new_target else original_target).strip()
-            refined_l = str(refined_target).strip().lower()
-            display_type = (source_target_type if source_target_type else original_target_type).strip() or "Other"
-            display_type_l = display_type.lower().strip()
-
-            mapping[(orig_crop_norm, orig_target_norm)] = TargetMapEntry(
-                refined_target_l=refined_l,
-                display_target_type_l=display_type_l,
-                deployed=deployed_val,
-                main_target_list=main_val,
-            )
-
+    for (orig_crop_norm, orig_target_norm), info in mappings.target_mapping.items():
+        if not orig_crop_norm or not orig_target_norm:
+            continue
+        mapping[(orig_crop_norm, orig_target_norm)] = TargetMapEntry(
+            refined_target_l=info["refined_target_l"],
+            display_target_type_l=info["display_target_type_l"],
+            deployed=bool(info["deployed"]),
+            main_target_list=bool(info["main_target_list"]),
+        )
     return mapping
 
 
@@ -226,7 +126,7 @@ def build_label_index_row(source_file: str, pesticide: dict) -> dict:
         if name or moa_raw:
             active_json.append({k: v for k, v in {"name": name, "mode_Of_Action": moa_raw}.items() if v})
 
-        for tok in split_moa_tokens(moa_raw):
+        for tok in parse_moa_codes(moa_raw):
             if tok and tok not in moa_seen:
                 moa_seen.add(tok)
                 moa_codes.append(tok)
@@ -347,9 +247,9 @@ def main() -> None:
     if not json_dir.exists() or not json_dir.is_dir():
         raise SystemExit(f"JSON directory not found: {json_dir}")
 
-    nyspad_root = Path(__file__).resolve().parents[2]
-    crop_maps = load_crop_maps(nyspad_root)
-    target_mapping = load_target_mapping(nyspad_root)
+    mappings = load_mappings()
+    crop_maps = load_crop_maps(mappings)
+    target_mapping = load_target_mapping(mappings)
 
     json_files = sorted(json_dir.glob("*.json"))
     print(f"[build] JSON dir: {json_dir} ({len(json_files)} files)")
@@ -2,6 +2,9 @@
 
 Example:
   gunicorn -w 2 -b 0.0.0.0:5051 wsgi:app
+
+With NYS_PRELOAD=1 (see gunicorn.conf.py) the dataset is loaded once in the
+master and shared with the workers.
 """
 
 from app import create_app